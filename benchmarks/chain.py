@@ -0,0 +1,39 @@
+"""
+Local EVM for the benchmarks, backed by eth-tester and py-evm (dev dependencies, see pyproject.toml).
+"""
+from typing import Tuple
+
+# Runtime of the mock manager: returns storage slot 0 for any call, i.e. manageRoot(address) returns
+# the root and manageVaultWithMerkleVerification(...) succeeds.
+#   PUSH1 0 SLOAD PUSH1 0 MSTORE PUSH1 32 PUSH1 0 RETURN
+MOCK_MANAGER_RUNTIME = bytes.fromhex("60005460005260206000f3")
+
+def mock_manager_init_code(root: str) -> bytes:
+    """
+    Creation code of the mock manager: stores root in slot 0, then returns MOCK_MANAGER_RUNTIME.
+    """
+    store_root = b"\x7f" + bytes.fromhex(root[2:]) + bytes.fromhex("600055")  # PUSH32 root PUSH1 0 SSTORE
+    size = len(MOCK_MANAGER_RUNTIME)
+    # PUSH1 size PUSH1 offset PUSH1 0 CODECOPY PUSH1 size PUSH1 0 RETURN, with the runtime appended
+    copy_length = 2 + 2 + 2 + 1 + 2 + 2 + 1
+    offset = len(store_root) + copy_length
+    copy_runtime = bytes([0x60, size, 0x60, offset, 0x60, 0x00, 0x39, 0x60, size, 0x60, 0x00, 0xf3])
+    return store_root + copy_runtime + MOCK_MANAGER_RUNTIME
+
+def start_chain(root: str) -> Tuple[object, str, object]:
+    """
+    Starts an in-process chain with a mock manager and a funded strategist.
+
+    Returns:
+        The Web3 instance, the manager address and the strategist account
+    """
+    from web3 import Web3, EthereumTesterProvider
+
+    w3 = Web3(EthereumTesterProvider())
+    funder = w3.eth.accounts[0]
+    receipt = w3.eth.wait_for_transaction_receipt(w3.eth.send_transaction({"from": funder, "data": mock_manager_init_code(root)}))
+    manager_address = receipt["contractAddress"]
+
+    strategist = w3.eth.account.create()
+    w3.eth.wait_for_transaction_receipt(w3.eth.send_transaction({"from": funder, "to": strategist.address, "value": 10 ** 20}))
+    return w3, manager_address, strategist
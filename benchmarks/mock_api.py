@@ -0,0 +1,169 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+from eth_abi import encode
+from eth_utils import keccak, to_checksum_address
+from nucleus_sdk_python.merkle import ManageTree
+
+APPROVE = "approve(address,uint256)"
+SPENDER = "0xDB74dfDD3BB46bE8Ce6C33dC9D82777BCFc3dEd5"
+DECODER = "0x33a4392C4264611C81Dbfd7052FfB75D60DD4650"
+SYMBOL = "tETH"
+
+def token_address(idx: int) -> str:
+    """A deterministic token address for leaf idx."""
+    return to_checksum_address(keccak(text=f"token-{idx}")[:20])
+
+def tree_document(leaf_count: int) -> Dict[str, Any]:
+    """
+    A manage tree in the merkle tree generator's JSON format, with one approve(SPENDER, amount) leaf
+    per token.
+    """
+    leaves = [{
+        "LeafId": idx,
+        "TargetAddress": token_address(idx),
+        "CanSendValue": False,
+        "FunctionSignature": APPROVE,
+        "AddressArguments": [SPENDER],
+        "DecoderAndSanitizerAddress": DECODER
+    } for idx in range(leaf_count)]
+    document = {"metadata": {}, "leafs": leaves}
+    document["metadata"]["ManageRoot"] = ManageTree.from_json(document).root
+    return document
+
+class MockNucleusAPI:
+    """
+    Local stand-in for the Nucleus API, serving the address book, proofs, multiproofs and the tree of a
+    generated manage tree from a background thread.
+
+    JSON-RPC requests (including batches) posted to /rpc are forwarded to the Web3 instance when one is
+    given, so that an in-process eth-tester chain can be reached over HTTP like a real node. Otherwise
+    they get the fixed answers of a node whose manager returns the root for any call (see rpc_result).
+
+    Args:
+        leaf_count: Number of leaves of the generated tree
+        chain_id: Chain ID of the address book entry
+        manager_address: Manager address of the address book entry
+        w3: Optional Web3 instance answering /rpc
+    """
+
+    def __init__(self, leaf_count: int, chain_id: int, manager_address: str, w3=None):
+        self.document = tree_document(leaf_count)
+        self.tree = ManageTree.from_json(self.document)
+        self.root = self.tree.root
+        self.chain_id = chain_id
+        self.manager_address = manager_address
+        self.w3 = w3
+        self.requests = 0
+        # eth-tester is not thread-safe
+        self._rpc_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/"
+
+    @property
+    def address_book_url(self) -> str:
+        return self.url + "address-book"
+
+    @property
+    def rpc_url(self) -> str:
+        return self.url + "rpc"
+
+    def start(self) -> "MockNucleusAPI":
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without this, Nagle's algorithm adds ~40ms per response
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                api.requests += 1
+                path = urlparse(self.path).path.strip("/")
+                if path == "address-book":
+                    self.send_json({str(api.chain_id): {"nucleus": {SYMBOL: {"manager": api.manager_address}}}})
+                elif path == "tree/" + api.root:
+                    self.send_json(api.document)
+                else:
+                    self.send_json({"message": "Not Found"}, 404)
+
+            def do_POST(self):
+                api.requests += 1
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                path = urlparse(self.path).path.strip("/")
+                if path == "rpc":
+                    self.send_json(api.rpc(body))
+                elif path == "multiproofs/" + api.root:
+                    entries = [api.tree.proof_and_decoder(call, api.decoder_outputs(call["calldata"])) for call in body["calls"]]
+                    self.send_json({"proofs": [entry[0] for entry in entries], "decoderAndSanitizerAddress": [entry[1] for entry in entries]})
+                elif path == "proofs/" + api.root:
+                    proof, decoder = api.tree.proof_and_decoder(body, api.decoder_outputs(body["calldata"]))
+                    self.send_json({"proof": proof, "decoderAndSanitizerAddress": decoder})
+                else:
+                    self.send_json({"message": "Not Found"}, 404)
+
+            def send_json(self, data: Any, status: int = 200):
+                body = data.encode() if isinstance(data, str) else json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def decoder_outputs(self, calldata: str) -> Dict[str, bytes]:
+        """The packed argument addresses the decoder returns for an approve call: its spender."""
+        return {DECODER.lower(): bytes.fromhex(calldata[2:])[16:36]}
+
+    def rpc_result(self, method: str, params: List[Any]) -> Any:
+        """
+        The result of a JSON-RPC call without a Web3 instance: eth_calls to the decoder return the spender
+        of the approve call (see decoder_outputs), and any other eth_call returns the root.
+        """
+        if method == "eth_call":
+            if params[0]["to"].lower() == DECODER.lower():
+                return "0x" + encode(["bytes"], [self.decoder_outputs(params[0]["data"])[DECODER.lower()]]).hex()
+            return self.root
+        if method == "eth_sendRawTransaction":
+            return "0x" + keccak(hexstr=params[0]).hex()
+        return {
+            "eth_chainId": hex(self.chain_id),
+            "eth_getTransactionCount": "0x0",
+            "eth_estimateGas": hex(100_000),
+            "eth_gasPrice": hex(10 ** 9),
+        }[method]
+
+    def rpc(self, body: Any) -> str:
+        """Answers a JSON-RPC request or batch, as a JSON string."""
+        from web3 import Web3
+
+        def answer(request: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                if self.w3 is None:
+                    return {"jsonrpc": "2.0", "id": request.get("id"), "result": self.rpc_result(request["method"], request.get("params", []))}
+                with self._rpc_lock:
+                    result = self.w3.manager.request_blocking(request["method"], request.get("params", []))
+                return {"jsonrpc": "2.0", "id": request.get("id"), "result": json.loads(Web3.to_json(result))}
+            except Exception as e:
+                return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32000, "message": str(e)}}
+
+        if isinstance(body, list):
+            responses: List[Dict[str, Any]] = [answer(request) for request in body]
+            return json.dumps(responses)
+        return json.dumps(answer(body))
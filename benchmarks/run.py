@@ -0,0 +1,149 @@
+"""
+Offline benchmarks of the SDK against a local mock of the Nucleus API. Queue creation and execution
+run against a local EVM with a mock manager when eth-tester is installed (a dev dependency), and
+against the mock API's fixed JSON-RPC answers otherwise.
+
+    python -m benchmarks.run                      # compare with benchmarks/baseline.json
+    python -m benchmarks.run --update-baseline    # store the results as the new baseline
+
+Every benchmark measures the median duration of several runs, divided by the median duration of a
+fixed reference workload measured in the same run, so that results compare across machines. A ratio
+above its baseline by more than the tolerance is reported as a regression and the run exits with
+status 1. Results on the local EVM are named with an "_evm" suffix, since they include its execution.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Dict, Optional
+from eth_account import Account
+from eth_utils import keccak
+from nucleus_sdk_python.address_book import AddressBook
+from nucleus_sdk_python.calldata_queue import CalldataQueue
+from nucleus_sdk_python.client import Client
+from .mock_api import APPROVE, SPENDER, SYMBOL, MockNucleusAPI, token_address
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+LEAF_COUNT = 1024
+CALLDATA_SIZES = (1, 10, 100, 1000)
+# Strategist of the queues when no local EVM is available
+OFFLINE_STRATEGIST = Account.from_key(keccak(text="benchmark-strategist"))
+REFERENCE = "reference"
+
+def measure(run: Callable[[], None], repeat: int, setup: Optional[Callable[[], None]] = None) -> float:
+    """Median duration of run() in seconds, calling setup() untimed before every run."""
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+def reference_workload() -> None:
+    """SDK-independent work in the SDK's mix of hashing and JSON, timed as the unit of every result."""
+    calls = [{"target": f"0x{idx:040x}", "data": keccak(idx.to_bytes(32, "big")).hex()} for idx in range(2000)]
+    json.loads(json.dumps(calls))
+
+def fill(queue: CalldataQueue, count: int) -> None:
+    """Queues count approve calls, each proven by a different leaf."""
+    for idx in range(count):
+        queue.add_call(token_address(idx % LEAF_COUNT), APPROVE, [SPENDER, idx + 1], 0)
+
+def run_benchmarks(repeat: int) -> Dict[str, float]:
+    try:
+        from .chain import start_chain
+        import eth_tester  # noqa: F401
+    except ImportError:
+        start_chain = None
+        print("eth-tester is not installed: queue_creation and execute run against fixed JSON-RPC answers", file=sys.stderr)
+
+    api = MockNucleusAPI(LEAF_COUNT, chain_id=1, manager_address="0x0000000000000000000000000000000000000002")
+    strategist, chain_suffix = OFFLINE_STRATEGIST, ""
+    if start_chain is not None:
+        w3, api.manager_address, strategist = start_chain(api.root)
+        api.chain_id = w3.eth.chain_id
+        api.w3 = w3
+        chain_suffix = "_evm"
+    api.start()
+
+    def new_client() -> Client:
+        return Client("benchmark", base_url=api.url, address_book=AddressBook(api.address_book_url, cache_path=None))
+
+    results = {REFERENCE: measure(reference_workload, repeat)}
+    try:
+        results["client_startup"] = measure(lambda: new_client().address_book.load(), repeat)
+        client = new_client()
+
+        new_queue = lambda: client.create_calldata_queue(api.chain_id, strategist.address, api.rpc_url, SYMBOL)
+        results["queue_creation" + chain_suffix] = measure(new_queue, repeat, setup=client.root_cache.invalidate)
+
+        results["add_call_x1000"] = measure(lambda: fill(new_queue(), 1000), repeat)
+
+        for size in CALLDATA_SIZES:
+            queue = new_queue()
+            fill(queue, size)
+            # Cold: every proof comes from the API
+            results[f"get_calldata_x{size}"] = measure(queue.get_calldata, repeat, setup=client.proof_cache.clear)
+
+        queue = new_queue()
+        fill(queue, 10)
+        rpc = client.get_web3(api.rpc_url)
+        results["execute_x10" + chain_suffix] = measure(lambda: queue.execute(rpc, strategist), repeat, setup=client.proof_cache.clear)
+        # Measured before and after the benchmarks, so that the unit follows the machine's drift during the run
+        results[REFERENCE] = (results[REFERENCE] + measure(reference_workload, repeat)) / 2
+    finally:
+        api.stop()
+    return results
+
+def ratios(results: Dict[str, float]) -> Dict[str, float]:
+    """Every result as a multiple of the reference workload's duration."""
+    reference = results[REFERENCE]
+    return {name: seconds / reference for name, seconds in results.items() if name != REFERENCE}
+
+def report(results: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> int:
+    """Prints every result against its baseline ratio. Returns the number of regressions."""
+    regressions = 0
+    print(f"reference workload: {results[REFERENCE] * 1000:.3f} ms")
+    print(f"{'benchmark':<22}{'current (ms)':>14}{'baseline (x)':>14}{'current (x)':>14}{'change':>10}")
+    for name, ratio in ratios(results).items():
+        milliseconds = results[name] * 1000
+        expected = baseline.get(name)
+        if expected is None:
+            print(f"{name:<22}{milliseconds:>14.3f}{'-':>14}{ratio:>14.3f}{'new':>10}")
+            continue
+        change = ratio / expected - 1
+        regressed = change > tolerance
+        regressions += regressed
+        print(f"{name:<22}{milliseconds:>14.3f}{expected:>14.3f}{ratio:>14.3f}{change:>+10.1%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=21, help="runs per benchmark (default 21)")
+    parser.add_argument("--tolerance", type=float, default=0.35, help="slowdown reported as a regression (default 0.35)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the baseline")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.repeat)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    regressions = report(results, baseline, args.tolerance)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({**baseline, **ratios(results)}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+    elif regressions:
+        print(f"{regressions} benchmark(s) regressed by more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
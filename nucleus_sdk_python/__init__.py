@@ -1,4 +1,29 @@
-from .client import Client
-from .calldata_queue import CalldataQueue
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-__all__ = ["Client", "CalldataQueue"]
\ No newline at end of file
+if TYPE_CHECKING:
+    from .client import Client
+    from .calldata_queue import CalldataQueue
+    from .async_client import AsyncClient
+    from .async_calldata_queue import AsyncCalldataQueue
+
+__all__ = ["Client", "CalldataQueue", "AsyncClient", "AsyncCalldataQueue"]
+
+# Exports are imported on first access, so that importing the package (e.g. for
+# nucleus_sdk_python.encoding) does not load the HTTP clients
+_EXPORTS = {
+    "Client": ".client",
+    "CalldataQueue": ".calldata_queue",
+    "AsyncClient": ".async_client",
+    "AsyncCalldataQueue": ".async_calldata_queue",
+}
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS))
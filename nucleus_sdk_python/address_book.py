@@ -0,0 +1,184 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+import requests
+from .config import address_book_endpoint, ADDRESS_BOOK_CACHE_PATH, ADDRESS_BOOK_TTL, ADDRESS_BOOK_TIMEOUT
+from .exceptions import APIError
+from .utils import checksum_addresses_in_json
+
+class AddressBook(Mapping):
+    """
+    Lazily loaded address book. Nothing is downloaded until the first lookup; the checksummed document
+    is then cached on disk and revalidated with ETag / If-Modified-Since once older than the TTL.
+
+    Behaves like the address book dictionary (chain ID -> protocol -> symbol -> address), and offers
+    lookup() for O(1) access through a flat (chain, protocol, symbol) index.
+
+    Args:
+        endpoint: URL of the address book
+        cache_path: Path of the on-disk cache, or None to keep the address book in memory only
+        ttl: Seconds a cached copy is used without revalidation
+        timeout: Request timeout in seconds
+    """
+
+    def __init__(self, endpoint: str = address_book_endpoint, cache_path: Optional[str] = ADDRESS_BOOK_CACHE_PATH, ttl: float = ADDRESS_BOOK_TTL, timeout: float = ADDRESS_BOOK_TIMEOUT):
+        self.endpoint = endpoint
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.timeout = timeout
+        self._data: Optional[Dict[str, Any]] = None
+        self._index: Dict[Tuple[str, str, str], Any] = {}
+        self._lock = threading.Lock()
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    def __getitem__(self, chain_id: str) -> Any:
+        return self.load()[chain_id]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.load())
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+    def lookup(self, chain_id: Any, protocol: str, symbol: str) -> Any:
+        """
+        Looks up an entry of the address book.
+
+        Args:
+            chain_id: The chain ID (int or str)
+            protocol: The protocol, e.g. "nucleus" or "token"
+            symbol: The symbol, e.g. "tETH" or "USDC"
+
+        Raises:
+            KeyError: If the entry does not exist
+        """
+        self.load()
+        return self._index[(str(chain_id), protocol, symbol)]
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Returns the address book, loading it from the disk cache or the endpoint on first use.
+        """
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    cached = self._read_cache()
+                    if cached is not None and time.time() - cached["fetched_at"] < self.ttl:
+                        self._set_data(cached["data"])
+                    else:
+                        try:
+                            response = requests.get(self.endpoint, headers=self._revalidation_headers(cached), timeout=self.timeout)
+                        except requests.exceptions.RequestException as e:
+                            self._apply_error(cached, e)
+                        else:
+                            self._apply_response(cached, response.status_code, response.headers, response.text)
+        return self._data
+
+    async def async_load(self, session) -> Dict[str, Any]:
+        """
+        Same as load(), downloading with an aiohttp session. Concurrent tasks share one download.
+        """
+        import aiohttp
+
+        if self._data is None:
+            if self._async_lock is None:
+                self._async_lock = asyncio.Lock()
+            async with self._async_lock:
+                if self._data is None:
+                    cached = self._read_cache()
+                    if cached is not None and time.time() - cached["fetched_at"] < self.ttl:
+                        self._set_data(cached["data"])
+                    else:
+                        timeout = aiohttp.ClientTimeout(total=self.timeout)
+                        try:
+                            async with session.get(self.endpoint, headers=self._revalidation_headers(cached), timeout=timeout) as response:
+                                status, headers, text = response.status, response.headers, await response.text()
+                        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                            self._apply_error(cached, e)
+                        else:
+                            self._apply_response(cached, status, headers, text)
+        return self._data
+
+    def refresh(self) -> None:
+        """Forgets the in-memory copy and revalidates the address book on next access."""
+        with self._lock:
+            self._data = None
+            self._index = {}
+            cached = self._read_cache()
+            if cached is not None:
+                cached["fetched_at"] = 0
+                self._write_cache(cached)
+
+    def _revalidation_headers(self, cached: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def _apply_error(self, cached: Optional[Dict[str, Any]], error: Exception) -> None:
+        if cached is None:
+            raise APIError(f"Could not download the address book: {error!r}", status_code=None)
+        # A stale copy is better than failing the lookup
+        self._set_data(cached["data"])
+
+    def _apply_response(self, cached: Optional[Dict[str, Any]], status: int, headers: Mapping, text: str) -> None:
+        if status == 304:
+            if cached is None:
+                raise APIError("Could not download the address book: HTTP 304 without a cached copy to revalidate", status_code=status)
+            cached["fetched_at"] = time.time()
+        elif status >= 400:
+            if cached is None:
+                raise APIError(f"Could not download the address book: HTTP {status}", status_code=status)
+            self._set_data(cached["data"])
+            return
+        else:
+            cached = {
+                "etag": headers.get("ETag"),
+                "last_modified": headers.get("Last-Modified"),
+                "fetched_at": time.time(),
+                "data": checksum_addresses_in_json(json.loads(text))
+            }
+        self._write_cache(cached)
+        self._set_data(cached["data"])
+
+    def _set_data(self, data: Dict[str, Any]) -> None:
+        index = {}
+        for chain_id, protocols in data.items():
+            if isinstance(protocols, dict):
+                for protocol, symbols in protocols.items():
+                    if isinstance(symbols, dict):
+                        for symbol, entry in symbols.items():
+                            index[(chain_id, protocol, symbol)] = entry
+        self._index = index
+        self._data = data
+
+    def _read_cache(self) -> Optional[Dict[str, Any]]:
+        if self.cache_path is None:
+            return None
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            return cached if cached.get("endpoint") == self.endpoint else None
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache(self, cached: Dict[str, Any]) -> None:
+        if self.cache_path is None:
+            return
+        cached["endpoint"] = self.endpoint
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cached, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # The cache is an optimisation; a read-only home directory must not break lookups
+            pass
@@ -0,0 +1,277 @@
+import asyncio
+import os
+import time
+from typing import List, Dict, Any, Callable, Optional, Sequence, Union, TYPE_CHECKING
+import aiohttp
+from .exceptions import *
+from .calldata_queue import CalldataQueue, MANAGE_ROOT_ABI
+from .calls import Call
+from .merkle import ManageTree
+from .root_cache import root_key
+from .nonce_manager import NonceManager
+from .utils import to_checksum_address
+from .prepared import PreparedTransaction
+from .snapshot import dump_snapshot
+from .config import MERKLE_TREE_ENDPOINT, MANAGE_TX_MAX_GAS, MANAGE_TX_MAX_CALLDATA_BYTES, PREPARED_FEE_MULTIPLIERS
+
+if TYPE_CHECKING:
+    from nucleus_sdk_python.async_client import AsyncClient
+
+class AsyncCalldataQueue(CalldataQueue):
+    """
+    CalldataQueue for asyncio. Create it with `await AsyncClient.create_calldata_queue(...)`.
+    Queue building (add_call) is unchanged; every method doing network I/O is a coroutine.
+    """
+
+    def __init__(self, chain_id: int, strategist_address: str, rpc_url: str, symbol: str, client: 'AsyncClient', w3):
+        """
+        Initialize an AsyncCalldataQueue instance. The root is read by AsyncClient.create_calldata_queue.
+
+        Args:
+            client: The async SDK client
+            w3: The AsyncWeb3 instance used for RPC calls
+        """
+        self._init_state(chain_id, strategist_address, rpc_url, symbol, client)
+        self.w3 = w3
+
+    @classmethod
+    async def from_snapshot(cls, client: 'AsyncClient', source: Union[bytes, bytearray, memoryview, str, "os.PathLike"], rpc_url: Optional[str] = None) -> "AsyncCalldataQueue":
+        """See CalldataQueue.from_snapshot."""
+        queue = cls._from_snapshot(client, source, rpc_url)
+        queue.w3 = await client.get_web3(rpc_url) if rpc_url is not None else None
+        return queue
+
+    async def to_snapshot(self, include_proofs: bool = False) -> bytes:
+        """See CalldataQueue.to_snapshot."""
+        self._apply_pending_root()
+        batch_results = None
+        if include_proofs:
+            batch_results = await self._get_batch_proofs_and_decoders()
+            self._convert_proofs(batch_results)
+        return dump_snapshot(self._snapshot(batch_results))
+
+    async def _read_root(self, use_cache: bool = True) -> str:
+        """See CalldataQueue._read_root."""
+        key = root_key(self.chain_id, self.manager_address, self.strategist_address)
+        metrics = self.client.metrics
+        if use_cache:
+            root = self.client.root_cache.get(key)
+            if metrics.enabled:
+                metrics.count("root_cache.hit" if root is not None else "root_cache.miss")
+            if root is not None:
+                return root
+
+        from web3.exceptions import ProviderConnectionError
+
+        manager_contract = self.w3.eth.contract(address=self.manager_address, abi=MANAGE_ROOT_ABI)
+        try:
+            with metrics.stage("rpc.manage_root"):
+                raw_root = await manager_contract.functions.manageRoot(self.strategist_address).call()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ProviderConnectionError, OSError) as e:
+            raise InvalidInputsError(f"Could not connect to RPC URL '{self.rpc_url}'. Please check the RPC URL is valid and accessible.")
+
+        root = self._format_root(raw_root)
+        self.client.root_cache.set(key, root)
+        return root
+
+    async def refresh_root(self) -> bool:
+        """See CalldataQueue.refresh_root."""
+        return self._set_root(await self._read_root(use_cache=False))
+
+    async def load_tree(self, path: Optional[str] = None) -> ManageTree:
+        """See CalldataQueue.load_tree."""
+        self._apply_pending_root()
+        if path is None and self.root not in self.client.manage_trees:
+            data = await self.client.get(MERKLE_TREE_ENDPOINT + self.root, params={"chain": self.chain_id})
+            self.client.manage_trees[self.root] = ManageTree.from_json(data, self.root)
+        return super().load_tree(path)
+
+    async def get_calldata(self, verify: bool = False) -> bytes:
+        """See CalldataQueue.get_calldata."""
+        self._apply_pending_root()
+        with self.client.metrics.stage("get_calldata"):
+            batch_results = await self._get_batch_proofs_and_decoders()
+            self._convert_proofs(batch_results)
+
+            if verify:
+                self._raise_for_failures(await self.verify_proofs(batch_results["proofs"], batch_results["decoderAndSanitizerAddress"]))
+
+            calldata = self._encode_manage_call(batch_results)
+        self._report_calldata_size(calldata)
+        return calldata
+
+    async def get_split_calldata(self, max_gas: int = MANAGE_TX_MAX_GAS, max_calldata_bytes: int = MANAGE_TX_MAX_CALLDATA_BYTES, gas_estimator: Optional[Callable[[Call], int]] = None, verify: bool = False) -> List[bytes]:
+        """See CalldataQueue.get_split_calldata."""
+        self._apply_pending_root()
+        batch_results = await self._get_batch_proofs_and_decoders()
+        self._convert_proofs(batch_results)
+
+        if verify:
+            self._raise_for_failures(await self.verify_proofs(batch_results["proofs"], batch_results["decoderAndSanitizerAddress"]))
+
+        chunks = self._plan_split(batch_results, max_gas, max_calldata_bytes, gas_estimator)
+        return [self._encode_manage_call(batch_results, chunk) for chunk in chunks]
+
+    async def verify_proofs(self, proofs: List[List[bytes]], decoders: List[str]) -> List[Dict[str, Any]]:
+        """See CalldataQueue.verify_proofs."""
+        keys, packed, missing = self._cached_packed_argument_addresses(decoders)
+        if missing:
+            fresh = self._store_packed_argument_addresses(missing, await self._call_decoders(missing))
+            packed = [fresh[key] if output is None else output for key, output in zip(keys, packed)]
+        return self._check_proofs(proofs, decoders, packed)
+
+    async def _fetch_tree_decoders(self, leaves: List[Dict[str, Any]]) -> None:
+        """See CalldataQueue._fetch_tree_decoders."""
+        keys = self._tree_decoder_keys(leaves)
+        if keys:
+            try:
+                self._store_packed_argument_addresses(keys, await self._call_decoders(keys))
+            except Exception as e:
+                self.client.metrics.error("proof_tree.decoders", e, chain_id=self.chain_id)
+
+    async def _call_decoders(self, keys: List[tuple]) -> List[Union[bytes, Exception]]:
+        """See CalldataQueue._call_decoders. Without a batch the calls run concurrently."""
+        from web3.exceptions import ContractLogicError
+
+        calls = [{"to": to_checksum_address(decoder), "data": calldata} for decoder, calldata in keys]
+        try:
+            async with self.w3.batch_requests() as batch:
+                for call in calls:
+                    batch.add(self.w3.eth.call(call))
+                return list(await batch.async_execute())
+        except Exception:
+            pass
+
+        async def call_decoder(call):
+            try:
+                return await self.w3.eth.call(call)
+            except ContractLogicError as e:
+                return e
+        return list(await asyncio.gather(*(call_decoder(call) for call in calls)))
+
+    async def execute(self, w3, acc, nonce_manager: Optional[NonceManager] = None) -> Any:
+        """
+        Execute the queued calls. The nonce, gas estimate and gas price are read concurrently, and the
+        duration of every stage is recorded in last_execution_timings (seconds).
+
+        Args:
+            w3: An AsyncWeb3 instance
+            acc: The strategist account
+            nonce_manager: Allocates the nonce locally (see AsyncClient.get_nonce_manager)
+
+        Returns:
+            The transaction hash
+        """
+        self._check_can_execute(acc)
+        timings = self.last_execution_timings = {}
+
+        try:
+            with self.client.metrics.stage("execute"):
+                start = time.perf_counter()
+                calldata = await self.get_calldata()
+                timings["get_calldata"] = time.perf_counter() - start
+
+                return await self._submit(w3, acc, calldata, timings, nonce_manager)
+        finally:
+            self._report_timings(timings)
+
+    async def execute_split(self, w3, acc, nonce_manager: Optional[NonceManager] = None, wait: bool = True, max_gas: int = MANAGE_TX_MAX_GAS, max_calldata_bytes: int = MANAGE_TX_MAX_CALLDATA_BYTES, gas_estimator: Optional[Callable[[Call], int]] = None) -> List[Any]:
+        """See CalldataQueue.execute_split. w3 is an AsyncWeb3 instance."""
+        self._check_can_execute(acc)
+        calldatas = await self.get_split_calldata(max_gas, max_calldata_bytes, gas_estimator)
+        if nonce_manager is None and not wait:
+            nonce_manager = self.client.get_nonce_manager(w3, self.chain_id, acc.address)
+
+        tx_hashes = []
+        for idx, calldata in enumerate(calldatas):
+            timings = self.last_execution_timings = {}
+            tx_hash = await self._submit(w3, acc, calldata, timings, nonce_manager)
+            tx_hashes.append(tx_hash)
+            if wait:
+                receipt = await w3.eth.wait_for_transaction_receipt(tx_hash)
+                if receipt["status"] != 1:
+                    raise ProtocolError(f"Manage transaction {idx + 1} of {len(calldatas)} ({tx_hash.hex()}) reverted; the transactions after it were not sent.")
+        return tx_hashes
+
+    async def _submit(self, w3, acc, calldata: bytes, timings: Dict[str, float], nonce_manager: Optional[NonceManager] = None) -> Any:
+        """See CalldataQueue._submit."""
+        async def timed(name, awaitable):
+            start = time.perf_counter()
+            result = await awaitable
+            timings[name] = time.perf_counter() - start
+            return result
+
+        estimate = {"from": acc.address, "to": self.manager_address, "data": calldata}
+        if nonce_manager is not None:
+            nonce = await nonce_manager.async_next_nonce()
+            reads = [timed("estimate_gas", w3.eth.estimate_gas(estimate))]
+        else:
+            nonce = None
+            reads = [timed("get_transaction_count", w3.eth.get_transaction_count(acc.address)), timed("estimate_gas", w3.eth.estimate_gas(estimate))]
+        gas_price = self._watched_gas_price()
+        if gas_price is None:
+            reads.append(timed("gas_price", w3.eth.gas_price))
+
+        try:
+            results = list(await asyncio.gather(*reads))
+            if nonce is not None:
+                results.insert(0, nonce)
+            if gas_price is not None:
+                results.append(gas_price)
+            tx = self._build_tx(acc, calldata, *results)
+
+            start = time.perf_counter()
+            raw_transaction = w3.eth.account.sign_transaction(tx, acc.key)['raw_transaction']
+            timings["sign"] = time.perf_counter() - start
+
+            tx_hash = await timed("send_raw_transaction", w3.eth.send_raw_transaction(raw_transaction))
+        except Exception:
+            if nonce_manager is not None:
+                nonce_manager.release_nonce(nonce)
+            raise
+        if nonce_manager is not None:
+            nonce_manager.mark_broadcast(nonce)
+        return tx_hash
+
+    async def prepare(self, w3, acc, nonce_manager: Optional[NonceManager] = None, fee_multipliers: Sequence[float] = PREPARED_FEE_MULTIPLIERS) -> PreparedTransaction:
+        """See CalldataQueue.prepare. w3 is an AsyncWeb3 instance; broadcast with `await prepared.async_commit()`."""
+        self._check_can_execute(acc)
+        timings = self.last_execution_timings = {}
+
+        async def timed(name, awaitable):
+            start = time.perf_counter()
+            result = await awaitable
+            timings[name] = time.perf_counter() - start
+            return result
+
+        try:
+            with self.client.metrics.stage("prepare"):
+                calldata = await timed("get_calldata", self.get_calldata())
+                if nonce_manager is None:
+                    nonce_manager = self.client.get_nonce_manager(w3, self.chain_id, acc.address)
+                estimate = {"from": acc.address, "to": self.manager_address, "data": calldata}
+                gas_price = self._watched_gas_price()
+                reads = [nonce_manager.async_peek_nonce(), timed("estimate_gas", w3.eth.estimate_gas(estimate))]
+                if gas_price is None:
+                    reads.append(timed("gas_price", w3.eth.gas_price))
+                nonce, gas, *read_gas_price = await asyncio.gather(*reads)
+                if gas_price is None:
+                    gas_price = read_gas_price[0]
+                return self._sign_prepared(w3, acc, calldata, nonce_manager, nonce, gas, gas_price, fee_multipliers, timings)
+        finally:
+            self._report_timings(timings)
+
+    async def _get_batch_proofs_and_decoders(self) -> Dict[str, List[Any]]:
+        """See CalldataQueue._get_batch_proofs_and_decoders."""
+        keys, entries, leaves = self._cached_proofs()
+        await self._fetch_tree_decoders(list(leaves.values()))
+        misses = self._resolve_proofs(keys, entries, leaves)
+
+        if misses:
+            response = await self.client.post("multiproofs/" + self.root, data={"chain": self.chain_id, "calls": [leaves[idx] for idx in misses]})
+            self._merge_proofs(keys, entries, misses, response)
+
+        return {
+            "proofs": [entry[0] for entry in entries],
+            "decoderAndSanitizerAddress": [entry[1] for entry in entries]
+        }
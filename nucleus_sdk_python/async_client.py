@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import weakref
+import aiohttp
+from typing import Optional, Dict, Any, List, Sequence, TYPE_CHECKING
+from .exceptions import APIError
+from .async_calldata_queue import AsyncCalldataQueue
+from .client import default_headers
+from .proof_cache import BaseProofCache, PackedArgumentsCache, ProofCache
+from .merkle import ManageTree
+from .address_book import AddressBook
+from .root_cache import RootCache, RootKey
+from .nonce_manager import NonceManager
+from .prepared import PreparedTransaction
+from .transport import TransportConfig, parse_response
+from .metrics import Metrics, NULL_METRICS
+from .batch import QueueSpec, QueueResult, fill_queue
+from .config import DEFAULT_BASE_URL, BATCH_MAX_WORKERS
+
+if TYPE_CHECKING:
+    from web3 import AsyncWeb3
+    from .watcher import ChainState
+
+class AsyncClient:
+    def __init__(self, nucleus_api_key: str, base_url: str = DEFAULT_BASE_URL, proof_cache: Optional[BaseProofCache] = None, address_book: Optional[AddressBook] = None, root_cache: Optional[RootCache] = None, max_connections: int = 100, transport: Optional[TransportConfig] = None, metrics: Optional[Metrics] = None):
+        """
+        Initialize the asyncio SDK client. No I/O happens until the first request; use it as an
+        async context manager, or call close(), to release its connections.
+
+        Args:
+            api_key: Your API key
+            base_url: Base URL for the API (defaults to production)
+            proof_cache: Cache shared by this client's queues for proofs and decoders (defaults to an in-memory LRU)
+            address_book: The address book, loaded on first use (defaults to the production address book, cached on disk)
+            root_cache: Cache shared by this client's queues for manageRoot reads (defaults to a RootCache with the default TTL)
+            max_connections: Size of the connection pool shared by API and RPC requests
+            transport: Timeouts and retries of API requests (defaults to TransportConfig()). Its
+                pool_size is not used; the pool is sized by max_connections.
+            metrics: Instrumentation hooks of this client and its queues (disabled by default)
+        """
+        self.nucleus_api_key = nucleus_api_key
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.transport = transport if transport is not None else TransportConfig()
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.proof_cache = proof_cache if proof_cache is not None else ProofCache()
+        # Manage trees loaded by queues, keyed by root
+        self.manage_trees: Dict[str, ManageTree] = {}
+        # Packed argument addresses returned by decoders and sanitizers, or why they rejected the call, keyed by (decoder, calldata)
+        self.packed_arguments_cache = PackedArgumentsCache()
+        self.root_cache = root_cache if root_cache is not None else RootCache()
+        self.root_cache.subscribe(self._on_root_change)
+        # Transactions prepared by this client's queues that are not yet committed or discarded
+        self.prepared_transactions: "weakref.WeakSet[PreparedTransaction]" = weakref.WeakSet()
+        # Latest fee state of every chain with a running ChainStateWatcher, keyed by chain ID
+        self.chain_states: Dict[int, "ChainState"] = {}
+
+        self.address_book = address_book if address_book is not None else AddressBook()
+        self.session: Optional[aiohttp.ClientSession] = None
+        self._web3s: Dict[str, "AsyncWeb3"] = {}
+        self._nonce_managers: Dict[tuple, NonceManager] = {}
+        self._nonce_managers_lock = threading.Lock()
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        self._web3s.clear()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Returns the shared HTTP session, creating it on the running event loop."""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_connections))
+        return self.session
+
+    async def get_web3(self, rpc_url: str) -> "AsyncWeb3":
+        """
+        Returns the AsyncWeb3 instance for an RPC URL. Instances are reused per URL and share the
+        client's connection pool.
+        """
+        w3 = self._web3s.get(rpc_url)
+        if w3 is None:
+            from web3 import AsyncWeb3, AsyncHTTPProvider
+            provider = AsyncHTTPProvider(rpc_url)
+            await provider.cache_async_session(self._get_session())
+            w3 = self._web3s[rpc_url] = AsyncWeb3(provider)
+        return w3
+
+    def get_nonce_manager(self, w3: "AsyncWeb3", chain_id: int, address: str) -> NonceManager:
+        """
+        Returns the nonce manager of an account on a chain, shared by every queue of this client.
+
+        Args:
+            w3: A AsyncWeb3 instance for the chain
+            chain_id: The chain ID
+            address: The account address
+        """
+        key = (int(chain_id), address.lower())
+        with self._nonce_managers_lock:
+            if key not in self._nonce_managers:
+                self._nonce_managers[key] = NonceManager(w3, address)
+            return self._nonce_managers[key]
+
+    def _on_root_change(self, key: RootKey, old_root: str, new_root: str) -> None:
+        """Drops everything cached for a root once the manager stops using it, and invalidates the transactions prepared for it."""
+        self.proof_cache.drop_root(old_root)
+        self.manage_trees.pop(old_root, None)
+        for prepared in list(self.prepared_transactions):
+            if prepared.key == key:
+                prepared.invalidate(f"the root changed from {old_root} to {new_root}")
+
+    async def load_address_book(self) -> AddressBook:
+        """Loads the address book on first use, without blocking the event loop on the download."""
+        await self.address_book.async_load(self._get_session())
+        return self.address_book
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """
+        Internal method to make HTTP requests.
+
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            endpoint: API endpoint (e.g., "/users")
+            **kwargs: Additional request parameters
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            APIError: If the request fails once retries are exhausted, or the response is not JSON
+        """
+        url = f"{self.base_url}{endpoint}"
+        stage = "api." + endpoint.split("/")[0]
+        with self.metrics.stage(stage, method=method):
+            return await self._request_with_retries(method, url, stage, **kwargs)
+
+    async def _request_with_retries(self, method: str, url: str, stage: str, **kwargs) -> Dict[str, Any]:
+        """Sends a request, retrying failures according to the transport config."""
+        transport = self.transport
+        timeout = aiohttp.ClientTimeout(sock_connect=transport.connect_timeout, sock_read=transport.read_timeout)
+
+        for attempt in range(transport.retries + 1):
+            try:
+                async with self._get_session().request(method, url, headers=default_headers(self.nucleus_api_key), timeout=timeout, **kwargs) as response:
+                    text = await response.text()
+                    if response.status not in transport.retry_statuses or attempt == transport.retries:
+                        if self.metrics.enabled:
+                            self.metrics.size(stage + ".response_bytes", len(text), method=method)
+                        return parse_response(response.status, response.reason, text, url)
+                    retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == transport.retries:
+                    raise APIError(f"Request to {url} failed: {e!r}", status_code=None)
+                retry_after = None
+            await asyncio.sleep(transport.delay(attempt, retry_after))
+
+    async def create_calldata_queue(self, chain_id: int, strategist_address: str, rpc_url: str, symbol: str) -> AsyncCalldataQueue:
+        await self.load_address_book()
+        queue = AsyncCalldataQueue(chain_id, strategist_address, rpc_url, symbol, self, await self.get_web3(rpc_url))
+        queue._set_root(await queue._read_root())
+        return queue
+
+    async def build_calldata_queues(self, specs: Sequence[QueueSpec], submit: bool = False, verify: bool = False, max_concurrency: int = BATCH_MAX_WORKERS) -> List[QueueResult]:
+        """
+        See Client.build_calldata_queues. The queues run as concurrent tasks on the event loop, at most
+        max_concurrency at once.
+        """
+        try:
+            # Loaded once up front rather than downloaded by every task
+            await self.load_address_book()
+        except Exception as e:
+            return [QueueResult(spec, error=e) for spec in specs]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def build(spec: QueueSpec) -> QueueResult:
+            async with semaphore:
+                return await self._build_queue(spec, submit, verify)
+        return list(await asyncio.gather(*(build(spec) for spec in specs)))
+
+    async def _build_queue(self, spec: QueueSpec, submit: bool, verify: bool) -> QueueResult:
+        """Processes one spec of build_calldata_queues, capturing its error."""
+        queue = None
+        try:
+            queue = await self.create_calldata_queue(spec.chain_id, spec.strategist_address, spec.rpc_url, spec.symbol)
+            fill_queue(queue, spec)
+            if submit and spec.account is not None:
+                nonce_manager = self.get_nonce_manager(queue.w3, spec.chain_id, spec.account.address)
+                return QueueResult(spec, queue, tx_hash=await queue.execute(queue.w3, spec.account, nonce_manager))
+            return QueueResult(spec, queue, calldata=await queue.get_calldata(verify))
+        except Exception as e:
+            return QueueResult(spec, queue, error=e)
+
+    async def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make a GET request."""
+        return await self._request("GET", endpoint, params=params)
+
+    async def post(self, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make a POST request."""
+        return await self._request("POST", endpoint, json=data)
@@ -0,0 +1,53 @@
+from typing import Any, Callable, NamedTuple, Optional, Sequence, Tuple
+
+# A queued call: (target address, function signature, arguments, value)
+CallSpec = Tuple[str, str, Sequence[Any], int]
+
+class QueueSpec(NamedTuple):
+    """
+    One queue of a batch built by Client.build_calldata_queues.
+
+    Args:
+        chain_id: The chain ID
+        strategist_address: The strategist address
+        rpc_url: RPC URL of the chain
+        symbol: The vault symbol
+        calls: Calls added with add_call, in order
+        build: Called with the queue after calls are added, e.g. to add atomic groups or batches
+        account: The strategist account. When set and the batch submits, the queue is executed with it.
+    """
+    chain_id: int
+    strategist_address: str
+    rpc_url: str
+    symbol: str
+    calls: Sequence[CallSpec] = ()
+    build: Optional[Callable[[Any], Any]] = None
+    account: Optional[Any] = None
+
+class QueueResult(NamedTuple):
+    """
+    The outcome of one QueueSpec.
+
+    Args:
+        spec: The spec
+        queue: The queue, or None if creating it failed
+        calldata: The manage calldata, when the queue was built but not submitted
+        tx_hash: The transaction hash, when the queue was submitted
+        error: The exception that stopped this queue, None on success
+    """
+    spec: QueueSpec
+    queue: Optional[Any] = None
+    calldata: Optional[bytes] = None
+    tx_hash: Optional[Any] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def fill_queue(queue: Any, spec: QueueSpec) -> None:
+    """Adds the calls of a spec to its queue, then runs its build callback."""
+    for target_address, function_signature, args, value in spec.calls:
+        queue.add_call(target_address, function_signature, args, value)
+    if spec.build is not None:
+        spec.build(queue)
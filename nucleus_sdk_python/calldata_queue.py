@@ -1,172 +1,971 @@
-from typing import List, Dict, Any, TYPE_CHECKING
+from typing import List, Dict, Any, Callable, Iterator, Optional, Sequence, Tuple, Union, TYPE_CHECKING
 from .exceptions import *
-from .utils import encode_with_signature
+from .utils import compile_signature, encode_with_signature, to_checksum_address
+from .proof_cache import leaf_key, ProofEntry
+from .merkle import ManageTree, manage_leaf_digest, verify_proofs
+from .root_cache import root_key
+from .nonce_manager import NonceManager
+from .prepared import PreparedTransaction
+from .snapshot import QueueSnapshot, dump_snapshot, load_snapshot, read_snapshot
+from .calls import Call, CallStore, MANAGE_SIGNATURE, encode_manage_call
+from .planner import calldata_gas, encoded_call_size, plan_chunks
+from .config import MERKLE_TREE_ENDPOINT, MANAGE_TX_MAX_GAS, MANAGE_TX_MAX_CALLDATA_BYTES, DEFAULT_CALL_GAS, PREPARED_FEE_MULTIPLIERS, CHAIN_STATE_MAX_AGE, RPC_POOL_SIZE
 import json
-from web3 import Web3
+import os
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 if TYPE_CHECKING:
     from nucleus_sdk_python.client import Client
 
+MANAGE_ROOT_ABI = [{
+    "inputs": [{"type": "address", "name": "strategist"}],
+    "name": "manageRoot",
+    "outputs": [{"type": "bytes32"}],
+    "stateMutability": "view",
+    "type": "function"
+}]
+
+ZERO_ROOT = "0x0000000000000000000000000000000000000000000000000000000000000000"
+
 class CalldataQueue:
     def __init__(self, chain_id: int, strategist_address: str, rpc_url: str, symbol: str, client: 'Client'):
         """
         Initialize a CalldataQueue instance.
-        
+
         Args:
             client: The SDK client for executing calls
         """
+        self._init_state(chain_id, strategist_address, rpc_url, symbol, client)
+        self.w3 = client.get_web3(rpc_url)
+
+        self.root = self._read_root()
+
+    def _init_state(self, chain_id: int, strategist_address: str, rpc_url: str, symbol: str, client: Any) -> None:
+        """
+        Resolves the manager address and sets up the empty queue. Performs no network I/O.
+        """
         # TODO: Read this from the address book as the ChainID
         network_string = str(chain_id)
-        
-        self.client = client
+
         try:
-            self.manager_address = client.address_book[network_string]["nucleus"][symbol]["manager"]
+            with client.metrics.stage("address_book.lookup"):
+                manager_address = client.address_book.lookup(network_string, "nucleus", symbol)["manager"]
         except KeyError as e:
             raise InvalidInputsError(f"Could not find manager address for network '{network_string}' and symbol '{symbol}'. Please check the network and symbol are valid.")
-        
+        self._init_fields(chain_id, manager_address, strategist_address, rpc_url, client)
+
+    def _init_fields(self, chain_id: int, manager_address: str, strategist_address: str, rpc_url: Optional[str], client: Any) -> None:
+        """
+        Sets up the empty queue for a known manager.
+        """
+        self.client = client
+        self.manager_address = manager_address
         self.chain_id = chain_id
         self.rpc_url = rpc_url
         self.strategist_address = strategist_address
+        self.root: Optional[str] = None
+        self.w3 = None
+        # Root published by a ChainStateWatcher thread, applied on the caller's thread by _apply_pending_root
+        self._pending_root: Optional[str] = None
+        self._pending_root_lock = threading.Lock()
+
+        self.calls = CallStore()
+        # Group of every queued call; calls of a group are never split across manage transactions
+        self._call_groups: List[int] = []
+        self._atomic_group: Optional[int] = None
+        self.tree: Optional[ManageTree] = None
+        # Per stage durations (seconds) of the last execute call
+        self.last_execution_timings: Dict[str, float] = {}
+
+    @classmethod
+    def from_snapshot(cls, client: 'Client', source: Union[bytes, bytearray, memoryview, str, "os.PathLike"], rpc_url: Optional[str] = None) -> "CalldataQueue":
+        """
+        Rebuilds a queue from a snapshot made by to_snapshot, without any network I/O: the manager,
+        root and encoded calls come from the snapshot, and its proofs, if any, are added to the
+        client's proof cache so that get_calldata and execute do not request them again.
+
+        The root is not checked against the chain; call refresh_root() to do so.
+
+        Args:
+            client: The SDK client
+            source: The snapshot bytes, or the path of a snapshot file (read through a memory map)
+            rpc_url: RPC URL of the queue's chain, needed by refresh_root and verify_proofs
+
+        Raises:
+            InvalidInputsError: If source is not a valid snapshot
+        """
+        queue = cls._from_snapshot(client, source, rpc_url)
+        queue.w3 = client.get_web3(rpc_url) if rpc_url is not None else None
+        return queue
+
+    @classmethod
+    def _from_snapshot(cls, client: Any, source: Union[bytes, bytearray, memoryview, str, "os.PathLike"], rpc_url: Optional[str]) -> "CalldataQueue":
+        """Restores everything but the Web3 instance, see from_snapshot."""
+        snapshot = read_snapshot(source) if isinstance(source, (str, os.PathLike)) else load_snapshot(source)
+        queue = cls.__new__(cls)
+        queue._init_fields(snapshot.chain_id, snapshot.manager_address, snapshot.strategist_address, rpc_url, client)
+        queue.root = snapshot.root
+        queue.calls = snapshot.calls
+        queue._call_groups = snapshot.call_groups
+        if snapshot.proofs is not None:
+            client.proof_cache.set_many(snapshot.root, [
+                (f"{snapshot.chain_id}:{queue.calls.key(idx)}", (["0x" + word.hex() for word in proof], decoder))
+                for idx, (proof, decoder) in enumerate(zip(snapshot.proofs, snapshot.decoders))
+            ])
+        return queue
+
+    def to_snapshot(self, include_proofs: bool = False) -> bytes:
+        """
+        Serializes the queue to the compact binary snapshot format (see nucleus_sdk_python.snapshot):
+        chain, manager, strategist, root, the encoded calls and their atomic groups. Restore it with
+        CalldataQueue.from_snapshot, e.g. in another process.
+
+        Args:
+            include_proofs: Resolve the proofs and decoders of every call (from the proof cache or the
+                API) and store them too, so that the restored queue needs no API request to execute
+
+        Returns:
+            The snapshot bytes
+        """
+        self._apply_pending_root()
+        batch_results = None
+        if include_proofs:
+            batch_results = self._get_batch_proofs_and_decoders()
+            self._convert_proofs(batch_results)
+        return dump_snapshot(self._snapshot(batch_results))
+
+    def _snapshot(self, batch_results: Optional[Dict[str, List[Any]]]) -> QueueSnapshot:
+        """Builds the snapshot of the queue, with the proofs of batch_results if given."""
+        snapshot = QueueSnapshot(self.chain_id, self.manager_address, self.strategist_address, self.root, self.calls, self._call_groups)
+        if batch_results is not None:
+            snapshot = snapshot._replace(proofs=batch_results["proofs"], decoders=batch_results["decoderAndSanitizerAddress"])
+        return snapshot
+
+    def _read_root(self, use_cache: bool = True) -> str:
+        """
+        Reads the strategist's manageRoot, from the client's root cache when it holds a fresh value,
+        otherwise from the manager contract.
+
+        Args:
+            use_cache: Set to False to always read the manager contract
+
+        Returns:
+            The root as a 0x prefixed hex string
+        """
+        key = root_key(self.chain_id, self.manager_address, self.strategist_address)
+        metrics = self.client.metrics
+        if use_cache:
+            root = self.client.root_cache.get(key)
+            if metrics.enabled:
+                metrics.count("root_cache.hit" if root is not None else "root_cache.miss")
+            if root is not None:
+                return root
+
+        # web3 and requests are only imported once a queue touches the chain
+        import requests
+        from web3.exceptions import ProviderConnectionError
 
-        # Get root from manager contract
-        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        manager_contract = self.w3.eth.contract(address=self.manager_address, abi=MANAGE_ROOT_ABI)
         try:
-            w3.eth.get_block('latest')
-        except Exception as e:
-            raise InvalidInputsError(f"Could not connect to RPC URL '{rpc_url}'. Please check the RPC URL is valid and accessible.")
-            
-        manager_contract = w3.eth.contract(
-            address=self.manager_address,
-            abi=[{
-                "inputs": [{"type": "address", "name": "strategist"}],
-                "name": "manageRoot",
-                "outputs": [{"type": "bytes32"}],
-                "stateMutability": "view",
-                "type": "function"
-            }]
-        )
-        self.root = manager_contract.functions.manageRoot(strategist_address).call().hex()
-
-        if self.root[0:2] != "0x":
-            self.root = "0x" + self.root
-
-        if self.root == "0x0000000000000000000000000000000000000000000000000000000000000000":
-            raise InvalidInputsError(f"Could not find root for strategist '{strategist_address}'. Please check the strategist address is valid.")
-        
-        self.calls: List[Dict[str, Any]] = []
+            with metrics.stage("rpc.manage_root"):
+                raw_root = manager_contract.functions.manageRoot(self.strategist_address).call()
+        except (requests.exceptions.RequestException, ProviderConnectionError, OSError) as e:
+            raise InvalidInputsError(f"Could not connect to RPC URL '{self.rpc_url}'. Please check the RPC URL is valid and accessible.")
+
+        root = self._format_root(raw_root)
+        self.client.root_cache.set(key, root)
+        return root
+
+    def _format_root(self, raw_root: bytes) -> str:
+        """
+        Formats a manageRoot return value as a 0x prefixed hex string, rejecting unset roots.
+        """
+        root = raw_root.hex()
+
+        if root[0:2] != "0x":
+            root = "0x" + root
+
+        if root == ZERO_ROOT:
+            raise InvalidInputsError(f"Could not find root for strategist '{self.strategist_address}'. Please check the strategist address is valid.")
+        return root
+
+    def refresh_root(self) -> bool:
+        """
+        Re-reads manageRoot from the manager contract, bypassing the root cache. If the root changed,
+        every cached proof for the previous root is dropped from the client's proof cache.
+
+        Returns:
+            True if the root changed
+        """
+        return self._set_root(self._read_root(use_cache=False))
+
+    def _set_root(self, root: str) -> bool:
+        """
+        Switches the queue to a new root, dropping the cached proofs and tree of the previous one.
+
+        Returns:
+            True if the root changed
+        """
+        with self._pending_root_lock:
+            # The root being set is newer than one published by a watcher before
+            self._pending_root = None
+        if root == self.root:
+            return False
+        if self.root is not None:
+            self.client.proof_cache.drop_root(self.root)
+            self.client.manage_trees.pop(self.root, None)
+        self.root = root
+        self.tree = None
+        return True
+
+    def _follow_root(self, root: str) -> None:
+        """
+        Publishes a new root from another thread, e.g. a ChainStateWatcher. The queue switches to it at
+        the start of its next get_calldata, get_split_calldata, execute, prepare, load_tree or to_snapshot.
+        """
+        with self._pending_root_lock:
+            self._pending_root = root
+
+    def _apply_pending_root(self) -> None:
+        """Switches to the root published by _follow_root, if any, on the caller's thread."""
+        with self._pending_root_lock:
+            root, self._pending_root = self._pending_root, None
+        if root is not None:
+            self._set_root(root)
+
+    def load_tree(self, path: Optional[str] = None) -> ManageTree:
+        """
+        Loads the manage tree behind the current root so that proofs and decoders are served locally
+        instead of by the proof API. The tree is rebuilt locally and rejected if it does not match the
+        on-chain root. Loaded trees are shared between the client's queues.
+
+        Args:
+            path: Path of a merkle tree JSON file. The tree is downloaded from the API when omitted.
+
+        Returns:
+            The loaded tree
+        """
+        self._apply_pending_root()
+        tree = self.client.manage_trees.get(self.root)
+        if tree is None:
+            if path is not None:
+                tree = ManageTree.from_file(path, self.root)
+            else:
+                data = self.client.get(MERKLE_TREE_ENDPOINT + self.root, params={"chain": self.chain_id})
+                tree = ManageTree.from_json(data, self.root)
+            self.client.manage_trees[self.root] = tree
+        self.tree = tree
+        return tree
 
     def add_call(self, target_address: str, function_signature: str, args: List[any], value: int) -> None:
         """
         Add a call to the queue.
-        
+
         Args:
             target_address: The address of the target contract
             function_signature: The function signature to call
             args: The arguments to pass to the function
             value: The value to send with the call
+
+        Raises:
+            InvalidInputsError: If the arguments, target or value are invalid
         """
-        data = encode_with_signature(function_signature, args)
-        self.calls.append({
-            "target_address": target_address,
-            "data": data,
-            "value": value,
-            "args": args,
-            "function_signature": function_signature,
-            "proof_data": [],
-            "decoder_and_sanitizer": ""
-        })
+        metrics = self.client.metrics
+        with metrics.stage("add_call"):
+            try:
+                data = compile_signature(function_signature).encode(args)
+            except Exception as e:
+                raise InvalidInputsError(f"Could not encode {function_signature}: {e}")
+            self.calls.append(target_address, data, value)
+        if metrics.enabled:
+            metrics.size("add_call.calldata_bytes", len(data))
+        self._call_groups.append(self._atomic_group if self._atomic_group is not None else len(self.calls) - 1)
 
-    def get_calldata(self) -> List[Dict[str, Any]]:
+    def add_calls_batch(self, target_addresses: Union[str, Sequence[str]], function_signature: str, rows: Sequence[Sequence[Any]], values: Union[int, Sequence[int]] = 0) -> None:
+        """
+        Add many calls to the same function to the queue in one step.
+
+        The signature is compiled once. When every argument has a static elementary type (address,
+        bool, intN, uintN, bytesN) the rows are encoded column by column instead of call by call.
+        Nothing is queued if any row is invalid.
+
+        Args:
+            target_addresses: The target of every call, or one target shared by all of them
+            function_signature: The function signature to call
+            rows: The arguments of every call
+            values: The value of every call, or one value shared by all of them
+
+        Raises:
+            InvalidInputsError: If a row, target or value is invalid, or the lengths do not match
+        """
+        count = len(rows)
+        targets = [target_addresses] * count if isinstance(target_addresses, str) else list(target_addresses)
+        values = [values] * count if isinstance(values, int) else list(values)
+        if len(targets) != count or len(values) != count:
+            raise InvalidInputsError(f"Got {count} rows, {len(targets)} targets and {len(values)} values; they must match.")
+
+        with self.client.metrics.stage("add_calls_batch", rows=count):
+            try:
+                datas = compile_signature(function_signature).encode_rows(rows)
+            except ValueError as e:
+                raise InvalidInputsError(f"Could not encode {function_signature}: {e}")
+            self.calls.extend(targets, datas, values)
+        first = len(self._call_groups)
+        if self._atomic_group is not None:
+            self._call_groups.extend([self._atomic_group] * count)
+        else:
+            self._call_groups.extend(range(first, first + count))
+
+    @contextmanager
+    def atomic(self) -> Iterator[None]:
+        """
+        Keeps the calls added inside the block in the same manage transaction when the queue is split,
+        e.g. an approve and the swap spending the allowance.
+
+            with queue.atomic():
+                queue.add_call(token, "approve(address,uint256)", [router, amount], 0)
+                queue.add_call(router, "swap(...)", [...], 0)
+        """
+        if self._atomic_group is not None:
+            # Nested blocks join the outer group
+            yield
+            return
+        self._atomic_group = len(self.calls)
+        try:
+            yield
+        finally:
+            self._atomic_group = None
+
+    def get_calldata(self, verify: bool = False) -> List[Dict[str, Any]]:
         """
         Get the formatted calldata using batched proofs and decoders.
-        
+
+        Args:
+            verify: Verify every proof locally against the root before encoding (see verify_proofs)
+
         Returns:
             The encoded calldata (with batched proofs, decoders, targets, data, and values)
+
+        Raises:
+            ProofVerificationError: If verify is set and any proof is invalid
+        """
+        self._apply_pending_root()
+        with self.client.metrics.stage("get_calldata"):
+            # Get batch proofs and decoders from the nucleus API
+            batch_results = self._get_batch_proofs_and_decoders()
+            self._convert_proofs(batch_results)
+
+            if verify:
+                self._raise_for_failures(self.verify_proofs(batch_results["proofs"], batch_results["decoderAndSanitizerAddress"]))
+
+            calldata = self._encode_manage_call(batch_results)
+        self._report_calldata_size(calldata)
+        return calldata
+
+    def _report_calldata_size(self, calldata: bytes) -> None:
+        """Emits the size of an encoded manage call to the client's metrics."""
+        if self.client.metrics.enabled:
+            self.client.metrics.size("manage_calldata_bytes", len(calldata), calls=len(self.calls))
+
+    def _convert_proofs(self, batch_results: Dict[str, List[Any]]) -> None:
+        """
+        Converts hex string proofs to bytes, in place.
         """
-        # Build an array of leaves for every call
-        leaves = []
-        for call in self.calls:
-            # Recalculate calldata as a hex string (consistent with _get_proof_and_decoder)
-            encoded_calldata = encode_with_signature(call["function_signature"], call["args"])
-            encoded_calldata_hex = "0x" + encoded_calldata.hex()
-            leaf = {
-                "target": call["target_address"],
-                "calldata": encoded_calldata_hex,
-                "value": call["value"]
-            }
-            leaves.append(leaf)
-        
-        # Get batch proofs and decoders from the nucleus API
-        batch_results = self._get_batch_proofs_and_decoders(leaves)
-        
-        targets = []
-        data = []
-        values = []
-
-        # Convert hex string proofs to bytes
         batch_results["proofs"] = [
             [bytes.fromhex(proof[2:]) for proof in proof_set]
             for proof_set in batch_results["proofs"]
         ]
 
+    def _encode_manage_call(self, batch_results: Dict[str, List[Any]], indices: Optional[List[int]] = None) -> bytes:
+        """
+        Encodes the manageVaultWithMerkleVerification call for the queued calls.
+
+        Args:
+            batch_results: The proofs (as bytes) and decoders of every queued call
+            indices: Encode only these calls, in this order (defaults to every queued call)
+        """
+        if indices is None:
+            return encode_manage_call(self.calls, batch_results["proofs"], batch_results["decoderAndSanitizerAddress"])
+        proofs = [batch_results["proofs"][idx] for idx in indices]
+        decoders = [batch_results["decoderAndSanitizerAddress"][idx] for idx in indices]
+        return encode_manage_call(self.calls, proofs, decoders, indices)
+
+    def get_split_calldata(self, max_gas: int = MANAGE_TX_MAX_GAS, max_calldata_bytes: int = MANAGE_TX_MAX_CALLDATA_BYTES, gas_estimator: Optional[Callable[[Call], int]] = None, verify: bool = False) -> List[bytes]:
+        """
+        Splits the queue into several manage transactions, each under the gas and calldata size budgets.
+        Calls keep their queue order and calls added in an atomic() block stay in the same transaction.
+        The proofs of every transaction are fetched in a single batch request.
+
+        Args:
+            max_gas: Gas budget of one transaction
+            max_calldata_bytes: Calldata size budget of one transaction
+            gas_estimator: Returns the execution gas of a queued Call. Defaults to DEFAULT_CALL_GAS per call.
+                The calldata gas is added on top.
+            verify: Verify every proof locally against the root before encoding (see verify_proofs)
+
+        Returns:
+            The encoded calldata of every transaction, in execution order
+
+        Raises:
+            InvalidInputsError: If an atomic group alone exceeds a budget
+            ProofVerificationError: If verify is set and any proof is invalid
+        """
+        self._apply_pending_root()
+        batch_results = self._get_batch_proofs_and_decoders()
+        self._convert_proofs(batch_results)
+
+        if verify:
+            self._raise_for_failures(self.verify_proofs(batch_results["proofs"], batch_results["decoderAndSanitizerAddress"]))
+
+        chunks = self._plan_split(batch_results, max_gas, max_calldata_bytes, gas_estimator)
+        return [self._encode_manage_call(batch_results, chunk) for chunk in chunks]
+
+    def _plan_split(self, batch_results: Dict[str, List[Any]], max_gas: int, max_calldata_bytes: int, gas_estimator: Optional[Callable[[Call], int]]) -> List[List[int]]:
+        """
+        Partitions the queued calls into manage transactions, see get_split_calldata.
+
+        Returns:
+            The call indices of every transaction
+        """
+        sizes = []
+        gases = []
+        for call, proof in zip(self.calls, batch_results["proofs"]):
+            size = encoded_call_size(len(call.data), len(proof))
+            execution_gas = gas_estimator(call) if gas_estimator is not None else DEFAULT_CALL_GAS
+            # The ABI heads are charged as non-zero bytes, which overestimates slightly
+            sizes.append(size)
+            gases.append(execution_gas + calldata_gas(call.data) + 16 * (size - len(call.data)))
+
+        groups: List[List[int]] = []
+        for idx, group in enumerate(self._call_groups):
+            if groups and self._call_groups[groups[-1][0]] == group:
+                groups[-1].append(idx)
+            else:
+                groups.append([idx])
+        return plan_chunks(groups, sizes, gases, max_gas, max_calldata_bytes)
+
+    def verify_proofs(self, proofs: List[List[bytes]], decoders: List[str]) -> List[Dict[str, Any]]:
+        """
+        Verifies the proofs of the queued calls against the current root without submitting anything.
+        Each leaf is hashed the way the manager contract does, then its proof is walked up to the root.
+
+        The packed argument addresses of a leaf always come from the decoder and sanitizer itself (one
+        batched eth_call for the calls not seen before), never from the proof source being checked.
+
+        Args:
+            proofs: The proof of every queued call, as bytes
+            decoders: The decoder and sanitizer address of every queued call
+
+        Returns:
+            One dictionary per failed call with its "index", "target" and a "reason". Empty if every proof is valid.
+        """
+        keys, packed, missing = self._cached_packed_argument_addresses(decoders)
+        if missing:
+            fresh = self._store_packed_argument_addresses(missing, self._call_decoders(missing))
+            packed = [fresh[key] if output is None else output for key, output in zip(keys, packed)]
+        return self._check_proofs(proofs, decoders, packed)
+
+    def _call_decoders(self, keys: List[tuple]) -> List[Union[bytes, Exception]]:
+        """
+        Calls the decoder and sanitizer of every (decoder, calldata) key, in one batch when possible.
+
+        Returns:
+            The result of every call, or the ContractLogicError of the calls that reverted
+        """
+        from web3.exceptions import ContractLogicError
+
+        calls = [{"to": to_checksum_address(decoder), "data": calldata} for decoder, calldata in keys]
+        try:
+            with self.w3.batch_requests() as batch:
+                for call in calls:
+                    batch.add(self.w3.eth.call(call))
+                return list(batch.execute())
+        except Exception:
+            # A batch fails as a whole when one call reverts, and not every provider accepts batches;
+            # retry call by call so that reverts are reported per call
+            pass
+
+        def call_decoder(call):
+            try:
+                return self.w3.eth.call(call)
+            except ContractLogicError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(len(calls), RPC_POOL_SIZE)) as executor:
+            return list(executor.map(call_decoder, calls))
+
+    def _check_proofs(self, proofs: List[List[bytes]], decoders: List[str], packed: List[Union[bytes, str]]) -> List[Dict[str, Any]]:
+        """
+        Hashes the leaf of every queued call and walks its proof up to the root.
+
+        Args:
+            proofs: The proof of every queued call, as bytes
+            decoders: The decoder and sanitizer address of every queued call
+            packed: The packed argument addresses of every call, or the reason the decoder and sanitizer
+                rejected it
+
+        Returns:
+            One dictionary per failed call, see verify_proofs
+        """
+        failures = []
+        digests = []
         for idx, call in enumerate(self.calls):
-            targets.append(call["target_address"])
-            data.append(call["data"])
-            values.append(call["value"])
-        
-        args = [batch_results["proofs"], batch_results["decoderAndSanitizerAddress"], targets, data, values]
-        return encode_with_signature("manageVaultWithMerkleVerification(bytes32[][],address[],address[],bytes[],uint256[])", args)
+            if not isinstance(packed[idx], bytes):
+                failures.append({"index": idx, "target": call.target_address, "reason": f"decoder and sanitizer rejected the call: {packed[idx]}"})
+                digests.append(b"")
+                continue
+            digests.append(manage_leaf_digest(decoders[idx], call.target_address, call.value > 0, call.data[:4], packed[idx]))
+
+        failed = {failure["index"] for failure in failures}
+        for idx in verify_proofs(bytes.fromhex(self.root[2:]), proofs, digests):
+            if idx not in failed:
+                failures.append({"index": idx, "target": self.calls.target(idx), "reason": "proof does not lead to the root"})
+        return sorted(failures, key=lambda failure: failure["index"])
+
+    def _raise_for_failures(self, failures: List[Dict[str, Any]]) -> None:
+        """
+        Raises a ProofVerificationError listing every failed call, if any.
+        """
+        if failures:
+            details = "; ".join(f"call {failure['index']} to {failure['target']}: {failure['reason']}" for failure in failures)
+            raise ProofVerificationError(f"{len(failures)} of {len(self.calls)} proofs do not verify against root {self.root}: {details}", failures)
 
-    def execute(self, w3, acc) -> Any:
+    def _cached_packed_argument_addresses(self, decoders: List[str]) -> Tuple[List[tuple], List[Optional[Union[bytes, str]]], List[tuple]]:
+        """
+        Looks up the (decoder, calldata) key of every queued call in the client's cache.
+
+        Returns:
+            The key and cached output (None for misses) of every call, and the unique missed keys
+        """
+        keys = [(decoder.lower(), self.calls.hex_data(idx)) for idx, decoder in enumerate(decoders)]
+        packed = self.client.packed_arguments_cache.get_many(keys)
+        return keys, packed, list(dict.fromkeys(key for key, output in zip(keys, packed) if output is None))
+
+    def _store_packed_argument_addresses(self, keys: List[tuple], responses: List[Union[bytes, Exception]]) -> Dict[tuple, Union[bytes, str]]:
+        """
+        Decodes decoder and sanitizer eth_call results into the client's cache. Decoders are pure
+        functions of the calldata, so their results, reverts included, are kept until evicted.
+        A revert is stored as its reason.
+
+        Returns:
+            The decoded output of every key
+        """
+        from eth_abi import decode
+
+        outputs = {}
+        for key, response in zip(keys, responses):
+            if isinstance(response, Exception):
+                outputs[key] = f"reverted ({response})" if str(response) else "reverted"
+            else:
+                try:
+                    outputs[key] = decode(["bytes"], response)[0]
+                except Exception:
+                    outputs[key] = "returned malformed data"
+        self.client.packed_arguments_cache.set_many(outputs.items())
+        return outputs
+
+    def execute(self, w3, acc, nonce_manager: Optional[NonceManager] = None) -> Any:
         """
         Execute the queued calls.
-        
+
+        The nonce, gas estimate and gas price are read in a single JSON-RPC batch request, or
+        concurrently when the provider does not support batching. The duration of every stage is
+        recorded in last_execution_timings (seconds).
+
+        Args:
+            w3: A Web3 instance for the queue's chain
+            acc: The strategist account
+            nonce_manager: Allocates the nonce locally instead of reading it from the chain, so that
+                several transactions of the strategist can be in flight at once (see Client.get_nonce_manager)
+
         Returns:
             Result of the execution
         """
-        if not self.calls:
-            raise ValueError("No calls to execute")
-        
-        if self.strategist_address != acc.address:
-            raise ValueError("Strategist address does not match the account address")
+        self._check_can_execute(acc)
+        timings = self.last_execution_timings = {}
+
+        try:
+            with self.client.metrics.stage("execute"):
+                start = time.perf_counter()
+                calldata = self.get_calldata()
+                timings["get_calldata"] = time.perf_counter() - start
+
+                return self._submit(w3, acc, calldata, timings, nonce_manager)
+        finally:
+            self._report_timings(timings)
+
+    def _report_timings(self, timings: Dict[str, float]) -> None:
+        """Emits the stage durations of an execution to the client's metrics."""
+        metrics = self.client.metrics
+        if metrics.enabled:
+            for name, seconds in timings.items():
+                metrics.timing("execute." + name, seconds)
+
+    def execute_split(self, w3, acc, nonce_manager: Optional[NonceManager] = None, wait: bool = True, max_gas: int = MANAGE_TX_MAX_GAS, max_calldata_bytes: int = MANAGE_TX_MAX_CALLDATA_BYTES, gas_estimator: Optional[Callable[[Call], int]] = None) -> List[Any]:
+        """
+        Executes the queued calls as several manage transactions, in sequence (see get_split_calldata).
+
+        By default every transaction is mined before the next one is estimated and sent, and a reverted
+        transaction stops the sequence. With wait=False the transactions are sent back to back with
+        locally allocated nonces; their gas is then estimated against the state before the earlier ones.
+
+        Args:
+            w3: A Web3 instance for the queue's chain
+            acc: The strategist account
+            nonce_manager: See execute. Defaults to the client's nonce manager of the strategist when wait is False.
+            wait: Wait for every transaction's receipt before sending the next one
+            max_gas: Gas budget of one transaction
+            max_calldata_bytes: Calldata size budget of one transaction
+            gas_estimator: See get_split_calldata
+
+        Returns:
+            The transaction hash of every transaction
+
+        Raises:
+            ProtocolError: If a transaction reverts. The transactions before it stay executed.
+        """
+        self._check_can_execute(acc)
+        calldatas = self.get_split_calldata(max_gas, max_calldata_bytes, gas_estimator)
+        if nonce_manager is None and not wait:
+            nonce_manager = self.client.get_nonce_manager(w3, self.chain_id, acc.address)
+
+        tx_hashes = []
+        for idx, calldata in enumerate(calldatas):
+            timings = self.last_execution_timings = {}
+            tx_hash = self._submit(w3, acc, calldata, timings, nonce_manager)
+            tx_hashes.append(tx_hash)
+            if wait:
+                receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+                if receipt["status"] != 1:
+                    raise ProtocolError(f"Manage transaction {idx + 1} of {len(calldatas)} ({tx_hash.hex()}) reverted; the transactions after it were not sent.")
+        return tx_hashes
+
+    def _submit(self, w3, acc, calldata: bytes, timings: Dict[str, float], nonce_manager: Optional[NonceManager] = None) -> Any:
+        """
+        Signs and sends a manage transaction, see execute.
+
+        Returns:
+            The transaction hash
+        """
+        nonce = nonce_manager.next_nonce() if nonce_manager is not None else None
+        try:
+            nonce, gas, gas_price = self._fetch_tx_fields(w3, acc, calldata, timings, nonce)
+            tx = self._build_tx(acc, calldata, nonce, gas, gas_price)
+
+            start = time.perf_counter()
+            raw_transaction = w3.eth.account.sign_transaction(tx, acc.key)['raw_transaction']
+            timings["sign"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            tx_hash = w3.eth.send_raw_transaction(raw_transaction)
+            timings["send_raw_transaction"] = time.perf_counter() - start
+        except Exception:
+            # The allocated nonce was not used; other threads may hold later nonces, see NonceManager.release_nonce
+            if nonce_manager is not None:
+                nonce_manager.release_nonce(nonce)
+            raise
+        if nonce_manager is not None:
+            nonce_manager.mark_broadcast(nonce)
+        return tx_hash
+
+    def prepare(self, w3, acc, nonce_manager: Optional[NonceManager] = None, fee_multipliers: Sequence[float] = PREPARED_FEE_MULTIPLIERS) -> PreparedTransaction:
+        """
+        Does all the work of execute() except broadcasting: fetches the proofs, reads the next nonce, gas
+        estimate and gas price, and signs the manage transaction once per fee variant. The returned
+        PreparedTransaction is broadcast with commit(), which only sends the raw transaction.
+
+        The transaction holds the calls queued now; calls added later are not part of it. It is
+        invalidated when the strategist's root, the account's next nonce or the gas price move away from
+        what it was signed for (see PreparedTransaction).
+
+        Args:
+            w3: A Web3 instance for the queue's chain
+            acc: The strategist account
+            nonce_manager: Nonce manager the nonce is peeked from and claimed from on commit (defaults to
+                the client's nonce manager of the strategist)
+            fee_multipliers: Gas price of every fee variant, relative to the current gas price
+
+        Returns:
+            The prepared transaction
+        """
+        self._check_can_execute(acc)
+        timings = self.last_execution_timings = {}
+
+        try:
+            with self.client.metrics.stage("prepare"):
+                start = time.perf_counter()
+                calldata = self.get_calldata()
+                timings["get_calldata"] = time.perf_counter() - start
+
+                if nonce_manager is None:
+                    nonce_manager = self.client.get_nonce_manager(w3, self.chain_id, acc.address)
+                nonce, gas, gas_price = self._fetch_tx_fields(w3, acc, calldata, timings, nonce_manager.peek_nonce())
+                return self._sign_prepared(w3, acc, calldata, nonce_manager, nonce, gas, gas_price, fee_multipliers, timings)
+        finally:
+            self._report_timings(timings)
+
+    def _sign_prepared(self, w3, acc, calldata: bytes, nonce_manager: NonceManager, nonce: int, gas: int, gas_price: int, fee_multipliers: Sequence[float], timings: Dict[str, float]) -> PreparedTransaction:
+        """
+        Signs the fee variants of a prepared transaction and registers it with the client, so that a root
+        change invalidates it.
+        """
+        gas_prices = sorted({int(gas_price * multiplier) for multiplier in fee_multipliers})
+        if not gas_prices:
+            raise InvalidInputsError("At least one fee multiplier is required.")
+
+        start = time.perf_counter()
+        raw_transactions = [w3.eth.account.sign_transaction(self._build_tx(acc, calldata, nonce, gas, price), acc.key)['raw_transaction'] for price in gas_prices]
+        timings["sign"] = time.perf_counter() - start
 
-        calldata = self.get_calldata()
-        tx = {
+        key = root_key(self.chain_id, self.manager_address, self.strategist_address)
+        prepared = PreparedTransaction(w3, key, self.root, nonce_manager, nonce, gas, gas_prices, raw_transactions)
+        prepared.observe_gas_price(gas_price)
+        self.client.prepared_transactions.add(prepared)
+        # The root may have changed while the transaction was prepared
+        current_root = self.client.root_cache.get(key)
+        if current_root is not None and current_root != self.root:
+            prepared.invalidate(f"the root changed from {self.root} to {current_root}")
+        return prepared
+
+    def _build_tx(self, acc, calldata: bytes, nonce: int, gas: int, gas_price: int) -> Dict[str, Any]:
+        """
+        Builds the manage transaction.
+        """
+        return {
             "from": acc.address,
             "to": self.manager_address,
             "data": calldata,
             "value": 0,
-            "nonce": w3.eth.get_transaction_count(acc.address),
-            "gas": w3.eth.estimate_gas({
-                "from": acc.address,
-                "to": self.manager_address,
-                "data": calldata
-            }),
-            "gasPrice": w3.eth.gas_price,
+            "nonce": nonce,
+            "gas": gas,
+            "gasPrice": gas_price,
             "chainId": int(self.chain_id)
         }
-        return w3.eth.send_raw_transaction(w3.eth.account.sign_transaction(tx, acc.key)['raw_transaction'])
 
-    def _get_batch_proofs_and_decoders(self, leaves: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    def _fetch_tx_fields(self, w3, acc, calldata: bytes, timings: Dict[str, float], nonce: Optional[int] = None) -> Tuple[int, int, int]:
         """
-        Gets multiple proofs and decoders from the nucleus API by posting an array of leaves.
-        
+        Reads the nonce, gas estimate and gas price of the manage transaction in one round trip.
+
+        A JSON-RPC batch is tried first, in which case the round trip is recorded as "rpc_batch". If the
+        provider rejects batches, the calls run concurrently and are timed individually.
+
         Args:
-            leaves: Array of leaf dictionaries. Each leaf should include:
-                    - "target": The target contract address
-                    - "calldata": The encoded calldata (as a hex string, starting with "0x")
-                    - "value": The value to send with the call
-                    - "chain": The chain ID (this could be added automatically via self.chain_id if desired)
-                    
+            nonce: The nonce, when it is allocated locally. It is then not read from the chain.
+
+        Returns:
+            The nonce, gas estimate and gas price. The gas price is taken from a ChainStateWatcher
+            instead of the chain when one keeps it up to date.
+        """
+        from web3.exceptions import ContractLogicError
+
+        estimate = {"from": acc.address, "to": self.manager_address, "data": calldata}
+        gas_price = self._watched_gas_price()
+        reads = [("estimate_gas", lambda: w3.eth.estimate_gas(estimate))]
+        if gas_price is None:
+            reads.append(("gas_price", lambda: w3.eth.gas_price))
+        if nonce is None:
+            reads.insert(0, ("get_transaction_count", lambda: w3.eth.get_transaction_count(acc.address)))
+
+        start = time.perf_counter()
+        try:
+            with w3.batch_requests() as batch:
+                for name, read in reads:
+                    batch.add(read())
+                results = batch.execute()
+            timings["rpc_batch"] = time.perf_counter() - start
+        except ContractLogicError:
+            raise
+        except Exception:
+            # Not every provider or node accepts batches; fall back to concurrent requests
+            def timed(name, read):
+                start = time.perf_counter()
+                result = read()
+                timings[name] = time.perf_counter() - start
+                return result
+
+            with ThreadPoolExecutor(max_workers=len(reads)) as executor:
+                futures = [executor.submit(timed, name, read) for name, read in reads]
+                results = [future.result() for future in futures]
+
+        results = list(results)
+        if nonce is not None:
+            results.insert(0, nonce)
+        if gas_price is not None:
+            results.append(gas_price)
+        return tuple(results)
+
+    def _watched_gas_price(self) -> Optional[int]:
+        """The gas price kept up to date by a ChainStateWatcher, or None without a recent one."""
+        state = self.client.chain_states.get(self.chain_id)
+        if state is None or time.monotonic() - state.updated_at > CHAIN_STATE_MAX_AGE:
+            return None
+        return state.gas_price
+
+    def _check_can_execute(self, acc) -> None:
+        """
+        Checks the queue is not empty and the account is the queue's strategist.
+        """
+        if not self.calls:
+            raise ValueError("No calls to execute")
+
+        if self.strategist_address != acc.address:
+            raise ValueError("Strategist address does not match the account address")
+
+    def _get_batch_proofs_and_decoders(self) -> Dict[str, List[Any]]:
+        """
+        Gets the proofs and decoders of every queued call from the nucleus API by posting an array of
+        leaves (see _leaf).
+
         Returns:
            A dictionary with a list for proofs and decoderAndSanitizerAddresses
         """
-        # Post the array of leaves to the batch endpoint.
-        response = self.client.post("multiproofs/" + self.root, data={"chain": self.chain_id, "calls": leaves})
-        print("response: ", response)
-        assert len(response["proofs"]) == len(response["decoderAndSanitizerAddress"])
+        # Only unique leaves missing from the proof cache and the local tree are posted to the batch endpoint
+        keys, entries, leaves, misses = self._lookup_proofs()
 
-        return response
+        if misses:
+            response = self.client.post("multiproofs/" + self.root, data={"chain": self.chain_id, "calls": [leaves[idx] for idx in misses]})
+            self._merge_proofs(keys, entries, misses, response)
+
+        return {
+            "proofs": [entry[0] for entry in entries],
+            "decoderAndSanitizerAddress": [entry[1] for entry in entries]
+        }
+
+    def _leaf(self, idx: int) -> Dict[str, Any]:
+        """
+        The leaf of a queued call, as posted to the proof API, built from the call store on demand:
+        "target", "calldata" (hex, starting with "0x") and "value".
+        """
+        return {"target": self.calls.target(idx), "calldata": self.calls.hex_data(idx), "value": self.calls.value(idx)}
+
+    def _lookup_proofs(self) -> Tuple[List[str], List[Optional[ProofEntry]], Dict[int, Dict[str, Any]], List[int]]:
+        """
+        Resolves the queued calls from the proof cache, then from the local tree.
+
+        Returns:
+            The cache key and the resolved entry (None for misses) of every call, the leaf of the first
+            occurrence of every distinct call the proof cache missed (see _leaf), and the index of those
+            the local tree did not resolve either (see _merge_proofs)
+        """
+        keys, entries, leaves = self._cached_proofs()
+        self._fetch_tree_decoders(list(leaves.values()))
+        return keys, entries, leaves, self._resolve_proofs(keys, entries, leaves)
+
+    def _cached_proofs(self) -> Tuple[List[str], List[Optional[ProofEntry]], Dict[int, Dict[str, Any]]]:
+        """
+        Looks up every queued call in the proof cache. Leaves are only built for the misses.
+
+        Returns:
+            The cache key and the cached entry (None for misses) of every call, and the leaf of the first
+            occurrence of every distinct missed call, by call index
+        """
+        prefix = f"{self.chain_id}:"
+        keys = [prefix + key for key in self.calls.keys]
+        entries = self.client.proof_cache.get_many(self.root, keys)
+        # Identical calls share a leaf, so each distinct leaf is built once
+        first = {}
+        for idx, entry in enumerate(entries):
+            if entry is None:
+                first.setdefault(keys[idx], idx)
+        return keys, entries, {idx: self._leaf(idx) for idx in first.values()}
+
+    def _fetch_tree_decoders(self, leaves: List[Dict[str, Any]]) -> None:
+        """
+        Calls the candidate decoders of leaves into the client's cache (see _tree_decoder_keys).
+        A failed call leaves the leaves to the API.
+        """
+        keys = self._tree_decoder_keys(leaves)
+        if keys:
+            try:
+                self._store_packed_argument_addresses(keys, self._call_decoders(keys))
+            except Exception as e:
+                self.client.metrics.error("proof_tree.decoders", e, chain_id=self.chain_id)
+
+    def _tree_decoder_keys(self, leaves: List[Dict[str, Any]]) -> List[tuple]:
+        """
+        The unique (decoder, calldata) keys, missing from the client's cache, of the candidate decoders of
+        every leaf. The local tree needs their output to resolve a leaf (see ManageTree.find_leaf).
+        Empty without a local tree or a Web3 instance, in which case the leaves are left to the API.
+        """
+        if self.tree is None or self.w3 is None:
+            return []
+        keys = {}
+        for leaf in leaves:
+            for decoder in self.tree.decoders_for(leaf["target"], bytes.fromhex(leaf["calldata"][2:]), leaf["value"]):
+                keys[(decoder.lower(), leaf["calldata"])] = None
+        keys = list(keys)
+        return [key for key, output in zip(keys, self.client.packed_arguments_cache.get_many(keys)) if output is None]
+
+    def _tree_proof_and_decoder(self, leaf: Dict[str, Any]) -> Optional[ProofEntry]:
+        """
+        Resolves a leaf from the local tree, using the outputs of its candidate decoders in the client's
+        cache. None when there is no tree, or when no output decides the leaf.
+        """
+        if self.tree is None:
+            return None
+        try:
+            return self.tree.proof_and_decoder(leaf, self._cached_decoder_outputs(leaf["target"], leaf["calldata"], leaf["value"]))
+        except ProtocolError:
+            return None
+
+    def _cached_decoder_outputs(self, target: str, calldata: str, value: int) -> Dict[str, bytes]:
+        """
+        The packed argument addresses the candidate decoders of a call returned, from the client's cache,
+        keyed by lowercase decoder address. Decoders not called yet, or which rejected the call, are left out.
+        """
+        decoders = [decoder.lower() for decoder in self.tree.decoders_for(target, bytes.fromhex(calldata[2:]), value)]
+        outputs = self.client.packed_arguments_cache.get_many([(decoder, calldata) for decoder in decoders])
+        # Reverts and malformed outputs are cached as a reason string
+        return {decoder: output for decoder, output in zip(decoders, outputs) if isinstance(output, bytes)}
+
+    def _resolve_proofs(self, keys: List[str], entries: List[Optional[ProofEntry]], leaves: Dict[int, Dict[str, Any]]) -> List[int]:
+        """
+        Resolves the leaves the proof cache missed from the local tree, filling entries at every position
+        of each resolved leaf.
+
+        Returns:
+            The index of the first occurrence of every distinct call left to the API
+        """
+        metrics = self.client.metrics
+        cache_misses = entries.count(None)
+        resolved = {}
+        if self.tree is not None:
+            for idx, leaf in leaves.items():
+                entry = self._tree_proof_and_decoder(leaf)
+                if entry is not None:
+                    resolved[keys[idx]] = entry
+        if resolved:
+            for idx, entry in enumerate(entries):
+                if entry is None:
+                    entries[idx] = resolved.get(keys[idx])
+        # Leaves the local tree cannot resolve are left to the API
+        misses = [idx for idx in leaves if keys[idx] not in resolved]
+
+        if metrics.enabled:
+            unresolved = entries.count(None)
+            metrics.count("proof_cache.hit", len(entries) - cache_misses)
+            metrics.count("proof_cache.miss", cache_misses)
+            metrics.count("proof_tree.hit", cache_misses - unresolved)
+            metrics.count("multiproofs.duplicate_leaves", unresolved - len(misses))
+        return misses
+
+    def _merge_proofs(self, keys: List[str], entries: List[Optional[ProofEntry]], misses: List[int], response: Dict[str, Any]) -> None:
+        """
+        Stores the proofs the API returned for the missed leaves in the proof cache, and in entries
+        at every position of each leaf.
+        """
+        if self.client.metrics.enabled:
+            self.client.metrics.size("multiproofs.leaves", len(misses))
+        assert len(response["proofs"]) == len(response["decoderAndSanitizerAddress"]) == len(misses)
+
+        fresh = {keys[idx]: entry for idx, entry in zip(misses, zip(response["proofs"], response["decoderAndSanitizerAddress"]))}
+        self.client.proof_cache.set_many(self.root, list(fresh.items()))
+        for idx, entry in enumerate(entries):
+            if entry is None:
+                entries[idx] = fresh[keys[idx]]
 
     def _get_proof_and_decoder(self, target, signature, args, value):
         """
@@ -182,6 +981,15 @@ class CalldataQueue:
             "chain": self.chain_id
         }
 
+        cache = self.client.proof_cache
+        key = leaf_key(self.chain_id, leaf)
+        entry = cache.get_many(self.root, [key])[0]
+        if entry is None and self.tree is not None:
+            self._fetch_tree_decoders([leaf])
+            entry = self._tree_proof_and_decoder(leaf)
+        if entry is not None:
+            return {"proof": [bytes.fromhex(hash[2:]) for hash in entry[0]], "decoderAndSanitizerAddress": entry[1]}
+
         data = self.client.post("proofs/"+self.root, data=leaf)
 
         new_proof = []
@@ -190,7 +998,9 @@ class CalldataQueue:
                 new_proof.append(bytes.fromhex(hash[2:]))
         except KeyError as e:
             raise ProtocolError(f"Error decoding proof from the API.")
-        
+
+        if "decoderAndSanitizerAddress" in data:
+            cache.set_many(self.root, [(key, (data['proof'], data["decoderAndSanitizerAddress"]))])
         data['proof'] = new_proof
 
-        return data
\ No newline at end of file
+        return data
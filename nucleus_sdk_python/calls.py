@@ -0,0 +1,228 @@
+from array import array
+from collections.abc import Sequence
+from typing import List, NamedTuple, Optional
+from .exceptions import InvalidInputsError
+from .proof_cache import call_key
+from .utils import compile_signature, is_address
+
+MANAGE_SIGNATURE = "manageVaultWithMerkleVerification(bytes32[][],address[],address[],bytes[],uint256[])"
+
+_ZERO_WORD = bytes(32)
+_ADDRESS_PADDING = bytes(12)
+
+class Call(NamedTuple):
+    """
+    A queued call. Immutable and without a per-instance __dict__.
+
+    :param target_address: The address of the target contract
+    :param value: The value sent with the call
+    :param data: The encoded calldata, including the function selector
+    """
+    target_address: str
+    value: int
+    data: bytes
+
+class CallStore(Sequence):
+    """
+    Compact storage of the calls of a queue.
+
+    The encoded calldata of every call is concatenated in a single bytearray and addressed by
+    offsets, so a queue holds a few small objects per call instead of a dictionary and a bytes
+    object. Indexing returns a Call record; encoding reads the calldata straight from the buffer.
+    The proof cache key of every call (see proof_cache.call_key) is built once, when it is stored.
+    """
+
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array("Q", [0])
+        self._targets: List[str] = []
+        self._values: List[int] = []
+        self._keys: List[str] = []
+
+    def append(self, target_address: str, data: bytes, value: int) -> None:
+        """
+        Appends a call.
+
+        :param target_address: The address of the target contract
+        :param data: The encoded calldata
+        :param value: The value to send with the call
+        :raises InvalidInputsError: If the target is not a valid address or the value is not a uint256
+        """
+        if not is_address(target_address):
+            raise InvalidInputsError(f"Invalid target address '{target_address}'.")
+        if not isinstance(value, int) or not 0 <= value < 2 ** 256:
+            raise InvalidInputsError(f"Invalid value '{value}'. The value must be a uint256.")
+        self._data += data
+        self._offsets.append(len(self._data))
+        self._targets.append(target_address)
+        self._values.append(value)
+        self._keys.append(call_key(target_address, "0x" + data.hex(), value))
+
+    def extend(self, target_addresses: List[str], datas: List[bytes], values: List[int]) -> None:
+        """
+        Appends many calls in one step. Every call is validated before any is stored.
+
+        :param target_addresses: The target of every call
+        :param datas: The encoded calldata of every call
+        :param values: The value of every call
+        :raises InvalidInputsError: See append
+        """
+        for target_address in set(target_addresses):
+            if not is_address(target_address):
+                raise InvalidInputsError(f"Invalid target address '{target_address}'.")
+        for value in values:
+            if not isinstance(value, int) or not 0 <= value < 2 ** 256:
+                raise InvalidInputsError(f"Invalid value '{value}'. The value must be a uint256.")
+        end = len(self._data)
+        for data in datas:
+            end += len(data)
+            self._offsets.append(end)
+        self._data += b"".join(datas)
+        self._targets.extend(target_addresses)
+        self._values.extend(values)
+        self._keys.extend(call_key(target_address, "0x" + data.hex(), value) for target_address, data, value in zip(target_addresses, datas, values))
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def __getitem__(self, idx: int) -> Call:
+        if idx < 0:
+            idx += len(self._targets)
+        if not 0 <= idx < len(self._targets):
+            raise IndexError("call index out of range")
+        return Call(self._targets[idx], self._values[idx], bytes(memoryview(self._data)[self._offsets[idx]:self._offsets[idx + 1]]))
+
+    def target(self, idx: int) -> str:
+        """The target address of a call."""
+        return self._targets[idx]
+
+    def value(self, idx: int) -> int:
+        """The value of a call."""
+        return self._values[idx]
+
+    def hex_data(self, idx: int) -> str:
+        """The calldata of a call as a 0x-prefixed hex string, read from the buffer without a copy."""
+        return "0x" + memoryview(self._data)[self._offsets[idx]:self._offsets[idx + 1]].hex()
+
+    def key(self, idx: int) -> str:
+        """The proof cache key of a call, without the chain ID (see proof_cache.leaf_key)."""
+        return self._keys[idx]
+
+    @property
+    def keys(self) -> List[str]:
+        """The key of every call, see key."""
+        return self._keys
+
+    def data_length(self, idx: int) -> int:
+        """The length of a call's calldata."""
+        return self._offsets[idx + 1] - self._offsets[idx]
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the stored calldata."""
+        return len(self._data)
+
+    @property
+    def buffer(self) -> memoryview:
+        """Read-only view of the concatenated calldata of every call."""
+        return memoryview(self._data).toreadonly()
+
+    @property
+    def offsets(self) -> array:
+        """Start of every call's calldata in buffer, followed by the end of the last one."""
+        return self._offsets
+
+    @classmethod
+    def from_buffers(cls, target_addresses: List[str], values: List[int], data: bytes, offsets: array) -> "CallStore":
+        """
+        Builds a store from the parts of another store (see buffer and offsets), copying data in one
+        step. The calls are not validated again.
+
+        :param target_addresses: The target of every call
+        :param values: The value of every call
+        :param data: The concatenated calldata of every call
+        :param offsets: The "Q" array of calldata offsets, one more than there are calls
+        """
+        store = cls()
+        store._data = bytearray(data)
+        store._offsets = offsets
+        store._targets = target_addresses
+        store._values = values
+        with memoryview(store._data) as view:
+            store._keys = [
+                call_key(target_address, "0x" + view[offsets[idx]:offsets[idx + 1]].hex(), value)
+                for idx, (target_address, value) in enumerate(zip(target_addresses, values))
+            ]
+        return store
+
+def _word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+def _address_word(address: str) -> bytes:
+    return _ADDRESS_PADDING + bytes.fromhex(address[2:] if address[:2] in ("0x", "0X") else address)
+
+def encode_manage_call(calls: CallStore, proofs: List[List[bytes]], decoders: List[str], indices: Optional[List[int]] = None) -> bytes:
+    """
+    Encodes a manageVaultWithMerkleVerification call, writing the ABI encoding directly into one
+    buffer. Produces the same bytes as eth_abi for (bytes32[][], address[], address[], bytes[], uint256[]).
+
+    :param calls: The queued calls
+    :param proofs: The proof of every call in indices, as bytes
+    :param decoders: The decoder and sanitizer address of every call in indices
+    :param indices: Encode only these calls, in this order (defaults to every call)
+    :return: The calldata, including the function selector
+    """
+    if indices is None:
+        indices = range(len(calls))
+    count = len(indices)
+    offsets = calls._offsets
+
+    # Every argument is a dynamic array: a length word, then either its elements or offsets to them
+    proofs_size = 32 + 32 * count + sum(32 + 32 * len(proof) for proof in proofs)
+    addresses_size = 32 + 32 * count
+    data_size = 32 + 32 * count + sum(32 + 32 * ((offsets[idx + 1] - offsets[idx] + 31) // 32) for idx in indices)
+
+    out = bytearray(compile_signature(MANAGE_SIGNATURE).selector)
+    head = 5 * 32
+    for size in (proofs_size, addresses_size, addresses_size, data_size):
+        out += _word(head)
+        head += size
+    out += _word(head)
+
+    # bytes32[][] proofs
+    out += _word(count)
+    tail = 32 * count
+    for proof in proofs:
+        out += _word(tail)
+        tail += 32 + 32 * len(proof)
+    for proof in proofs:
+        out += _word(len(proof))
+        for node in proof:
+            out += node
+
+    # address[] decoders and address[] targets
+    out += _word(count)
+    for decoder in decoders:
+        out += _address_word(decoder)
+    out += _word(count)
+    for idx in indices:
+        out += _address_word(calls._targets[idx])
+
+    # bytes[] data, copied from the call store without intermediate objects
+    out += _word(count)
+    tail = 32 * count
+    for idx in indices:
+        out += _word(tail)
+        tail += 32 + 32 * ((offsets[idx + 1] - offsets[idx] + 31) // 32)
+    with memoryview(calls._data) as view:
+        for idx in indices:
+            start, end = offsets[idx], offsets[idx + 1]
+            out += _word(end - start)
+            out += view[start:end]
+            out += _ZERO_WORD[:-(end - start) % 32]
+
+    # uint256[] values
+    out += _word(count)
+    for idx in indices:
+        out += _word(calls._values[idx])
+    return bytes(out)
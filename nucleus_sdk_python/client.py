@@ -1,42 +1,127 @@
-import json
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, List, Sequence, TYPE_CHECKING
 from .exceptions import APIError
 from .calldata_queue import CalldataQueue
-from .config import address_book_endpoint, DEFAULT_BASE_URL
-from .utils import checksum_addresses_in_json
-from importlib.metadata import version
+from .proof_cache import BaseProofCache, PackedArgumentsCache, ProofCache
+from .merkle import ManageTree
+from .address_book import AddressBook
+from .root_cache import RootCache, RootKey
+from .nonce_manager import NonceManager
+from .prepared import PreparedTransaction
+from .transport import TransportConfig, parse_response
+from .metrics import Metrics, NULL_METRICS
+from .batch import QueueSpec, QueueResult, fill_queue
+from .config import DEFAULT_BASE_URL, RPC_POOL_SIZE, BATCH_MAX_WORKERS
+
+if TYPE_CHECKING:
+    from web3 import Web3
+    from .watcher import ChainState
+
+def default_headers(nucleus_api_key: str) -> Dict[str, str]:
+    """Default headers sent with every API request."""
+    from importlib.metadata import version
+    try:
+        sdk_version = version("nucleus_sdk_python")
+    except:
+        sdk_version = "unknown"
+
+    return {
+        "x-api-key": f"{nucleus_api_key}",
+        "Content-Type": "application/json",
+        "User-Agent": f"NucleusManagerSDKPython/{sdk_version}"
+    }
+
 class Client:
-    def __init__(self, nucleus_api_key: str, base_url: str = DEFAULT_BASE_URL):
+    def __init__(self, nucleus_api_key: str, base_url: str = DEFAULT_BASE_URL, proof_cache: Optional[BaseProofCache] = None, address_book: Optional[AddressBook] = None, root_cache: Optional[RootCache] = None, transport: Optional[TransportConfig] = None, metrics: Optional[Metrics] = None):
         """
         Initialize the SDK client.
         
         Args:
             api_key: Your API key
             base_url: Base URL for the API (defaults to production)
+            proof_cache: Cache shared by this client's queues for proofs and decoders (defaults to an in-memory LRU)
+            address_book: The address book, loaded on first access (defaults to the production address book, cached on disk)
+            root_cache: Cache shared by this client's queues for manageRoot reads (defaults to a RootCache with the default TTL)
+            transport: Timeouts, retries and pool size of API requests (defaults to TransportConfig())
+            metrics: Instrumentation hooks of this client and its queues (disabled by default)
         """
         self.nucleus_api_key = nucleus_api_key
-
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.transport = transport if transport is not None else TransportConfig()
+        self.proof_cache = proof_cache if proof_cache is not None else ProofCache()
+        # Manage trees loaded by queues, keyed by root
+        self.manage_trees: Dict[str, ManageTree] = {}
+        # Packed argument addresses returned by decoders and sanitizers, or why they rejected the call, keyed by (decoder, calldata)
+        self.packed_arguments_cache = PackedArgumentsCache()
+        self.root_cache = root_cache if root_cache is not None else RootCache()
+        self.root_cache.subscribe(self._on_root_change)
+        # Transactions prepared by this client's queues that are not yet committed or discarded
+        self.prepared_transactions: "weakref.WeakSet[PreparedTransaction]" = weakref.WeakSet()
+        # Latest fee state of every chain with a running ChainStateWatcher, keyed by chain ID
+        self.chain_states: Dict[int, "ChainState"] = {}
 
         self.base_url = base_url
         self.session = requests.Session()
         self._setup_session()
 
-        res = requests.get(address_book_endpoint)
-        self.address_book= checksum_addresses_in_json(json.loads(res.text))
+        # Keep-alive session shared by every RPC provider of this client
+        self.rpc_session = requests.Session()
+        self.rpc_session.mount("http://", HTTPAdapter(pool_maxsize=RPC_POOL_SIZE))
+        self.rpc_session.mount("https://", HTTPAdapter(pool_maxsize=RPC_POOL_SIZE))
+        self._web3s: Dict[str, "Web3"] = {}
+        self._web3s_lock = threading.Lock()
+        self._nonce_managers: Dict[tuple, NonceManager] = {}
+        self._nonce_managers_lock = threading.Lock()
+
+        self.address_book = address_book if address_book is not None else AddressBook()
 
     def _setup_session(self):
-        """Configure the HTTP session with default headers."""
-        try:
-            sdk_version = version("nucleus_sdk_python")
-        except:
-            sdk_version = "unknown"
-            
-        self.session.headers.update({
-            "x-api-key": f"{self.nucleus_api_key}",
-            "Content-Type": "application/json",
-            "User-Agent": f"NucleusManagerSDKPython/{sdk_version}"
-        })
+        """Configure the HTTP session with default headers, retries and connection pooling."""
+        self.session.headers.update(default_headers(self.nucleus_api_key))
+        adapter = HTTPAdapter(max_retries=self.transport.retry(), pool_maxsize=self.transport.pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get_web3(self, rpc_url: str) -> "Web3":
+        """
+        Returns the Web3 instance for an RPC URL. Instances are reused per URL and share the client's
+        pooled keep-alive connections. web3 is imported on the first call.
+        """
+        w3 = self._web3s.get(rpc_url)
+        if w3 is None:
+            from web3 import Web3
+            with self._web3s_lock:
+                w3 = self._web3s.get(rpc_url)
+                if w3 is None:
+                    w3 = self._web3s[rpc_url] = Web3(Web3.HTTPProvider(rpc_url, session=self.rpc_session))
+        return w3
+
+    def get_nonce_manager(self, w3: "Web3", chain_id: int, address: str) -> NonceManager:
+        """
+        Returns the nonce manager of an account on a chain, shared by every queue of this client.
+
+        Args:
+            w3: A Web3 instance for the chain
+            chain_id: The chain ID
+            address: The account address
+        """
+        key = (int(chain_id), address.lower())
+        with self._nonce_managers_lock:
+            if key not in self._nonce_managers:
+                self._nonce_managers[key] = NonceManager(w3, address)
+            return self._nonce_managers[key]
+
+    def _on_root_change(self, key: RootKey, old_root: str, new_root: str) -> None:
+        """Drops everything cached for a root once the manager stops using it, and invalidates the transactions prepared for it."""
+        self.proof_cache.drop_root(old_root)
+        self.manage_trees.pop(old_root, None)
+        for prepared in list(self.prepared_transactions):
+            if prepared.key == key:
+                prepared.invalidate(f"the root changed from {old_root} to {new_root}")
 
     def _request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """
@@ -51,23 +136,58 @@ class Client:
             Parsed JSON response
             
         Raises:
-            APIError: If the request fails
+            APIError: If the request fails once retries are exhausted, or the response is not JSON
         """
         url = f"{self.base_url}{endpoint}"
+        stage = "api." + endpoint.split("/")[0]
         
-        try:
-            response = self.session.request(method, url, **kwargs)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            message = json.loads(e.response.text).get("message")
-            if message:
-                raise APIError(message, status_code=e.response.status_code)
-            else:
-                raise APIError(str(e), status_code=e.response.status_code)
+        with self.metrics.stage(stage, method=method):
+            try:
+                response = self.session.request(method, url, timeout=self.transport.timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                raise APIError(f"Request to {url} failed: {e}", status_code=None)
+            if self.metrics.enabled:
+                self.metrics.size(stage + ".response_bytes", len(response.content), method=method)
+            return parse_response(response.status_code, response.reason, response.text, url)
 
     def create_calldata_queue(self, chain_id: int, strategist_address: str, rpc_url: str, symbol: str) -> CalldataQueue:
         return CalldataQueue(chain_id, strategist_address, rpc_url, symbol, self)
+
+    def build_calldata_queues(self, specs: Sequence[QueueSpec], submit: bool = False, verify: bool = False, max_workers: int = BATCH_MAX_WORKERS) -> List[QueueResult]:
+        """
+        Builds many queues, across vaults and chains, concurrently on a bounded thread pool. Every queue
+        is created (reading its root), filled from its spec and encoded with its proofs; with submit,
+        the queues whose spec has an account are executed instead, nonces being allocated by the
+        client's nonce managers so that queues of the same strategist do not collide.
+
+        A failing queue does not affect the others: its exception is returned in its result.
+
+        Args:
+            specs: The queues to build
+            submit: Execute the queues whose spec has an account
+            verify: Verify every proof locally before encoding (see CalldataQueue.get_calldata)
+            max_workers: Maximum number of queues processed at once
+
+        Returns:
+            The result of every spec, in the order of specs
+        """
+        if not specs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(specs))) as executor:
+            return list(executor.map(lambda spec: self._build_queue(spec, submit, verify), specs))
+
+    def _build_queue(self, spec: QueueSpec, submit: bool, verify: bool) -> QueueResult:
+        """Processes one spec of build_calldata_queues, capturing its error."""
+        queue = None
+        try:
+            queue = self.create_calldata_queue(spec.chain_id, spec.strategist_address, spec.rpc_url, spec.symbol)
+            fill_queue(queue, spec)
+            if submit and spec.account is not None:
+                nonce_manager = self.get_nonce_manager(queue.w3, spec.chain_id, spec.account.address)
+                return QueueResult(spec, queue, tx_hash=queue.execute(queue.w3, spec.account, nonce_manager))
+            return QueueResult(spec, queue, calldata=queue.get_calldata(verify))
+        except Exception as e:
+            return QueueResult(spec, queue, error=e)
     
     def get(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Make a GET request."""
@@ -1,2 +1,57 @@
+import os
+
 address_book_endpoint = "https://api.nucleusearn.io/prod/address-book-chain-id"
 DEFAULT_BASE_URL = "https://api.nucleusearn.io/merkle/"
+
+# Maximum number of distinct function signatures kept compiled by utils.compile_signature
+SIGNATURE_CACHE_SIZE = 512
+
+# Maximum number of proofs kept by the default in-memory proof cache of a Client
+PROOF_CACHE_SIZE = 10000
+
+# Maximum number of decoder and sanitizer outputs (packed argument addresses per decoder and calldata)
+# kept by a Client
+PACKED_ARGUMENTS_CACHE_SIZE = 10000
+
+# API endpoint (relative to the base URL) serving the full manage tree of a root
+MERKLE_TREE_ENDPOINT = "tree/"
+
+# On-disk cache of the address book, how long it is used before revalidation (seconds) and the download timeout
+ADDRESS_BOOK_CACHE_PATH = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "nucleus_sdk_python", "address_book.json")
+ADDRESS_BOOK_TTL = 3600
+ADDRESS_BOOK_TIMEOUT = 10
+
+# Seconds a manageRoot read is reused by the queues of a client
+ROOT_CACHE_TTL = 30
+
+# Maximum number of keep-alive connections per RPC host
+RPC_POOL_SIZE = 20
+
+# Default budgets of one manage transaction when a queue is split (see CalldataQueue.get_split_calldata),
+# and the gas assumed per call when no estimator is given
+MANAGE_TX_MAX_GAS = 15_000_000
+MANAGE_TX_MAX_CALLDATA_BYTES = 120_000
+DEFAULT_CALL_GAS = 150_000
+
+# API transport: connect and read timeouts (seconds), retries of failed requests with exponential
+# backoff (seconds, plus up to the jitter), the statuses retried and the keep-alive pool size
+API_CONNECT_TIMEOUT = 5
+API_READ_TIMEOUT = 30
+API_RETRIES = 3
+API_BACKOFF_FACTOR = 0.5
+API_BACKOFF_JITTER = 0.25
+API_BACKOFF_MAX = 10
+API_RETRY_STATUSES = (429, 500, 502, 503, 504)
+API_POOL_SIZE = 10
+
+# Gas price multipliers of the fee variants signed by CalldataQueue.prepare
+PREPARED_FEE_MULTIPLIERS = (1.0, 1.125, 1.25, 1.5)
+
+# Maximum number of queues built concurrently by Client.build_calldata_queues
+BATCH_MAX_WORKERS = 16
+
+# ChainStateWatcher: seconds between reconnection attempts, seconds start() waits for the initial state,
+# and the age (seconds) after which queues stop using a watched gas price and read it from the chain
+WATCHER_RECONNECT_DELAY = 2
+WATCHER_START_TIMEOUT = 30
+CHAIN_STATE_MAX_AGE = 60
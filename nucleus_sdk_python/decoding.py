@@ -0,0 +1,225 @@
+"""
+Decoding of manageVaultWithMerkleVerification calldata, e.g. for historical analysis of manage
+transactions. Like nucleus_sdk_python.encoding, this module does not import web3 or the HTTP clients.
+
+    for calldata in iter_manage_calldata("transactions.jsonl", skip_invalid=True):
+        for call in calldata:
+            print(call.target, call.value, call.decode())
+"""
+import json
+import threading
+from collections.abc import Sequence
+from typing import Any, Dict, IO, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from .calls import MANAGE_SIGNATURE
+from .exceptions import InvalidInputsError
+from .utils import CompiledSignature, compile_signature, to_checksum_address
+
+MANAGE_SELECTOR = compile_signature(MANAGE_SIGNATURE).selector
+
+# Signatures used to decode inner calls: None for the registered signatures, or signatures by selector
+SignatureIndex = Optional[Mapping[bytes, CompiledSignature]]
+
+# Signatures added with register_signatures, by selector. Never evicted.
+_REGISTERED_SIGNATURES: Dict[bytes, CompiledSignature] = {}
+_REGISTERED_SIGNATURES_LOCK = threading.Lock()
+
+def signature_index(signatures: Iterable[str]) -> Dict[bytes, CompiledSignature]:
+    """Compiles function signatures into an index by selector, for ManageCalldata."""
+    return {compiled.selector: compiled for compiled in map(compile_signature, signatures)}
+
+def register_signatures(signatures: Iterable[str]) -> None:
+    """Adds function signatures to the ones ManageCalldata decodes with by default."""
+    index = signature_index(signatures)
+    with _REGISTERED_SIGNATURES_LOCK:
+        _REGISTERED_SIGNATURES.update(index)
+
+def registered_signatures() -> Dict[bytes, CompiledSignature]:
+    """The signatures added with register_signatures, by selector."""
+    with _REGISTERED_SIGNATURES_LOCK:
+        return dict(_REGISTERED_SIGNATURES)
+
+class ManageCallRecord:
+    """
+    One call of a ManageCalldata. Every field is read from the calldata when accessed.
+    """
+    __slots__ = ("calldata", "index")
+
+    def __init__(self, calldata: "ManageCalldata", index: int):
+        self.calldata = calldata
+        self.index = index
+
+    def __repr__(self) -> str:
+        return f"ManageCallRecord(index={self.index}, target={self.target!r}, selector=0x{self.selector.hex()}, value={self.value})"
+
+    @property
+    def target(self) -> str:
+        return self.calldata.target(self.index)
+
+    @property
+    def data(self) -> memoryview:
+        return self.calldata.data(self.index)
+
+    @property
+    def selector(self) -> bytes:
+        return bytes(self.data[:4])
+
+    @property
+    def value(self) -> int:
+        return self.calldata.value(self.index)
+
+    @property
+    def proof(self) -> List[memoryview]:
+        return self.calldata.proof(self.index)
+
+    @property
+    def decoder(self) -> str:
+        return self.calldata.decoder(self.index)
+
+    @property
+    def signature(self) -> Optional[CompiledSignature]:
+        """The signature of the inner call, if known (see ManageCalldata)."""
+        signatures = self.calldata.signatures
+        if signatures is None:
+            signatures = _REGISTERED_SIGNATURES
+        return signatures.get(self.selector)
+
+    def decode(self) -> Optional[Tuple[str, tuple]]:
+        """
+        Decodes the inner call.
+
+        :return: The function signature and the decoded arguments, or None if the signature is unknown
+        :raises ValueError: If the arguments do not decode against the signature
+        """
+        signature = self.signature
+        if signature is None:
+            return None
+        return signature.signature, signature.decode(self.data)
+
+class ManageCalldata(Sequence):
+    """
+    Zero-copy view of a manageVaultWithMerkleVerification call. The outer ABI encoding is checked
+    when the view is created; the calls are then read lazily by slicing a memoryview of the calldata,
+    so inner calldata and proof nodes are returned as memoryviews without being copied.
+
+    :param calldata: The calldata, including the selector
+    :param signatures: Signatures used by ManageCallRecord.decode, by selector (see signature_index).
+        Defaults to the signatures added with register_signatures.
+    :param transaction: The transaction the calldata comes from, when streamed from a file
+    :raises InvalidInputsError: If calldata is not a well-formed manageVaultWithMerkleVerification call
+    """
+
+    def __init__(self, calldata: Union[bytes, bytearray, memoryview], signatures: SignatureIndex = None, transaction: Optional[Dict[str, Any]] = None):
+        self.view = memoryview(calldata)
+        self.signatures = signatures
+        self.transaction = transaction
+        if bytes(self.view[:4]) != MANAGE_SELECTOR:
+            raise InvalidInputsError(f"Calldata with selector 0x{bytes(self.view[:4]).hex()} is not a manageVaultWithMerkleVerification call.")
+
+        # Positions of the length word of every argument: proofs, decoders, targets, data, values
+        self._heads = [4 + self._word(4 + 32 * idx) for idx in range(5)]
+        counts = {self._word(head) for head in self._heads}
+        if len(counts) != 1:
+            raise InvalidInputsError("Invalid manage calldata: the argument arrays have different lengths.")
+        self._count = counts.pop()
+        # Every array holds one word per call: an address, a value or the offset of a dynamic element
+        for head in self._heads:
+            self._check(head + 32, 32 * self._count)
+
+    def _word(self, position: int) -> int:
+        self._check(position, 32)
+        return int.from_bytes(self.view[position:position + 32], "big")
+
+    def _check(self, position: int, length: int) -> None:
+        if position < 0 or position + length > len(self.view):
+            raise InvalidInputsError(f"Invalid manage calldata: {length} bytes at offset {position} are out of bounds.")
+
+    def _index(self, idx: int) -> int:
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("call index out of range")
+        return idx
+
+    def _address(self, argument: int, idx: int) -> str:
+        position = self._heads[argument] + 32 + 32 * self._index(idx)
+        return to_checksum_address(self.view[position + 12:position + 32].hex())
+
+    def _dynamic(self, argument: int, idx: int) -> int:
+        """Position of the length word of element idx of a dynamic array argument."""
+        head = self._heads[argument]
+        return head + 32 + self._word(head + 32 + 32 * self._index(idx))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx: int) -> ManageCallRecord:
+        return ManageCallRecord(self, self._index(idx))
+
+    def target(self, idx: int) -> str:
+        """The target address of call idx."""
+        return self._address(2, idx)
+
+    def decoder(self, idx: int) -> str:
+        """The decoder and sanitizer address of call idx."""
+        return self._address(1, idx)
+
+    def value(self, idx: int) -> int:
+        """The value sent with call idx."""
+        return self._word(self._heads[4] + 32 + 32 * self._index(idx))
+
+    def data(self, idx: int) -> memoryview:
+        """The inner calldata of call idx, as a view into the calldata."""
+        position = self._dynamic(3, idx)
+        length = self._word(position)
+        self._check(position + 32, length)
+        return self.view[position + 32:position + 32 + length]
+
+    def proof(self, idx: int) -> List[memoryview]:
+        """The proof nodes of call idx, as views into the calldata."""
+        position = self._dynamic(0, idx)
+        length = self._word(position)
+        self._check(position + 32, 32 * length)
+        return [self.view[start:start + 32] for start in range(position + 32, position + 32 + 32 * length, 32)]
+
+def _parse_line(line: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Splits a line of a transaction file into the calldata hex and the transaction, if any."""
+    if line.startswith("{"):
+        transaction = json.loads(line)
+        calldata = transaction.get("input", transaction.get("data"))
+        if not isinstance(calldata, str):
+            raise ValueError('the transaction has no "input" or "data" field')
+        return calldata, transaction
+    return line, None
+
+def iter_manage_calldata(source: Union[str, IO[str], Iterable[str]], signatures: SignatureIndex = None, skip_invalid: bool = False) -> Iterator[ManageCalldata]:
+    """
+    Streams the manage calls of a file of transactions, one line at a time, so that files of any
+    size are processed in bounded memory.
+
+    Every non-empty line is either the calldata as hex, or a JSON object with the calldata in its
+    "input" or "data" field (e.g. a transaction as returned by eth_getTransactionByHash). The JSON
+    object is kept in ManageCalldata.transaction.
+
+    :param source: A path, an open text file or any iterable of lines
+    :param signatures: See ManageCalldata
+    :param skip_invalid: Skip lines that are not manage calls instead of raising
+    :return: An iterator over the manage calls
+    :raises InvalidInputsError: If a line is not a manage call and skip_invalid is False, naming the line
+    """
+    if isinstance(source, str):
+        with open(source) as f:
+            yield from iter_manage_calldata(f, signatures, skip_invalid)
+        return
+
+    for line_number, line in enumerate(source, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            calldata, transaction = _parse_line(line)
+            parsed = ManageCalldata(bytes.fromhex(calldata[2:] if calldata[:2] in ("0x", "0X") else calldata), signatures, transaction)
+        except (ValueError, InvalidInputsError) as e:
+            if skip_invalid:
+                continue
+            raise InvalidInputsError(f"Line {line_number}: {e}")
+        yield parsed
@@ -0,0 +1,20 @@
+"""
+Lightweight entry point for offline calldata construction. Only eth_hash is imported up front; eth_abi
+is imported on first use by signatures with dynamic, array or tuple arguments. web3, eth_utils and the
+HTTP clients are not imported.
+
+    from nucleus_sdk_python.encoding import encode_with_signature
+"""
+from .utils import CompiledSignature, compile_signature, encode_with_signature, parse_argument_types
+from .calls import Call, CallStore, MANAGE_SIGNATURE, encode_manage_call
+
+__all__ = [
+    "CompiledSignature",
+    "compile_signature",
+    "encode_with_signature",
+    "parse_argument_types",
+    "Call",
+    "CallStore",
+    "MANAGE_SIGNATURE",
+    "encode_manage_call",
+]
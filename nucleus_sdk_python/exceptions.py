@@ -1,3 +1,5 @@
+from typing import Optional
+
 class SDKError(Exception):
     """Base class for all SDK errors"""
 
@@ -14,8 +16,8 @@ class InvalidInputsError(UserError):
         super().__init__(self.message)
 
 class APIError(SDKError):
-    """Exception raised for API-returned errors. Should be handled to be more specific"""
-    def __init__(self, message: str, status_code: int):
+    """Exception raised for API-returned errors. Should be handled to be more specific. status_code is None when no response was received"""
+    def __init__(self, message: str, status_code: Optional[int]):
         self.message = message
         self.status_code = status_code
         super().__init__(self.message)
@@ -26,3 +28,8 @@ class ProtocolError(SDKError):
         self.message = message
         super().__init__(self.message)
 
+class ProofVerificationError(ProtocolError):
+    """Exception raised when proofs do not verify against the manager root"""
+    def __init__(self, message: str, failures: list):
+        self.failures = failures
+        super().__init__(message)
@@ -0,0 +1,240 @@
+import json
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+from eth_utils import keccak, to_checksum_address
+from .exceptions import ProtocolError
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+def hash_pair(a: bytes, b: bytes) -> bytes:
+    """
+    Hashes two nodes the way the manager's MerkleProofLib does: sorted, then keccak256.
+    """
+    return keccak(a + b) if a < b else keccak(b + a)
+
+def manage_leaf_digest(decoder_and_sanitizer: str, target: str, can_send_value: bool, selector: bytes, packed_argument_addresses: bytes) -> bytes:
+    """
+    Computes the digest of a manage leaf, matching ManagerWithMerkleVerification:
+    keccak256(abi.encodePacked(decoderAndSanitizer, target, valueNonZero, selector, packedArgumentAddresses))
+
+    :param decoder_and_sanitizer: The decoder and sanitizer address
+    :param target: The target contract address
+    :param can_send_value: Whether the call sends native value
+    :param selector: The 4 byte function selector
+    :param packed_argument_addresses: The packed addresses returned by the decoder and sanitizer
+    :return: The 32 byte leaf digest
+    """
+    return keccak(
+        bytes.fromhex(decoder_and_sanitizer[2:])
+        + bytes.fromhex(target[2:])
+        + (b"\x01" if can_send_value else b"\x00")
+        + selector
+        + packed_argument_addresses
+    )
+
+# Digest of an empty ManageLeaf, used by the tree generator to pad the leaf layer to a power of two
+DEFAULT_LEAF_DIGEST = manage_leaf_digest(ZERO_ADDRESS, ZERO_ADDRESS, False, keccak(b"")[:4], b"")
+
+def build_tree(leaf_digests: List[bytes]) -> List[List[bytes]]:
+    """
+    Builds every layer of a manage tree, from the (padded) leaf layer up to the root.
+
+    :param leaf_digests: The leaf digests in leaf order
+    :return: The layers of the tree, layers[0] being the leaves and layers[-1] == [root]
+    """
+    if not leaf_digests:
+        raise ProtocolError("Cannot build a merkle tree without leaves.")
+    width = 1
+    while width < len(leaf_digests):
+        width *= 2
+    layer = list(leaf_digests) + [DEFAULT_LEAF_DIGEST] * (width - len(leaf_digests))
+    layers = [layer]
+    while len(layer) > 1:
+        layer = [hash_pair(layer[i], layer[i + 1]) for i in range(0, len(layer), 2)]
+        layers.append(layer)
+    return layers
+
+def get_proof(layers: List[List[bytes]], index: int) -> List[bytes]:
+    """
+    Collects the sibling of the node on every layer below the root.
+
+    :param layers: The layers returned by build_tree
+    :param index: The leaf index
+    :return: The proof, ordered from the leaf layer up
+    """
+    proof = []
+    for layer in layers[:-1]:
+        proof.append(layer[index ^ 1])
+        index //= 2
+    return proof
+
+def verify_proof(root: bytes, proof: List[bytes], leaf: bytes) -> bool:
+    """
+    Walks a proof from a leaf digest up to the root, like MerkleProofLib.verify.
+
+    :param root: The expected root
+    :param proof: The proof, ordered from the leaf layer up
+    :param leaf: The leaf digest
+    :return: True if the proof leads to root
+    """
+    node = leaf
+    for sibling in proof:
+        node = hash_pair(node, sibling)
+    return node == root
+
+def verify_proofs(root: bytes, proofs: List[List[bytes]], leaves: List[bytes]) -> List[int]:
+    """
+    Verifies a batch of proofs against one root.
+
+    :param root: The expected root
+    :param proofs: The proof of every leaf
+    :param leaves: The leaf digests
+    :return: The indices of the leaves whose proof does not lead to root
+    """
+    return [idx for idx, (proof, leaf) in enumerate(zip(proofs, leaves)) if not verify_proof(root, proof, leaf)]
+
+class ManageLeaf(NamedTuple):
+    """
+    A leaf of the manage tree.
+
+    :param target: The target contract address
+    :param decoder_and_sanitizer: The decoder and sanitizer address
+    :param can_send_value: Whether the call may send native value
+    :param selector: The 4 byte function selector
+    :param argument_addresses: The addresses the decoder and sanitizer extracts from the call arguments
+    :param digest: The leaf digest
+    """
+    target: str
+    decoder_and_sanitizer: str
+    can_send_value: bool
+    selector: bytes
+    argument_addresses: Tuple[bytes, ...]
+    digest: bytes
+
+class ManageTree:
+    """
+    A local copy of the manage tree behind a strategist's manageRoot. Proofs and decoders are served
+    from memory, so building calldata for leaves of this tree needs no proof API requests.
+
+    Args:
+        leaves: The leaves in tree order
+        root: Expected root (0x prefixed hex). A tree that does not rebuild to it is rejected as stale.
+    """
+
+    def __init__(self, leaves: List[ManageLeaf], root: Optional[str] = None):
+        self.leaves = leaves
+        self.layers = build_tree([leaf.digest for leaf in leaves])
+        self.root = "0x" + self.layers[-1][0].hex()
+        if root is not None and root.lower() != self.root:
+            raise ProtocolError(f"Merkle tree rebuilds to root {self.root}, expected {root.lower()}. The tree is stale.")
+
+        # (target, selector, can_send_value) -> indices of the leaves that can prove such a call
+        self._index: Dict[Tuple[str, bytes, bool], List[int]] = {}
+        for idx, leaf in enumerate(leaves):
+            self._index.setdefault((leaf.target.lower(), leaf.selector, leaf.can_send_value), []).append(idx)
+        self._proofs: Dict[int, List[str]] = {}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any], root: Optional[str] = None) -> "ManageTree":
+        """
+        Loads a tree from the JSON produced by the merkle tree generator ("metadata" and "leafs").
+
+        Args:
+            data: The parsed JSON document
+            root: Expected root, checked against the rebuilt tree
+        """
+        metadata = data.get("metadata", {})
+        if root is None:
+            root = metadata.get("ManageRoot")
+        default_decoder = metadata.get("DecoderAndSanitizerAddress")
+
+        raw_leaves = data["leafs"]
+        if all("LeafId" in raw for raw in raw_leaves):
+            raw_leaves = sorted(raw_leaves, key=lambda raw: int(raw["LeafId"]))
+
+        leaves = []
+        for raw in raw_leaves:
+            decoder = to_checksum_address(raw.get("DecoderAndSanitizerAddress", default_decoder) or ZERO_ADDRESS)
+            target = to_checksum_address(raw["TargetAddress"])
+            can_send_value = bool(raw["CanSendValue"])
+            if raw.get("FunctionSelector"):
+                selector = bytes.fromhex(raw["FunctionSelector"][2:])
+            else:
+                selector = keccak(text=raw.get("FunctionSignature", ""))[:4]
+            if raw.get("PackedArgumentAddresses") not in (None, "0x"):
+                packed = bytes.fromhex(raw["PackedArgumentAddresses"][2:])
+            else:
+                packed = b"".join(bytes.fromhex(address[2:]) for address in raw.get("AddressArguments", []))
+            argument_addresses = tuple(packed[i:i + 20] for i in range(0, len(packed), 20))
+
+            digest = manage_leaf_digest(decoder, target, can_send_value, selector, packed)
+            if raw.get("LeafDigest") and bytes.fromhex(raw["LeafDigest"][2:]) != digest:
+                raise ProtocolError(f"Leaf digest mismatch for target {target} and selector 0x{selector.hex()}.")
+            leaves.append(ManageLeaf(target, decoder, can_send_value, selector, argument_addresses, digest))
+        return cls(leaves, root)
+
+    @classmethod
+    def from_file(cls, path: str, root: Optional[str] = None) -> "ManageTree":
+        """Loads a tree from a JSON file. See from_json."""
+        with open(path) as f:
+            return cls.from_json(json.load(f), root)
+
+    def decoders_for(self, target: str, calldata: bytes, value: int) -> List[str]:
+        """
+        Returns the distinct decoder and sanitizer addresses of the leaves that could prove a call (same
+        target, selector and value flag). Their outputs for the call are needed by find_leaf.
+        """
+        candidates = self._index.get((target.lower(), bytes(calldata[:4]), value > 0), [])
+        return list(dict.fromkeys(self.leaves[idx].decoder_and_sanitizer for idx in candidates))
+
+    def find_leaf(self, target: str, calldata: bytes, value: int, packed_by_decoder: Mapping[str, bytes]) -> int:
+        """
+        Finds the leaf proving a call.
+
+        The packed argument addresses of a leaf are produced on chain by the decoder and sanitizer, so a
+        call is matched to the candidate leaf (same target, selector and value flag) whose packed addresses
+        are exactly those its decoder returned for the call.
+
+        Args:
+            target: The target contract address
+            calldata: The encoded call
+            value: The value sent with the call
+            packed_by_decoder: The packed argument addresses returned for the call, keyed by lowercase
+                decoder and sanitizer address. Leaves whose decoder is missing cannot match.
+
+        Returns:
+            The leaf index
+
+        Raises:
+            ProtocolError: If no leaf, or more than one leaf, matches the call
+        """
+        candidates = self._index.get((target.lower(), bytes(calldata[:4]), value > 0), [])
+        matches = {
+            self.leaves[idx].digest: idx for idx in candidates
+            if b"".join(self.leaves[idx].argument_addresses) == packed_by_decoder.get(self.leaves[idx].decoder_and_sanitizer.lower())
+        }
+        if not matches:
+            raise ProtocolError(f"No leaf of root {self.root} matches the call to {target} with selector 0x{bytes(calldata[:4]).hex()}.")
+        if len(matches) > 1:
+            raise ProtocolError(f"The call to {target} with selector 0x{bytes(calldata[:4]).hex()} matches several leaves of root {self.root}.")
+        return next(iter(matches.values()))
+
+    def proof(self, index: int) -> List[str]:
+        """Returns the proof of a leaf as 0x prefixed hex strings, like the proof API."""
+        if index not in self._proofs:
+            self._proofs[index] = ["0x" + node.hex() for node in get_proof(self.layers, index)]
+        return self._proofs[index]
+
+    def proof_and_decoder(self, leaf: Dict[str, Any], packed_by_decoder: Mapping[str, bytes]) -> Tuple[List[str], str]:
+        """
+        Serves the proof and decoder for a queue leaf, in the format returned by the proof API.
+
+        Args:
+            leaf: A leaf dictionary with "target", "calldata" (0x prefixed hex) and "value"
+            packed_by_decoder: The packed argument addresses returned for the call by its candidate
+                decoders, see find_leaf
+
+        Returns:
+            The proof hashes and the decoder and sanitizer address
+        """
+        index = self.find_leaf(leaf["target"], bytes.fromhex(leaf["calldata"][2:]), leaf["value"], packed_by_decoder)
+        return self.proof(index), self.leaves[index].decoder_and_sanitizer
@@ -0,0 +1,98 @@
+import time
+from typing import Any, Callable, Dict
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NOOP_STAGE = _NoopStage()
+
+class _Stage:
+    __slots__ = ("metrics", "name", "tags", "start")
+
+    def __init__(self, metrics: "Metrics", name: str, tags: Dict[str, Any]):
+        self.metrics = metrics
+        self.name = name
+        self.tags = tags
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc is not None:
+            self.metrics.error(self.name, exc, **self.tags)
+        self.metrics.timing(self.name, time.perf_counter() - self.start, **self.tags)
+        return False
+
+class Metrics:
+    """
+    Instrumentation hooks of a client and its queues. This base class ignores everything; subclass it
+    and override the hooks to export metrics, e.g. to Prometheus or OpenTelemetry.
+
+    Subclasses are enabled automatically. While disabled, stage() returns a shared no-op context manager
+    and the SDK skips computing sizes and counts, so instrumentation costs next to nothing.
+
+    Stages and metrics emitted:
+        address_book.lookup, rpc.manage_root, add_call, add_calls_batch, get_calldata, api.<endpoint>, prepare,
+        execute and execute.<step> (see CalldataQueue.last_execution_timings), watcher.update: timing, and error on failure
+        watcher: error, when a ChainStateWatcher loses its connection
+        api.<endpoint>.response_bytes, add_call.calldata_bytes, manage_calldata_bytes, multiproofs.leaves: size
+        root_cache.hit/miss, proof_cache.hit/miss, proof_tree.hit, multiproofs.duplicate_leaves: count
+    """
+    enabled = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "enabled" not in cls.__dict__:
+            cls.enabled = True
+
+    def stage(self, name: str, **tags):
+        """
+        Context manager timing a stage. Reports the duration with timing(), and the exception with
+        error() if the stage raises.
+        """
+        if not self.enabled:
+            return _NOOP_STAGE
+        return _Stage(self, name, tags)
+
+    def timing(self, name: str, seconds: float, **tags) -> None:
+        """Called with the duration of a stage."""
+
+    def size(self, name: str, value: int, **tags) -> None:
+        """Called with a payload size (bytes, or items when the name says so)."""
+
+    def count(self, name: str, value: int = 1, **tags) -> None:
+        """Called to increment a counter, e.g. cache hits and misses."""
+
+    def error(self, name: str, exc: BaseException, **tags) -> None:
+        """Called when a stage fails."""
+
+class CallbackMetrics(Metrics):
+    """
+    Forwards every metric to callback(kind, name, value, tags), where kind is "timing", "size", "count"
+    or "error" and value is the exception for errors.
+    """
+
+    def __init__(self, callback: Callable[[str, str, Any, Dict[str, Any]], None]):
+        self.callback = callback
+
+    def timing(self, name: str, seconds: float, **tags) -> None:
+        self.callback("timing", name, seconds, tags)
+
+    def size(self, name: str, value: int, **tags) -> None:
+        self.callback("size", name, value, tags)
+
+    def count(self, name: str, value: int = 1, **tags) -> None:
+        self.callback("count", name, value, tags)
+
+    def error(self, name: str, exc: BaseException, **tags) -> None:
+        self.callback("error", name, exc, tags)
+
+# Shared by every client created without metrics
+NULL_METRICS = Metrics()
@@ -0,0 +1,160 @@
+import threading
+from typing import Optional, Set
+
+class NonceManager:
+    """
+    Hands out nonces for one account locally, so that several transactions can be in flight at once.
+
+    The first nonce comes from the account's pending transaction count; after that nonces are
+    allocated atomically from memory, across threads and asyncio tasks. Allocated nonces stay in flight
+    until they are reported with mark_broadcast() or release_nonce(); a released nonce is handed out
+    again, and the manager realigns with the chain once no other nonce is in flight. Call sync() after
+    transactions were dropped or replaced.
+
+    Args:
+        w3: A Web3 or AsyncWeb3 instance for the account's chain
+        address: The account address
+    """
+
+    def __init__(self, w3, address: str):
+        self.w3 = w3
+        self.address = address
+        self._next: Optional[int] = None
+        # Allocated nonces not yet broadcast, and released nonces to hand out again before _next
+        self._in_flight: Set[int] = set()
+        self._released: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def next_nonce(self) -> int:
+        """Allocates the next nonce, reading the pending transaction count on first use."""
+        if self._next is None:
+            self._set_if_unsynced(self.w3.eth.get_transaction_count(self.address, "pending"))
+        return self._claim()
+
+    async def async_next_nonce(self) -> int:
+        """Same as next_nonce() for an AsyncWeb3 instance."""
+        if self._next is None:
+            self._set_if_unsynced(await self.w3.eth.get_transaction_count(self.address, "pending"))
+        return self._claim()
+
+    def peek_nonce(self) -> int:
+        """
+        Returns the next nonce without allocating it, reading the pending transaction count on first use.
+        See claim_nonce.
+        """
+        if self._next is None:
+            self._set_if_unsynced(self.w3.eth.get_transaction_count(self.address, "pending"))
+        with self._lock:
+            return self._upcoming()
+
+    async def async_peek_nonce(self) -> int:
+        """Same as peek_nonce() for an AsyncWeb3 instance."""
+        if self._next is None:
+            self._set_if_unsynced(await self.w3.eth.get_transaction_count(self.address, "pending"))
+        with self._lock:
+            return self._upcoming()
+
+    def claim_nonce(self, nonce: int) -> bool:
+        """
+        Allocates a nonce returned earlier by peek_nonce(), unless it was allocated in the meantime or the
+        manager was reset or synced to another nonce. Performs no I/O.
+
+        Returns:
+            True if the nonce was allocated
+        """
+        with self._lock:
+            if self._next is None or self._upcoming() != nonce:
+                return False
+            self._take()
+            return True
+
+    def mark_broadcast(self, nonce: int) -> None:
+        """Reports that the transaction using an allocated nonce was broadcast."""
+        with self._lock:
+            self._in_flight.discard(nonce)
+
+    def release_nonce(self, nonce: int) -> None:
+        """
+        Reports that an allocated nonce was not used, e.g. because signing or sending failed. The nonce is
+        handed out again; once no other nonce is in flight, the manager instead realigns with the account's
+        pending transaction count on the next allocation, since the failed transaction may have been sent.
+        Nonces held by other threads are never handed out twice.
+        """
+        with self._lock:
+            if nonce not in self._in_flight:
+                return
+            self._in_flight.discard(nonce)
+            if not self._in_flight:
+                self._next = None
+                self._released.clear()
+            elif nonce == self._next - 1:
+                self._next = nonce
+            else:
+                self._released.add(nonce)
+
+    def sync(self) -> int:
+        """
+        Realigns with the account's pending transaction count, e.g. after transactions were dropped or
+        replaced, or sent from elsewhere. Call it while no allocated nonce is still waiting to be broadcast.
+
+        Returns:
+            The next nonce that will be allocated
+        """
+        pending = self.w3.eth.get_transaction_count(self.address, "pending")
+        with self._lock:
+            self._next = pending
+            self._released.clear()
+            return pending
+
+    def observe_pending_nonce(self, pending: int) -> None:
+        """
+        Moves the next nonce forward to the account's pending transaction count, when transactions were
+        sent from elsewhere. Never moves it back, since locally allocated nonces may not be pending yet.
+        """
+        with self._lock:
+            if self._next is None or pending > self._next:
+                self._next = pending
+            self._released = {nonce for nonce in self._released if nonce >= pending}
+
+    def reset(self) -> None:
+        """
+        Forgets the local state; the next allocation reads the pending transaction count again. Call it
+        while no allocated nonce is in flight, see release_nonce.
+        """
+        with self._lock:
+            self._next = None
+            self._in_flight.clear()
+            self._released.clear()
+
+    @property
+    def pending_nonce(self) -> Optional[int]:
+        """The next nonce that will be allocated, or None before the first sync."""
+        with self._lock:
+            return None if self._next is None else self._upcoming()
+
+    @property
+    def in_flight(self) -> int:
+        """The number of allocated nonces not yet reported as broadcast or released."""
+        return len(self._in_flight)
+
+    def _set_if_unsynced(self, nonce: int) -> None:
+        with self._lock:
+            if self._next is None:
+                self._next = nonce
+
+    def _claim(self) -> int:
+        with self._lock:
+            return self._take()
+
+    def _upcoming(self) -> int:
+        return min(self._released) if self._released else self._next
+
+    def _take(self) -> int:
+        if self._released:
+            nonce = min(self._released)
+            self._released.discard(nonce)
+        else:
+            nonce = self._next
+            self._next += 1
+        self._in_flight.add(nonce)
+        return nonce
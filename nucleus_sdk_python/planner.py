@@ -0,0 +1,68 @@
+from typing import List
+from .exceptions import InvalidInputsError
+
+# Bytes of an empty manageVaultWithMerkleVerification call: selector, five array heads and five array lengths
+MANAGE_BASE_SIZE = 4 + 5 * 32 + 5 * 32
+
+# Gas of a transaction before any of its calls run
+TX_BASE_GAS = 21000
+
+def calldata_gas(data: bytes) -> int:
+    """
+    Intrinsic gas charged for transaction data: 4 per zero byte, 16 per non-zero byte.
+    """
+    zero_bytes = data.count(0)
+    return 4 * zero_bytes + 16 * (len(data) - zero_bytes)
+
+def encoded_call_size(data_length: int, proof_length: int) -> int:
+    """
+    Bytes one call adds to the manageVaultWithMerkleVerification calldata.
+
+    Args:
+        data_length: Length of the call's encoded calldata
+        proof_length: Number of hashes in the call's proof
+    """
+    return (
+        32 + 32 + 32 * proof_length                 # proof: offset, length and hashes
+        + 32                                        # decoder and sanitizer
+        + 32                                        # target
+        + 32 + 32 + 32 * ((data_length + 31) // 32) # data: offset, length and padded bytes
+        + 32                                        # value
+    )
+
+def plan_chunks(groups: List[List[int]], sizes: List[int], gases: List[int], max_gas: int, max_calldata_bytes: int) -> List[List[int]]:
+    """
+    Partitions calls into manage transactions under gas and calldata size budgets, in queue order.
+    Calls of a group always land in the same transaction.
+
+    Args:
+        groups: Call indices of every group, in queue order
+        sizes: Calldata bytes every call adds (see encoded_call_size)
+        gases: Estimated gas of every call, including its calldata gas
+        max_gas: Gas budget of one transaction
+        max_calldata_bytes: Calldata size budget of one transaction
+
+    Returns:
+        The call indices of every transaction
+
+    Raises:
+        InvalidInputsError: If a single group exceeds a budget
+    """
+    chunks: List[List[int]] = []
+    chunk: List[int] = []
+    chunk_size = MANAGE_BASE_SIZE
+    chunk_gas = TX_BASE_GAS
+    for group in groups:
+        group_size = sum(sizes[idx] for idx in group)
+        group_gas = sum(gases[idx] for idx in group)
+        if MANAGE_BASE_SIZE + group_size > max_calldata_bytes or TX_BASE_GAS + group_gas > max_gas:
+            raise InvalidInputsError(f"Calls {group} do not fit in a single manage transaction under the configured gas and calldata budgets.")
+        if chunk and (chunk_size + group_size > max_calldata_bytes or chunk_gas + group_gas > max_gas):
+            chunks.append(chunk)
+            chunk, chunk_size, chunk_gas = [], MANAGE_BASE_SIZE, TX_BASE_GAS
+        chunk.extend(group)
+        chunk_size += group_size
+        chunk_gas += group_gas
+    if chunk:
+        chunks.append(chunk)
+    return chunks
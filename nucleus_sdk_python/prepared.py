@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Any, List, Optional
+from .exceptions import ProtocolError
+from .nonce_manager import NonceManager
+from .root_cache import RootKey
+
+class PreparedTransaction:
+    """
+    A signed manage transaction, ready to be broadcast. Create it with CalldataQueue.prepare().
+
+    The transaction is signed once per fee variant (gas prices in increasing order). commit() broadcasts
+    the cheapest variant covering the last observed gas price, and does no other I/O.
+
+    A prepared transaction becomes invalid, and commit() raises, when:
+        - the strategist's root changes in the client's root cache (e.g. after refresh_root())
+        - its nonce is allocated by another transaction, or its nonce manager is reset or synced
+        - observe_gas_price() reports a gas price above the most expensive variant
+        - it was committed, or its broadcast failed
+
+    Args:
+        w3: The Web3 or AsyncWeb3 instance used to broadcast
+        key: The root cache key of the queue's strategist
+        root: The root the proofs were fetched for
+        nonce_manager: The nonce manager the nonce was peeked from
+        nonce: The nonce of every variant
+        gas: The gas limit of every variant
+        gas_prices: The gas price of every variant, increasing
+        raw_transactions: The signed transaction of every variant
+    """
+
+    def __init__(self, w3, key: RootKey, root: str, nonce_manager: NonceManager, nonce: int, gas: int, gas_prices: List[int], raw_transactions: List[bytes]):
+        self.w3 = w3
+        self.key = key
+        self.root = root
+        self.nonce_manager = nonce_manager
+        self.nonce = nonce
+        self.gas = gas
+        self.gas_prices = gas_prices
+        self.raw_transactions = raw_transactions
+        self.prepared_at = time.monotonic()
+        # Reason the transaction can no longer be committed, None while valid
+        self.invalid_reason: Optional[str] = None
+        self._variant = 0
+        self._lock = threading.Lock()
+
+    @property
+    def valid(self) -> bool:
+        return self.invalid_reason is None
+
+    @property
+    def gas_price(self) -> int:
+        """The gas price of the variant commit() would broadcast."""
+        return self.gas_prices[self._variant]
+
+    def invalidate(self, reason: str) -> None:
+        """Marks the transaction invalid. The first reason is kept."""
+        with self._lock:
+            if self.invalid_reason is None:
+                self.invalid_reason = reason
+
+    def observe_gas_price(self, gas_price: int) -> None:
+        """
+        Reports the current gas price. Selects the cheapest variant paying at least gas_price, or
+        invalidates the transaction if every variant pays less.
+        """
+        for idx, price in enumerate(self.gas_prices):
+            if price >= gas_price:
+                self._variant = idx
+                return
+        self.invalidate(f"gas price {gas_price} is above the highest prepared gas price {self.gas_prices[-1]}")
+
+    def commit(self) -> Any:
+        """
+        Broadcasts the transaction.
+
+        Returns:
+            The transaction hash
+
+        Raises:
+            ProtocolError: If the transaction is no longer valid
+        """
+        raw_transaction = self._claim()
+        try:
+            tx_hash = self.w3.eth.send_raw_transaction(raw_transaction)
+        except Exception:
+            self._fail()
+            raise
+        self.nonce_manager.mark_broadcast(self.nonce)
+        return tx_hash
+
+    async def async_commit(self) -> Any:
+        """Same as commit() for an AsyncWeb3 instance."""
+        raw_transaction = self._claim()
+        try:
+            tx_hash = await self.w3.eth.send_raw_transaction(raw_transaction)
+        except Exception:
+            self._fail()
+            raise
+        self.nonce_manager.mark_broadcast(self.nonce)
+        return tx_hash
+
+    def _claim(self) -> bytes:
+        """Checks the transaction is valid and allocates its nonce. Returns the raw transaction to send."""
+        with self._lock:
+            if self.invalid_reason is None and not self.nonce_manager.claim_nonce(self.nonce):
+                self.invalid_reason = f"nonce {self.nonce} is no longer the account's next nonce"
+            if self.invalid_reason is not None:
+                raise ProtocolError(f"The prepared transaction can no longer be committed: {self.invalid_reason}.")
+            self.invalid_reason = "already committed"
+            return self.raw_transactions[self._variant]
+
+    def _fail(self) -> None:
+        """The allocated nonce was not used; hand it back to the nonce manager."""
+        self.nonce_manager.release_nonce(self.nonce)
+        self.invalid_reason = "broadcast failed"
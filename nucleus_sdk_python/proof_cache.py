@@ -0,0 +1,210 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from .config import PACKED_ARGUMENTS_CACHE_SIZE, PROOF_CACHE_SIZE
+
+# A cached proof: the proof hashes (hex strings, as returned by the API) and the decoder and sanitizer address
+ProofEntry = Tuple[List[str], str]
+
+def call_key(target: str, calldata: str, value: int) -> str:
+    """
+    Builds the chain independent part of a leaf's cache key, see leaf_key.
+
+    :param target: The target contract address
+    :param calldata: The calldata as 0x prefixed hex
+    :param value: The value sent with the call
+    :return: The key of the call
+    """
+    return f"{target.lower()}:{calldata.lower()}:{value}"
+
+def leaf_key(chain_id: int, leaf: Dict[str, Any]) -> str:
+    """
+    Builds the cache key of a leaf. Proofs are immutable for a given root, so the key only needs to
+    identify the call itself.
+
+    :param chain_id: The chain ID the leaf is proven on
+    :param leaf: A leaf dictionary with "target", "calldata" and "value"
+    :return: The cache key
+    """
+    return f"{chain_id}:{call_key(leaf['target'], leaf['calldata'], leaf['value'])}"
+
+class BaseProofCache(ABC):
+    """
+    Interface for proof caches used by CalldataQueue. Entries are grouped by merkle root so that
+    every proof of a root can be dropped at once when the manager's manageRoot changes.
+    """
+
+    @abstractmethod
+    def get_many(self, root: str, keys: List[str]) -> List[Optional[ProofEntry]]:
+        """Returns the cached entry for every key, or None for misses, in the order of keys."""
+
+    @abstractmethod
+    def set_many(self, root: str, items: Iterable[Tuple[str, ProofEntry]]) -> None:
+        """Stores (key, entry) pairs under root."""
+
+    @abstractmethod
+    def drop_root(self, root: str) -> None:
+        """Removes every entry stored under root."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes every entry."""
+
+class ProofCache(BaseProofCache):
+    """
+    Thread-safe in-memory LRU proof cache.
+
+    Args:
+        max_entries: Maximum number of proofs kept across all roots
+    """
+
+    def __init__(self, max_entries: int = PROOF_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], ProofEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, root: str, keys: List[str]) -> List[Optional[ProofEntry]]:
+        results = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get((root, key))
+                if entry is not None:
+                    self._entries.move_to_end((root, key))
+                results.append(entry)
+        return results
+
+    def set_many(self, root: str, items: Iterable[Tuple[str, ProofEntry]]) -> None:
+        with self._lock:
+            for key, entry in items:
+                self._entries[(root, key)] = entry
+                self._entries.move_to_end((root, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def drop_root(self, root: str) -> None:
+        with self._lock:
+            for cache_key in [cache_key for cache_key in self._entries if cache_key[0] == root]:
+                del self._entries[cache_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class PackedArgumentsCache:
+    """
+    Thread-safe in-memory LRU of decoder and sanitizer outputs, keyed by (decoder, calldata) with the
+    decoder lowercased and the calldata as 0x prefixed hex. An output is the packed argument addresses,
+    or the reason the decoder rejected the call. Decoders are pure functions of the calldata, so outputs
+    do not depend on the root.
+
+    Args:
+        max_entries: Maximum number of outputs kept
+    """
+
+    def __init__(self, max_entries: int = PACKED_ARGUMENTS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Union[bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(self, keys: List[Tuple[str, str]]) -> List[Optional[Union[bytes, str]]]:
+        """Returns the cached output for every key, or None for misses, in the order of keys."""
+        results = []
+        with self._lock:
+            for key in keys:
+                output = self._entries.get(key)
+                if output is not None:
+                    self._entries.move_to_end(key)
+                results.append(output)
+        return results
+
+    def set_many(self, items: Iterable[Tuple[Tuple[str, str], Union[bytes, str]]]) -> None:
+        """Stores (key, output) pairs."""
+        with self._lock:
+            for key, output in items:
+                self._entries[key] = output
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class SQLiteProofCache(BaseProofCache):
+    """
+    Persistent LRU proof cache backed by a SQLite database, so that a restarted process starts warm.
+
+    Args:
+        path: Path of the SQLite database file (created if missing)
+        max_entries: Maximum number of proofs kept across all roots
+    """
+
+    def __init__(self, path: str, max_entries: int = PROOF_CACHE_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS proofs ("
+                "root TEXT NOT NULL, leaf TEXT NOT NULL, proof TEXT NOT NULL, decoder TEXT NOT NULL, "
+                "last_used REAL NOT NULL, PRIMARY KEY (root, leaf))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS proofs_last_used ON proofs (last_used)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM proofs").fetchone()[0]
+
+    def get_many(self, root: str, keys: List[str]) -> List[Optional[ProofEntry]]:
+        found: Dict[str, ProofEntry] = {}
+        now = time.time()
+        with self._lock, self._conn:
+            for key in set(keys):
+                row = self._conn.execute(
+                    "SELECT proof, decoder FROM proofs WHERE root = ? AND leaf = ?", (root, key)
+                ).fetchone()
+                if row is not None:
+                    found[key] = (json.loads(row[0]), row[1])
+            if found:
+                self._conn.executemany(
+                    "UPDATE proofs SET last_used = ? WHERE root = ? AND leaf = ?",
+                    [(now, root, key) for key in found]
+                )
+        return [found.get(key) for key in keys]
+
+    def set_many(self, root: str, items: Iterable[Tuple[str, ProofEntry]]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO proofs (root, leaf, proof, decoder, last_used) VALUES (?, ?, ?, ?, ?)",
+                [(root, key, json.dumps(proof), decoder, now) for key, (proof, decoder) in items]
+            )
+            self._conn.execute(
+                "DELETE FROM proofs WHERE rowid IN "
+                "(SELECT rowid FROM proofs ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def drop_root(self, root: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM proofs WHERE root = ?", (root,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM proofs")
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._conn.close()
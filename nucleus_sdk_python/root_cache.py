@@ -0,0 +1,70 @@
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from .config import ROOT_CACHE_TTL
+
+# (chain ID, manager address, strategist address)
+RootKey = Tuple[int, str, str]
+
+def root_key(chain_id: int, manager_address: str, strategist_address: str) -> RootKey:
+    """Builds the cache key of a strategist's manageRoot."""
+    return (int(chain_id), manager_address.lower(), strategist_address.lower())
+
+class RootEntry(NamedTuple):
+    root: str
+    fetched_at: float
+    block_number: Optional[int]
+
+class RootCache:
+    """
+    Thread-safe cache of manageRoot values shared by the queues of a client.
+
+    An entry is served until it is older than the TTL or, when the caller knows the current block,
+    until it was read at an older block than the caller requires. Listeners are notified whenever a
+    stored root differs from the previous one.
+
+    Args:
+        ttl: Seconds a root is served without being read again
+    """
+
+    def __init__(self, ttl: float = ROOT_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[RootKey, RootEntry] = {}
+        self._listeners: List[Callable[[RootKey, Optional[str], str], None]] = []
+        self._lock = threading.Lock()
+
+    def get(self, key: RootKey, min_block: Optional[int] = None) -> Optional[str]:
+        """
+        Returns the cached root, or None if it is missing or stale.
+
+        Args:
+            key: See root_key
+            min_block: Oldest block the root may have been read at
+        """
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry.fetched_at > self.ttl:
+            return None
+        if min_block is not None and (entry.block_number is None or entry.block_number < min_block):
+            return None
+        return entry.root
+
+    def set(self, key: RootKey, root: str, block_number: Optional[int] = None) -> None:
+        """Stores a freshly read root, notifying listeners if it changed."""
+        with self._lock:
+            previous = self._entries.get(key)
+            self._entries[key] = RootEntry(root, time.monotonic(), block_number)
+        if previous is not None and previous.root != root:
+            for listener in list(self._listeners):
+                listener(key, previous.root, root)
+
+    def invalidate(self, key: Optional[RootKey] = None) -> None:
+        """Forgets one root, or every root when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def subscribe(self, listener: Callable[[RootKey, Optional[str], str], None]) -> None:
+        """Registers listener(key, old_root, new_root), called when a stored root changes."""
+        self._listeners.append(listener)
@@ -0,0 +1,187 @@
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import List, NamedTuple, Optional, Union
+from .calls import CallStore
+from .exceptions import InvalidInputsError
+from .utils import to_checksum_address
+
+SNAPSHOT_MAGIC = b"NQS\x00"
+SNAPSHOT_VERSION = 1
+
+# Header: magic, version, flags, CRC-32 of the body, chain ID, manager, strategist, root, call count,
+# calldata size and proof word count. Every integer is little-endian.
+_HEADER = struct.Struct("<4sHHIQ20s20s32sIQQ")
+_FLAG_PROOFS = 1
+
+# Body, in order:
+#   calldata offsets  (calls + 1) x uint64
+#   call groups       calls x uint32
+#   targets           calls x 20 bytes
+#   values            calls x 32 bytes, big-endian
+#   calldata          calldata size bytes
+# and with _FLAG_PROOFS:
+#   proof offsets     (calls + 1) x uint32, in words
+#   decoders          calls x 20 bytes
+#   proof words       proof word count x 32 bytes
+
+class QueueSnapshot(NamedTuple):
+    """
+    The state of a CalldataQueue needed to execute it elsewhere (see CalldataQueue.to_snapshot).
+
+    Args:
+        chain_id: The chain ID
+        manager_address: The manager address
+        strategist_address: The strategist address
+        root: The root the proofs belong to
+        calls: The queued calls
+        call_groups: The atomic group of every call
+        proofs: The proof of every call, if resolved
+        decoders: The decoder and sanitizer address of every call, if resolved
+    """
+    chain_id: int
+    manager_address: str
+    strategist_address: str
+    root: str
+    calls: CallStore
+    call_groups: List[int]
+    proofs: Optional[List[List[bytes]]] = None
+    decoders: Optional[List[str]] = None
+
+def _address_bytes(address: str) -> bytes:
+    return bytes.fromhex(address[2:])
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _read_array(typecode: str, view: memoryview) -> array:
+    values = array(typecode)
+    values.frombytes(view)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+def dump_snapshot(snapshot: QueueSnapshot) -> bytes:
+    """
+    Serializes a snapshot to the binary snapshot format.
+
+    Returns:
+        The snapshot bytes
+    """
+    calls = snapshot.calls
+    count = len(calls)
+    body = [
+        _little_endian(calls.offsets),
+        _little_endian(array("I", snapshot.call_groups)),
+        b"".join(_address_bytes(calls.target(idx)) for idx in range(count)),
+        b"".join(calls.value(idx).to_bytes(32, "big") for idx in range(count)),
+        calls.buffer
+    ]
+
+    flags = 0
+    proof_words = 0
+    if snapshot.proofs is not None:
+        flags |= _FLAG_PROOFS
+        proof_offsets = array("I", [0])
+        for proof in snapshot.proofs:
+            proof_words += len(proof)
+            proof_offsets.append(proof_words)
+        body.append(_little_endian(proof_offsets))
+        body.append(b"".join(_address_bytes(decoder) for decoder in snapshot.decoders))
+        body.append(b"".join(word for proof in snapshot.proofs for word in proof))
+
+    body = b"".join(body)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, flags, zlib.crc32(body), snapshot.chain_id,
+        _address_bytes(snapshot.manager_address), _address_bytes(snapshot.strategist_address),
+        bytes.fromhex(snapshot.root[2:]), count, calls.nbytes, proof_words
+    )
+    return header + body
+
+def load_snapshot(data: Union[bytes, bytearray, memoryview, mmap.mmap]) -> QueueSnapshot:
+    """
+    Reads a snapshot from the binary snapshot format. Sections are sliced out of data without
+    intermediate copies, so data can be a memory-mapped file.
+
+    Raises:
+        InvalidInputsError: If data is not a valid snapshot
+    """
+    view = memoryview(data)
+    if len(view) < _HEADER.size:
+        raise InvalidInputsError("Invalid queue snapshot: truncated header.")
+    magic, version, flags, crc, chain_id, manager, strategist, root, count, data_size, proof_words = _HEADER.unpack_from(view)
+    if magic != SNAPSHOT_MAGIC:
+        raise InvalidInputsError("Invalid queue snapshot: bad magic number.")
+    if version != SNAPSHOT_VERSION:
+        raise InvalidInputsError(f"Unsupported queue snapshot version {version}.")
+
+    has_proofs = bool(flags & _FLAG_PROOFS)
+    size = _HEADER.size + (count + 1) * 8 + count * 4 + count * 52 + data_size
+    if has_proofs:
+        size += (count + 1) * 4 + count * 20 + proof_words * 32
+    if len(view) != size:
+        raise InvalidInputsError(f"Invalid queue snapshot: expected {size} bytes, got {len(view)}.")
+    if zlib.crc32(view[_HEADER.size:]) != crc:
+        raise InvalidInputsError("Invalid queue snapshot: checksum mismatch.")
+
+    position = _HEADER.size
+
+    def section(length: int) -> memoryview:
+        nonlocal position
+        position += length
+        return view[position - length:position]
+
+    offsets = _read_array("Q", section((count + 1) * 8))
+    call_groups = _read_array("I", section(count * 4)).tolist()
+    targets = section(count * 20)
+    values = section(count * 32)
+    calldata = section(data_size)
+    if offsets[0] != 0 or offsets[-1] != data_size or any(offsets[idx] > offsets[idx + 1] for idx in range(count)):
+        raise InvalidInputsError("Invalid queue snapshot: bad calldata offsets.")
+
+    calls = CallStore.from_buffers(
+        [to_checksum_address(targets[idx:idx + 20].hex()) for idx in range(0, count * 20, 20)],
+        [int.from_bytes(values[idx:idx + 32], "big") for idx in range(0, count * 32, 32)],
+        calldata,
+        offsets
+    )
+
+    proofs = decoders = None
+    if has_proofs:
+        proof_offsets = _read_array("I", section((count + 1) * 4))
+        decoder_bytes = section(count * 20)
+        words = section(proof_words * 32).tobytes()
+        if proof_offsets[0] != 0 or proof_offsets[-1] != proof_words or any(proof_offsets[idx] > proof_offsets[idx + 1] for idx in range(count)):
+            raise InvalidInputsError("Invalid queue snapshot: bad proof offsets.")
+        proofs = [
+            [words[word * 32:word * 32 + 32] for word in range(proof_offsets[idx], proof_offsets[idx + 1])]
+            for idx in range(count)
+        ]
+        decoders = [to_checksum_address(decoder_bytes[idx:idx + 20].hex()) for idx in range(0, count * 20, 20)]
+
+    return QueueSnapshot(
+        chain_id, to_checksum_address(manager.hex()), to_checksum_address(strategist.hex()),
+        "0x" + root.hex(), calls, call_groups, proofs, decoders
+    )
+
+def write_snapshot(path: str, snapshot: QueueSnapshot) -> None:
+    """Writes a snapshot to a file, atomically replacing any previous one."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(dump_snapshot(snapshot))
+    os.replace(tmp_path, path)
+
+def read_snapshot(path: str) -> QueueSnapshot:
+    """Reads a snapshot file through a memory map."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise InvalidInputsError(f"Invalid queue snapshot: '{path}' is empty.")
+        # Unmapped once the last view into it is released, which may outlive this call on errors
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return load_snapshot(mapped)
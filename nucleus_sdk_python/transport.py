@@ -0,0 +1,87 @@
+import json
+import random
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from urllib3.exceptions import InvalidHeader
+from urllib3.util.retry import Retry
+from .exceptions import APIError
+from .config import API_CONNECT_TIMEOUT, API_READ_TIMEOUT, API_RETRIES, API_BACKOFF_FACTOR, API_BACKOFF_JITTER, API_BACKOFF_MAX, API_RETRY_STATUSES, API_POOL_SIZE
+
+class TransportConfig(NamedTuple):
+    """
+    How a client talks to the API.
+
+    Failed requests (connection errors, timeouts and the retry statuses) are retried with exponential
+    backoff: backoff_factor * 2 ** attempt seconds, capped at backoff_max, plus a random jitter. A
+    Retry-After header sent with a 429 or 503 takes precedence. Proof and tree requests do not change
+    server state, so POSTs are retried too.
+
+    :param connect_timeout: Seconds to wait for a connection
+    :param read_timeout: Seconds to wait for the response
+    :param retries: Retries after the first attempt; 0 disables retrying
+    :param backoff_factor: Base of the exponential backoff (seconds)
+    :param backoff_jitter: Maximum random delay added to every backoff (seconds)
+    :param backoff_max: Maximum backoff (seconds)
+    :param retry_statuses: HTTP statuses that are retried
+    :param pool_size: Keep-alive connections kept per host, i.e. concurrent requests without reconnecting
+    """
+    connect_timeout: float = API_CONNECT_TIMEOUT
+    read_timeout: float = API_READ_TIMEOUT
+    retries: int = API_RETRIES
+    backoff_factor: float = API_BACKOFF_FACTOR
+    backoff_jitter: float = API_BACKOFF_JITTER
+    backoff_max: float = API_BACKOFF_MAX
+    retry_statuses: Tuple[int, ...] = API_RETRY_STATUSES
+    pool_size: int = API_POOL_SIZE
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """The (connect, read) timeout as taken by requests."""
+        return (self.connect_timeout, self.read_timeout)
+
+    def retry(self) -> Retry:
+        """The urllib3 retry policy of a requests adapter."""
+        return Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            backoff_jitter=self.backoff_jitter,
+            backoff_max=self.backoff_max,
+            status_forcelist=self.retry_statuses,
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+            # The last response is returned, so its error message reaches the APIError
+            raise_on_status=False
+        )
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait before retrying, for clients that retry by hand.
+
+        :param attempt: Number of failed attempts so far, minus one
+        :param retry_after: The Retry-After header of the failed response, if any
+        """
+        if retry_after is not None:
+            try:
+                return Retry().parse_retry_after(retry_after)
+            except InvalidHeader:
+                pass
+        return min(self.backoff_max, self.backoff_factor * 2 ** attempt) + random.uniform(0, self.backoff_jitter)
+
+def parse_response(status: int, reason: Optional[str], text: str, url: str) -> Dict[str, Any]:
+    """
+    Parses an API response body.
+
+    :return: The JSON body
+    :raises APIError: For error statuses, with the API's message when the body carries one, and for
+        bodies that are not JSON
+    """
+    try:
+        body = json.loads(text)
+    except ValueError:
+        body = None
+
+    if status >= 400:
+        message = body.get("message") if isinstance(body, dict) else None
+        raise APIError(message or f"{status} {reason} for url: {url}", status_code=status)
+    if body is None and text.strip() != "null":
+        raise APIError(f"Invalid JSON response from {url}: {text[:200]!r}", status_code=status)
+    return body
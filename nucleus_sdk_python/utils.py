@@ -1,6 +1,45 @@
-from eth_utils import keccak
-from eth_abi import encode
-from web3 import Web3
+import re
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+from eth_hash.auto import keccak
+from .config import SIGNATURE_CACHE_SIZE
+
+if TYPE_CHECKING:
+    from eth_abi.encoding import TupleEncoder
+
+_ADDRESS_PATTERN = re.compile(r"^(0[xX])?[0-9a-fA-F]{40}$")
+
+def to_checksum_address(address: str) -> str:
+    """
+    Converts a hex address to its EIP-55 checksum form. Same result as eth_utils.to_checksum_address,
+    without importing eth_utils.
+
+    :param address: A 20 byte hex address, with or without 0x prefix
+    :return: The checksummed address
+    :raises ValueError: If the value is not a hex address
+    """
+    if not isinstance(address, str) or not _ADDRESS_PATTERN.match(address):
+        raise ValueError(f"Unknown format {address!r}, attempted to normalize to '0x' hex address")
+    return _checksum(address[-40:].lower())
+
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE * 8)
+def _checksum(hex_address: str) -> str:
+    # Strategies reuse a small set of addresses, so checksums are cached
+    digest = keccak(hex_address.encode()).hex()
+    return "0x" + "".join(char.upper() if nibble in "89abcdef" else char for char, nibble in zip(hex_address, digest))
+
+def is_address(value: Any) -> bool:
+    """
+    Checks a value is a hex address: all lower case, all upper case, or with a valid EIP-55 checksum.
+    Same result as eth_utils.is_address for strings, without importing eth_utils.
+    """
+    if not isinstance(value, str) or not _ADDRESS_PATTERN.match(value):
+        return False
+    hex_address = value[-40:]
+    lower = hex_address.lower()
+    if hex_address == lower or hex_address == hex_address.upper():
+        return True
+    return _checksum(lower)[2:] == hex_address
 
 def parse_argument_types(signature: str):
     """
@@ -37,6 +76,188 @@ def parse_argument_types(signature: str):
     # Split top-level argument types
     return split_types(args_str)
 
+# Sizes are checked in _static_word_encoder; other spellings are left to eth_abi
+_INTEGER_TYPE = re.compile(r"^(u?)int([1-9]\d*)?$")
+_FIXED_BYTES_TYPE = re.compile(r"^bytes([1-9]\d*)$")
+
+def _static_word_encoder(arg_type: str) -> Optional[Callable[[Any], bytes]]:
+    """
+    Builds a function encoding one value of an elementary static type into its 32 byte word.
+    Validates values the way eth_abi does, raising ValueError.
+
+    :param arg_type: The argument type, e.g., "uint256"
+    :return: The word encoder, or None for dynamic, array and tuple types and invalid sizes, which
+        are left to eth_abi
+    """
+    if arg_type == "address":
+        def encode_address(value):
+            if isinstance(value, (bytes, bytearray)) and len(value) == 20:
+                return b"\x00" * 12 + bytes(value)
+            if isinstance(value, str) and is_address(value):
+                return b"\x00" * 12 + bytes.fromhex(value[2:] if value[:2] in ("0x", "0X") else value)
+            raise ValueError(f"Invalid address {value!r}")
+        return encode_address
+
+    if arg_type == "bool":
+        def encode_bool(value):
+            if not isinstance(value, bool):
+                raise ValueError(f"Invalid bool {value!r}")
+            return b"\x00" * 31 + (b"\x01" if value else b"\x00")
+        return encode_bool
+
+    match = _INTEGER_TYPE.match(arg_type)
+    bits = int(match.group(2) or 256) if match else 0
+    if match and bits % 8 == 0 and bits <= 256:
+        signed = match.group(1) == ""
+        low, high = (-(1 << (bits - 1)), 1 << (bits - 1)) if signed else (0, 1 << bits)
+        def encode_integer(value):
+            if not isinstance(value, int) or isinstance(value, bool) or not low <= value < high:
+                raise ValueError(f"Invalid {arg_type} {value!r}")
+            return value.to_bytes(32, "big", signed=signed)
+        return encode_integer
+
+    match = _FIXED_BYTES_TYPE.match(arg_type)
+    if match and int(match.group(1)) <= 32:
+        size = int(match.group(1))
+        def encode_fixed_bytes(value):
+            if not isinstance(value, (bytes, bytearray)) or len(value) > size:
+                raise ValueError(f"Invalid {arg_type} {value!r}")
+            return bytes(value).ljust(32, b"\x00")
+        return encode_fixed_bytes
+
+    return None
+
+class CompiledSignature:
+    """
+    A function signature resolved once into everything needed to encode calls to it.
+
+    Signatures whose arguments are all elementary static types are encoded word by word without eth_abi,
+    which is only imported for other signatures, or to report invalid arguments.
+
+    :param signature: The function signature, e.g., "approve(address,uint256)"
+    :param selector: The 4 byte function selector
+    :param arg_types: The parsed argument types, e.g., ('address', 'uint256')
+    :param word_encoders: One word encoder per argument when every argument is an elementary static type, else None
+    """
+    __slots__ = ("signature", "selector", "arg_types", "word_encoders", "_encoder")
+
+    def __init__(self, signature: str, selector: bytes, arg_types: Tuple[str, ...], word_encoders: Optional[Tuple[Callable[[Any], bytes], ...]] = None):
+        self.signature = signature
+        self.selector = selector
+        self.arg_types = arg_types
+        self.word_encoders = word_encoders
+        self._encoder: Optional["TupleEncoder"] = None
+
+    def __repr__(self) -> str:
+        return f"CompiledSignature({self.signature!r})"
+
+    @property
+    def encoder(self) -> "TupleEncoder":
+        """A reusable eth_abi encoder for the argument tuple, built on first use."""
+        if self._encoder is None:
+            from eth_abi.encoding import TupleEncoder
+            from eth_abi.registry import registry
+            self._encoder = TupleEncoder(encoders=[registry.get_encoder(arg_type) for arg_type in self.arg_types])
+        return self._encoder
+
+    def encode(self, args: list) -> bytes:
+        """
+        Encodes the arguments and prefixes them with the function selector.
+
+        :param args: Arguments to encode, including structs as tuples.
+        :return: ABI-encoded bytes with the function selector.
+        """
+        word_encoders = self.word_encoders
+        if word_encoders is not None and len(args) == len(word_encoders):
+            try:
+                return b"".join([self.selector] + [encode(arg) for encode, arg in zip(word_encoders, args)])
+            except (ValueError, TypeError):
+                # Invalid arguments are left to eth_abi, which raises its usual errors
+                pass
+        return self.selector + self.encoder(args)
+
+    def decode(self, data: bytes) -> tuple:
+        """
+        Decodes the arguments of a call to this function.
+
+        :param data: The calldata, including the function selector
+        :return: The decoded arguments
+        :raises ValueError: If the selector does not match or the arguments cannot be decoded
+        """
+        if bytes(data[:4]) != self.selector:
+            raise ValueError(f"Selector 0x{bytes(data[:4]).hex()} is not the selector of {self.signature}")
+        from eth_abi import decode
+        try:
+            return decode(self.arg_types, bytes(data[4:]))
+        except Exception as e:
+            raise ValueError(f"Could not decode {self.signature}: {e}") from e
+
+    def encode_rows(self, rows: Sequence[Sequence[Any]]) -> List[bytes]:
+        """
+        Encodes many calls at once.
+
+        When every argument is an elementary static type (address, bool, intN, uintN, bytesN) the rows
+        are encoded column by column into fixed-width words, each distinct value being encoded once.
+        Other signatures fall back to the eth_abi encoder row by row.
+
+        :param rows: The arguments of every call
+        :return: The ABI-encoded bytes of every call, with the function selector
+        :raises ValueError: If a row does not match the signature, naming the row
+        """
+        for idx, row in enumerate(rows):
+            if len(row) != len(self.arg_types):
+                raise ValueError(f"Row {idx} has {len(row)} arguments, {self.signature} takes {len(self.arg_types)}")
+
+        if self.word_encoders is None:
+            encoded = []
+            for idx, row in enumerate(rows):
+                try:
+                    encoded.append(self.encode(row))
+                except Exception as e:
+                    raise ValueError(f"Row {idx}: {e}") from e
+            return encoded
+
+        columns = []
+        for arg_type, word_encoder in zip(self.arg_types, self.word_encoders):
+            column = len(columns)
+            # Address checks hash the checksum, so each distinct address string is encoded once.
+            # Other values (e.g. bytes or bytearray addresses) are encoded directly.
+            words = {} if arg_type == "address" else None
+            column_words = []
+            for idx, row in enumerate(rows):
+                value = row[column]
+                try:
+                    if words is None or not isinstance(value, str):
+                        word = word_encoder(value)
+                    else:
+                        word = words.get(value)
+                        if word is None:
+                            word = words[value] = word_encoder(value)
+                except (ValueError, TypeError) as e:
+                    raise ValueError(f"Row {idx}: {e}") from e
+                column_words.append(word)
+            columns.append(column_words)
+        selector = self.selector
+        return [b"".join((selector, *words)) for words in zip(*columns)] if columns else [selector] * len(rows)
+
+@lru_cache(maxsize=SIGNATURE_CACHE_SIZE)
+def compile_signature(signature: str) -> CompiledSignature:
+    """
+    Compiles a Solidity function signature into a cached CompiledSignature.
+
+    The keccak selector, the parsed argument types and the encoders are built on the first call
+    for a signature and reused afterwards; the least recently used signatures are evicted once
+    SIGNATURE_CACHE_SIZE is exceeded.
+
+    :param signature: Function signature, e.g., "doSomething((address,uint256))"
+    :return: The compiled signature
+    """
+    arg_types = tuple(parse_argument_types(signature))
+    word_encoders = tuple(_static_word_encoder(arg_type) for arg_type in arg_types)
+    if any(word_encoder is None for word_encoder in word_encoders):
+        word_encoders = None
+    return CompiledSignature(signature, keccak(signature.encode())[:4], arg_types, word_encoders)
+
 def encode_with_signature(signature: str, args: list):
     """
     Encodes data according to a Solidity function signature, including nested structs.
@@ -46,14 +267,7 @@ def encode_with_signature(signature: str, args: list):
     :param args: Arguments to encode, including structs as tuples.
     :return: ABI-encoded bytes with the function selector.
     """
-    # Compute the function selector
-    function_selector = keccak(text=signature)[:4]
-    # Parse argument types
-    arg_types = parse_argument_types(signature)
-    # ABI-encode the arguments
-    encoded_args = encode(arg_types, args)
-    # Combine the function selector and encoded arguments
-    return function_selector + encoded_args
+    return compile_signature(signature).encode(args)
 
 def checksum_addresses_in_json(data):
     """
@@ -67,7 +281,7 @@ def checksum_addresses_in_json(data):
     elif isinstance(data, list):
         return [checksum_addresses_in_json(item) for item in data]
     elif isinstance(data, str):
-        # Check if the string is a valid Ethereum address
-        if Web3.is_address(data):
-            return Web3.to_checksum_address(data)
+        # Check if the string is a valid Ethereum address, skipping the full check for strings that cannot be one
+        if _ADDRESS_PATTERN.match(data) and is_address(data):
+            return to_checksum_address(data)
     return data
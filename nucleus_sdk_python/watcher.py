@@ -0,0 +1,211 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from .exceptions import ProtocolError
+from .nonce_manager import NonceManager
+from .root_cache import RootKey, root_key
+from .utils import compile_signature
+from .config import WATCHER_RECONNECT_DELAY, WATCHER_START_TIMEOUT
+
+class ChainState(NamedTuple):
+    """
+    Fee state of a chain at its latest block, as tracked by a ChainStateWatcher.
+
+    Args:
+        block_number: The latest block number
+        base_fee: The block's base fee per gas, None before London
+        priority_fee: The node's suggested priority fee per gas
+        gas_price: The gas price used for manage transactions
+        updated_at: time.monotonic() of the update
+    """
+    block_number: int
+    base_fee: Optional[int]
+    priority_fee: int
+    gas_price: int
+    updated_at: float
+
+_MANAGE_ROOT = compile_signature("manageRoot(address)")
+
+class ChainStateWatcher:
+    """
+    Keeps the chain state a client depends on up to date in the background, from a newHeads
+    subscription over a WebSocket (ws:// or wss:// URL) or IPC (socket path) provider.
+
+    On every new block the watcher reads, in one concurrent round trip:
+        - the manageRoot of every watched queue, stored in the client's root cache. A changed root
+          drops the cached proofs of the old root and invalidates the transactions prepared for it.
+          Watched queues switch to the new root on their own thread, at the start of their next
+          get_calldata, execute or prepare.
+        - the priority fee; the gas price (base fee + priority fee) is stored in client.chain_states,
+          where queues read it instead of calling eth_gasPrice, and is reported to the client's
+          prepared transactions (see PreparedTransaction.observe_gas_price)
+        - the pending nonce of every watched account, which moves its nonce manager forward when
+          transactions were sent from elsewhere
+
+    The subscription runs on its own event loop in a daemon thread and reconnects after errors.
+
+        with ChainStateWatcher(client, "wss://...", chain_id) as watcher:
+            watcher.watch_queue(queue)
+            watcher.watch_account(client.get_nonce_manager(w3, chain_id, acc.address))
+            ...
+
+    Args:
+        client: The Client or AsyncClient whose caches are kept up to date
+        provider_url: A ws:// or wss:// URL, or the path of an IPC socket
+        chain_id: The chain ID of the provider
+        reconnect_delay: Seconds between reconnection attempts
+    """
+
+    def __init__(self, client: Any, provider_url: str, chain_id: int, reconnect_delay: float = WATCHER_RECONNECT_DELAY):
+        self.client = client
+        self.provider_url = provider_url
+        self.chain_id = int(chain_id)
+        self.reconnect_delay = reconnect_delay
+        # Watched roots: key -> (manager address, strategist address) and the queues following the key
+        self._roots: Dict[RootKey, tuple] = {}
+        self._queues: Dict[RootKey, List[Any]] = {}
+        self._nonce_managers: List[NonceManager] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready = threading.Event()
+        # Last connection or update error, None after a successful update
+        self.last_error: Optional[BaseException] = None
+
+    @property
+    def state(self) -> Optional[ChainState]:
+        """The latest chain state, or None before the first block."""
+        return self.client.chain_states.get(self.chain_id)
+
+    def watch_queue(self, queue: Any) -> None:
+        """
+        Tracks the root of a queue's strategist. The queue follows root changes, see CalldataQueue.refresh_root.
+        """
+        if int(queue.chain_id) != self.chain_id:
+            raise ValueError(f"The queue is on chain {queue.chain_id}, the watcher on chain {self.chain_id}.")
+        key = root_key(queue.chain_id, queue.manager_address, queue.strategist_address)
+        with self._lock:
+            self._roots[key] = (queue.manager_address, queue.strategist_address)
+            self._queues.setdefault(key, []).append(queue)
+
+    def watch_account(self, nonce_manager: NonceManager) -> None:
+        """Keeps a nonce manager at or above its account's pending transaction count."""
+        with self._lock:
+            self._nonce_managers.append(nonce_manager)
+
+    def start(self, timeout: float = WATCHER_START_TIMEOUT) -> "ChainStateWatcher":
+        """
+        Connects, subscribes and waits for the initial state.
+
+        Raises:
+            ProtocolError: If the initial state could not be read within timeout seconds
+        """
+        if self._thread is not None:
+            return self
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name=f"nucleus-chain-watcher-{self.chain_id}", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            error = self.last_error
+            self.stop()
+            raise ProtocolError(f"Could not read the state of chain {self.chain_id} from '{self.provider_url}': {error!r}")
+        return self
+
+    def stop(self) -> None:
+        """Unsubscribes, disconnects and forgets the chain state."""
+        thread, loop, task = self._thread, self._loop, self._task
+        if thread is None:
+            return
+        if loop is not None and task is not None:
+            loop.call_soon_threadsafe(task.cancel)
+        thread.join()
+        self._thread = self._loop = self._task = None
+        self.client.chain_states.pop(self.chain_id, None)
+
+    def __enter__(self) -> "ChainStateWatcher":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._task = self._loop.create_task(self._watch())
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def _provider(self):
+        from web3 import AsyncIPCProvider, WebSocketProvider
+
+        if self.provider_url.startswith(("ws://", "wss://")):
+            return WebSocketProvider(self.provider_url)
+        return AsyncIPCProvider(self.provider_url)
+
+    async def _watch(self) -> None:
+        """Subscribes to new heads and applies every block, reconnecting after errors."""
+        from web3 import AsyncWeb3
+
+        while True:
+            try:
+                async with AsyncWeb3(self._provider()) as w3:
+                    connected_chain_id = await w3.eth.chain_id
+                    if connected_chain_id != self.chain_id:
+                        raise ProtocolError(f"'{self.provider_url}' serves chain {connected_chain_id}, not {self.chain_id}.")
+                    await w3.eth.subscribe("newHeads")
+                    await self._update(w3, await w3.eth.get_block("latest"))
+                    async for message in w3.socket.process_subscriptions():
+                        await self._update(w3, message["result"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = e
+                self.client.metrics.error("watcher", e, chain_id=self.chain_id)
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _update(self, w3, header: Dict[str, Any]) -> None:
+        """Reads and applies the state at a block."""
+        with self.client.metrics.stage("watcher.update", chain_id=self.chain_id):
+            block_number = header["number"]
+            base_fee = header.get("baseFeePerGas")
+            with self._lock:
+                roots = list(self._roots.items())
+                nonce_managers = list(self._nonce_managers)
+
+            reads = [w3.eth.max_priority_fee if base_fee is not None else w3.eth.gas_price]
+            reads += [w3.eth.call({"to": manager, "data": _MANAGE_ROOT.encode([strategist])}, block_number) for _, (manager, strategist) in roots]
+            reads += [w3.eth.get_transaction_count(nonce_manager.address, "pending") for nonce_manager in nonce_managers]
+            results = await asyncio.gather(*reads)
+
+            fee, raw_roots, pending_nonces = results[0], results[1:1 + len(roots)], results[1 + len(roots):]
+            if base_fee is not None:
+                self._apply_fees(block_number, base_fee, fee, base_fee + fee)
+            else:
+                self._apply_fees(block_number, None, 0, fee)
+            for (key, _), raw_root in zip(roots, raw_roots):
+                self._apply_root(key, block_number, "0x" + bytes(raw_root).hex())
+            for nonce_manager, pending in zip(nonce_managers, pending_nonces):
+                nonce_manager.observe_pending_nonce(pending)
+        self.last_error = None
+        self._ready.set()
+
+    def _apply_fees(self, block_number: int, base_fee: Optional[int], priority_fee: int, gas_price: int) -> None:
+        self.client.chain_states[self.chain_id] = ChainState(block_number, base_fee, priority_fee, gas_price, time.monotonic())
+        for prepared in list(self.client.prepared_transactions):
+            if prepared.key[0] == self.chain_id:
+                prepared.observe_gas_price(gas_price)
+
+    def _apply_root(self, key: RootKey, block_number: int, root: str) -> None:
+        if int(root, 16) == 0:
+            # The strategist has no root (any more); queues keep theirs and fail on execution
+            return
+        self.client.root_cache.set(key, root, block_number)
+        with self._lock:
+            queues = list(self._queues.get(key, ()))
+        for queue in queues:
+            queue._follow_root(root)
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+from nucleus_sdk_python.calldata_queue import CalldataQueue
+from nucleus_sdk_python.metrics import NULL_METRICS
+from nucleus_sdk_python.proof_cache import PackedArgumentsCache, ProofCache
+
+TOKEN = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+SPENDER = "0xDB74dfDD3BB46bE8Ce6C33dC9D82777BCFc3dEd5"
+DECODER = "0x33a4392C4264611C81Dbfd7052FfB75D60DD4650"
+ROOT = "0x" + "aa" * 32
+
+class FakeClient:
+    def __init__(self):
+        self.address_book = SimpleNamespace(lookup=lambda chain, protocol, symbol: {"manager": SPENDER})
+        self.proof_cache = ProofCache()
+        self.packed_arguments_cache = PackedArgumentsCache()
+        self.metrics = NULL_METRICS
+        self.chain_states = {}
+        self.posts = []
+
+    def post(self, endpoint, data):
+        self.posts.append(data)
+        calls = data["calls"]
+        # Each proof ends with the last word of its call's calldata, so results can be told apart
+        return {"proofs": [["0x" + "11" * 32] * 3 + ["0x" + call["calldata"][-64:]] for call in calls], "decoderAndSanitizerAddress": [DECODER] * len(calls)}
+
+def make_queue():
+    queue = CalldataQueue.__new__(CalldataQueue)
+    queue._init_state(1, SPENDER, "http://localhost", "tETH", FakeClient())
+    queue.root = ROOT
+    return queue
@@ -0,0 +1,30 @@
+import pytest
+from nucleus_sdk_python.exceptions import InvalidInputsError
+from .helpers import SPENDER, TOKEN, make_queue
+
+def test_add_calls_batch_matches_add_call():
+    rows = [[SPENDER, amount] for amount in range(4)]
+    single = make_queue()
+    for row in rows:
+        single.add_call(TOKEN, "approve(address,uint256)", row, 0)
+
+    batched = make_queue()
+    with batched.atomic():
+        batched.add_calls_batch(TOKEN, "approve(address,uint256)", rows)
+    assert list(batched.calls) == list(single.calls)
+    assert [batched._leaf(idx) for idx in range(4)] == [single._leaf(idx) for idx in range(4)]
+    assert batched._call_groups == [0] * 4
+
+    with pytest.raises(InvalidInputsError):
+        batched.add_calls_batch([TOKEN], "approve(address,uint256)", rows)
+    assert len(batched.calls) == 4
+
+def test_add_call_and_add_calls_batch_reject_invalid_arguments_alike():
+    queue = make_queue()
+    with pytest.raises(InvalidInputsError, match="approve"):
+        queue.add_call(TOKEN, "approve(address,uint256)", [SPENDER, -1], 0)
+    with pytest.raises(InvalidInputsError, match="approve"):
+        queue.add_calls_batch(TOKEN, "approve(address,uint256)", [[SPENDER, -1]])
+    with pytest.raises(InvalidInputsError, match="f\\(string\\)"):
+        queue.add_call(TOKEN, "f(string)", [1], 0)
+    assert len(queue.calls) == 0
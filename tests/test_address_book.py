@@ -0,0 +1,95 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from nucleus_sdk_python.address_book import AddressBook
+from nucleus_sdk_python.exceptions import APIError
+
+DOCUMENT = {"1": {"nucleus": {"tETH": {"manager": "0xf875dee4e500ab850369fa9c9f6a8296b912c598"}}, "token": {"USDC": "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48", "name": "not an address"}}}
+ETAG = '"v1"'
+
+class AddressBookHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == ETAG or self.server.not_modified:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(DOCUMENT).encode()
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def endpoint():
+    server = HTTPServer(("127.0.0.1", 0), AddressBookHandler)
+    server.requests = []
+    server.not_modified = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_port}/address-book"
+    server.shutdown()
+
+def test_lazy_load_and_lookup(endpoint, tmp_path):
+    server, url = endpoint
+    book = AddressBook(url, cache_path=str(tmp_path / "book.json"))
+    assert server.requests == []
+
+    assert book.lookup(1, "nucleus", "tETH")["manager"] == "0xf875dEe4e500ab850369fa9c9F6a8296B912c598"
+    assert book["1"]["token"]["USDC"] == "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+    assert book["1"]["token"]["name"] == "not an address"
+    assert server.requests == [None]
+    with pytest.raises(KeyError):
+        book.lookup(1, "nucleus", "Not_a_symbol")
+
+def test_disk_cache_ttl_and_revalidation(endpoint, tmp_path):
+    server, url = endpoint
+    cache_path = str(tmp_path / "book.json")
+    AddressBook(url, cache_path=cache_path).load()
+
+    # A fresh cache is used without any request
+    assert "1" in AddressBook(url, cache_path=cache_path)
+    assert server.requests == [None]
+
+    # An expired cache is revalidated with its ETag
+    book = AddressBook(url, cache_path=cache_path, ttl=0)
+    assert book.lookup("1", "token", "USDC") == "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+    assert server.requests == [None, ETAG]
+
+def test_async_load_shares_one_download_and_falls_back_to_stale_cache(endpoint, tmp_path):
+    import aiohttp
+
+    server, url = endpoint
+    cache_path = str(tmp_path / "book.json")
+
+    async def load_concurrently(book):
+        async with aiohttp.ClientSession() as session:
+            return await asyncio.gather(*[book.async_load(session) for _ in range(5)])
+
+    book = AddressBook(url, cache_path=cache_path)
+    assert all(data["1"]["nucleus"]["tETH"] for data in asyncio.run(load_concurrently(book)))
+    assert server.requests == [None]
+
+    # An unreachable endpoint serves the expired cached copy, or raises APIError without one
+    unreachable = "http://127.0.0.1:9/address-book"
+    stale = AddressBook(unreachable, cache_path=cache_path, ttl=0)
+    with open(cache_path) as f:
+        cached = json.load(f)
+    cached["endpoint"] = unreachable
+    with open(cache_path, "w") as f:
+        json.dump(cached, f)
+    assert "1" in asyncio.run(load_concurrently(stale))[0]
+    with pytest.raises(APIError):
+        asyncio.run(load_concurrently(AddressBook(unreachable, cache_path=None)))
+
+def test_not_modified_without_cache_raises(endpoint):
+    server, url = endpoint
+    server.not_modified = True
+    with pytest.raises(APIError, match="304"):
+        AddressBook(url, cache_path=None).load()
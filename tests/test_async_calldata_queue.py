@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from eth_account import Account
+from eth_utils import keccak
+from benchmarks.mock_api import APPROVE, SPENDER, SYMBOL, MockNucleusAPI, token_address
+from nucleus_sdk_python.address_book import AddressBook
+from nucleus_sdk_python.async_client import AsyncClient
+from nucleus_sdk_python.client import Client
+
+ACCOUNT = Account.from_key("0x" + "01" * 32)
+MANAGER = "0x0000000000000000000000000000000000000002"
+
+@pytest.fixture
+def api():
+    api = MockNucleusAPI(8, chain_id=1, manager_address=MANAGER).start()
+    yield api
+    api.stop()
+
+def run(api, body):
+    """Runs body(client, queue) against the mock API, with a queue of one approve call per token."""
+    async def main():
+        async with AsyncClient("test", base_url=api.url, address_book=AddressBook(api.address_book_url, cache_path=None)) as client:
+            queue = await client.create_calldata_queue(1, ACCOUNT.address, api.rpc_url, SYMBOL)
+            for idx in range(4):
+                queue.add_call(token_address(idx), APPROVE, [SPENDER, idx + 1], 0)
+            return await body(client, queue)
+    return asyncio.run(main())
+
+def sync_calldata(api):
+    client = Client("test", base_url=api.url, address_book=AddressBook(api.address_book_url, cache_path=None))
+    queue = client.create_calldata_queue(1, ACCOUNT.address, api.rpc_url, SYMBOL)
+    for idx in range(4):
+        queue.add_call(token_address(idx), APPROVE, [SPENDER, idx + 1], 0)
+    return queue.get_calldata()
+
+def test_read_root_uses_the_root_cache(api):
+    async def body(client, queue):
+        requests = api.requests
+        assert await queue._read_root() == api.root
+        assert api.requests == requests
+        assert await queue._read_root(use_cache=False) == api.root
+        assert api.requests > requests
+        return queue.root
+
+    assert run(api, body) == api.root
+
+def test_get_calldata_matches_the_sync_queue(api):
+    async def body(client, queue):
+        calldata = await queue.get_calldata(verify=True)
+        # The proofs are cached, so a second build does not reach the API
+        requests = api.requests
+        assert await queue.get_calldata() == calldata
+        assert api.requests == requests
+        return calldata
+
+    assert run(api, body) == sync_calldata(api)
+
+def test_load_tree_serves_proofs_from_decoder_outputs(api):
+    async def body(client, queue):
+        tree = await queue.load_tree()
+        assert tree.root == api.root
+
+        async def no_api(endpoint, data=None):
+            raise AssertionError(f"unexpected API request to {endpoint}")
+        client.post = no_api
+        return await queue.get_calldata(verify=True)
+
+    assert run(api, body) == sync_calldata(api)
+
+def test_execute_reads_fields_concurrently(api):
+    async def body(client, queue):
+        w3 = await client.get_web3(api.rpc_url)
+        return await queue.execute(w3, ACCOUNT), queue.last_execution_timings
+
+    tx_hash, timings = run(api, body)
+    assert len(tx_hash) == 32
+    assert {"get_calldata", "get_transaction_count", "estimate_gas", "gas_price", "sign", "send_raw_transaction"} <= set(timings)
+
+def test_prepare_signs_every_fee_variant(api):
+    async def body(client, queue):
+        w3 = await client.get_web3(api.rpc_url)
+        prepared = await queue.prepare(w3, ACCOUNT)
+        return prepared, await prepared.async_commit()
+
+    prepared, tx_hash = run(api, body)
+    assert prepared.nonce == 0 and prepared.gas == 100_000
+    assert prepared.gas_prices[0] == 10 ** 9
+    assert len(prepared.raw_transactions) == len(prepared.gas_prices)
+    assert tx_hash == keccak(prepared.raw_transactions[0])
+
+def test_execute_split_allocates_consecutive_nonces(api):
+    async def body(client, queue):
+        w3 = await client.get_web3(api.rpc_url)
+        # One call per manage transaction
+        tx_hashes = await queue.execute_split(w3, ACCOUNT, wait=False, max_gas=2_000_000, gas_estimator=lambda call: 1_000_000)
+        return tx_hashes, client.get_nonce_manager(w3, 1, ACCOUNT.address)
+
+    tx_hashes, nonce_manager = run(api, body)
+    assert len(set(tx_hashes)) == 4
+    assert nonce_manager.peek_nonce() == 4
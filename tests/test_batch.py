@@ -0,0 +1,52 @@
+import threading
+import time
+from types import SimpleNamespace
+from nucleus_sdk_python.batch import QueueSpec
+from nucleus_sdk_python.calldata_queue import CalldataQueue
+from nucleus_sdk_python.client import Client
+from nucleus_sdk_python.exceptions import InvalidInputsError
+from .helpers import FakeClient, SPENDER, TOKEN, ROOT
+
+class OfflineClient(Client):
+    """Client whose queues skip the root read and whose API answers like FakeClient."""
+
+    def __init__(self):
+        super().__init__("test", address_book=SimpleNamespace(lookup=self._lookup))
+        self.active = 0
+        self.max_active = 0
+        self._active_lock = threading.Lock()
+
+    def _lookup(self, chain, protocol, symbol):
+        if symbol != "tETH":
+            raise KeyError(symbol)
+        return {"manager": SPENDER}
+
+    def create_calldata_queue(self, chain_id, strategist_address, rpc_url, symbol):
+        queue = CalldataQueue.__new__(CalldataQueue)
+        queue._init_state(chain_id, strategist_address, rpc_url, symbol, self)
+        queue.root = ROOT
+        return queue
+
+    def post(self, endpoint, data):
+        with self._active_lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self._active_lock:
+            self.active -= 1
+        return FakeClient.post(SimpleNamespace(posts=[]), endpoint, data)
+
+def test_builds_queues_concurrently_and_isolates_failures():
+    client = OfflineClient()
+    approve = (TOKEN, "approve(address,uint256)", [SPENDER, 1], 0)
+    specs = [QueueSpec(chain_id, SPENDER, "http://localhost", "tETH", calls=[approve]) for chain_id in range(1, 7)]
+    specs.insert(2, QueueSpec(1, SPENDER, "http://localhost", "unknown", calls=[approve]))
+    specs.insert(4, QueueSpec(1, SPENDER, "http://localhost", "tETH", calls=[(TOKEN, "approve(address,uint256)", ["not an address", 1], 0)]))
+
+    results = client.build_calldata_queues(specs, max_workers=4)
+    assert [result.spec for result in results] == specs
+    assert [result.ok for result in results] == [True, True, False, True, False, True, True, True]
+    assert isinstance(results[2].error, InvalidInputsError) and results[2].queue is None
+    assert results[4].queue is not None
+    assert all(result.calldata[:4] == bytes.fromhex("244b0f6a") for result in results if result.ok)
+    assert 1 < client.max_active <= 4
@@ -0,0 +1,58 @@
+import pytest
+from nucleus_sdk_python.calls import Call, CallStore, MANAGE_SIGNATURE, encode_manage_call
+from nucleus_sdk_python.exceptions import InvalidInputsError
+from nucleus_sdk_python.proof_cache import leaf_key
+from nucleus_sdk_python.utils import compile_signature
+
+TOKEN = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+SPENDER = "0xDB74dfDD3BB46bE8Ce6C33dC9D82777BCFc3dEd5"
+DECODER = "0x33a4392C4264611C81Dbfd7052FfB75D60DD4650"
+
+def make_store():
+    store = CallStore()
+    store.append(TOKEN, compile_signature("approve(address,uint256)").encode([SPENDER, 140]), 0)
+    store.append(SPENDER, compile_signature("deposit()").encode([]), 10**18)
+    store.append(TOKEN, compile_signature("swap(bytes,uint256)").encode([b"\x01" * 45, 7]), 0)
+    return store
+
+def test_call_store_returns_immutable_records():
+    store = make_store()
+    assert len(store) == 3
+    assert store[1] == Call(SPENDER, 10**18, compile_signature("deposit()").selector)
+    assert store[-1].target_address == TOKEN
+    with pytest.raises(AttributeError):
+        store[0].value = 1
+    with pytest.raises(IndexError):
+        store[3]
+
+def test_call_store_keys_match_leaf_keys():
+    store = make_store()
+    batched = CallStore()
+    batched.extend([store.target(idx) for idx in range(3)], [store[idx].data for idx in range(3)], [store.value(idx) for idx in range(3)])
+    restored = CallStore.from_buffers(list(store._targets), list(store._values), store.buffer, store.offsets)
+    expected = [leaf_key(1, {"target": store.target(idx), "calldata": store.hex_data(idx), "value": store.value(idx)}) for idx in range(3)]
+    for calls in (store, batched, restored):
+        assert ["1:" + key for key in calls.keys] == expected
+
+def test_call_store_validates_inputs():
+    store = CallStore()
+    with pytest.raises(InvalidInputsError):
+        store.append("0x1234", b"", 0)
+    with pytest.raises(InvalidInputsError):
+        store.append(TOKEN, b"", -1)
+
+@pytest.mark.parametrize("indices", [None, [2, 0], []])
+def test_encode_manage_call_matches_eth_abi(indices):
+    store = make_store()
+    selected = list(range(len(store))) if indices is None else indices
+    proofs = [[bytes([idx + 1]) * 32] * (idx + 1) for idx in selected]
+    decoders = [DECODER] * len(selected)
+
+    expected = compile_signature(MANAGE_SIGNATURE).encode([
+        proofs,
+        decoders,
+        [store[idx].target_address for idx in selected],
+        [store[idx].data for idx in selected],
+        [store[idx].value for idx in selected]
+    ])
+    assert encode_manage_call(store, proofs, decoders, indices) == expected
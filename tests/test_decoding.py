@@ -0,0 +1,56 @@
+import json
+import pytest
+from nucleus_sdk_python import decoding
+from nucleus_sdk_python.calls import CallStore, encode_manage_call
+from nucleus_sdk_python.decoding import ManageCalldata, iter_manage_calldata, register_signatures, signature_index
+from nucleus_sdk_python.exceptions import InvalidInputsError
+from nucleus_sdk_python.utils import compile_signature
+from .helpers import TOKEN, SPENDER, DECODER
+
+def manage_calldata():
+    calls = CallStore()
+    calls.append(TOKEN, compile_signature("approve(address,uint256)").encode([SPENDER, 5]), 0)
+    calls.append(SPENDER, compile_signature("deposit(uint256,bytes)").encode([7, b"\x01" * 40]), 3)
+    proofs = [[b"\x11" * 32, b"\x22" * 32], [b"\x33" * 32]]
+    return calls, proofs, encode_manage_call(calls, proofs, [DECODER, DECODER])
+
+def test_decodes_calls_without_copying(monkeypatch):
+    monkeypatch.setattr(decoding, "_REGISTERED_SIGNATURES", {})
+    calls, proofs, calldata = manage_calldata()
+    decoded = ManageCalldata(calldata, signatures=signature_index(["approve(address,uint256)"]))
+    assert len(decoded) == 2
+    for call, record in zip(calls, decoded):
+        assert (record.target, bytes(record.data), record.value, record.decoder) == (call.target_address, call.data, call.value, DECODER)
+        assert record.data.obj is calldata
+    assert [[bytes(node) for node in record.proof] for record in decoded] == proofs
+
+    assert decoded[0].decode() == ("approve(address,uint256)", (SPENDER.lower(), 5))
+    # Only the given signatures are used
+    assert decoded[1].decode() is None
+    # By default only registered signatures are known, whatever was compiled before
+    assert ManageCalldata(calldata)[-1].decode() is None
+    register_signatures(["deposit(uint256,bytes)"])
+    assert ManageCalldata(calldata)[-1].decode() == ("deposit(uint256,bytes)", (7, b"\x01" * 40))
+
+def test_rejects_malformed_calldata():
+    _, _, calldata = manage_calldata()
+    with pytest.raises(InvalidInputsError, match="selector"):
+        ManageCalldata(b"\x00" * 4 + calldata[4:])
+    with pytest.raises(InvalidInputsError, match="out of bounds"):
+        ManageCalldata(calldata[:200])
+
+def test_streams_transaction_files(tmp_path):
+    _, _, calldata = manage_calldata()
+    path = tmp_path / "transactions.jsonl"
+    path.write_text("\n".join([
+        "0x" + calldata.hex(),
+        json.dumps({"hash": "0x01", "input": "0x" + calldata.hex()}),
+        "",
+        json.dumps({"hash": "0x02", "data": "0xa9059cbb"}),
+    ]))
+
+    with pytest.raises(InvalidInputsError, match="Line 4"):
+        list(iter_manage_calldata(str(path)))
+    decoded = list(iter_manage_calldata(str(path), skip_invalid=True))
+    assert [len(calls) for calls in decoded] == [2, 2]
+    assert decoded[0].transaction is None and decoded[1].transaction["hash"] == "0x01"
@@ -0,0 +1,91 @@
+import time
+import pytest
+from types import SimpleNamespace
+from nucleus_sdk_python.watcher import ChainState
+from .helpers import make_queue
+
+ACCOUNT = SimpleNamespace(address="0xDB74dfDD3BB46bE8Ce6C33dC9D82777BCFc3dEd5")
+
+class RecordingEth:
+    """Answers the reads of _fetch_tx_fields, with request placeholders while a batch is open."""
+
+    def __init__(self, w3):
+        self.w3 = w3
+        self.reads = []
+
+    def _read(self, name, value):
+        self.reads.append(name)
+        return (name, value) if self.w3.batch is not None else value
+
+    def get_transaction_count(self, address):
+        return self._read("get_transaction_count", 7)
+
+    def estimate_gas(self, tx):
+        return self._read("estimate_gas", 100_000)
+
+    @property
+    def gas_price(self):
+        return self._read("gas_price", 3 * 10 ** 9)
+
+class FakeBatch:
+    def __init__(self, w3):
+        self.w3 = w3
+        self.requests = []
+
+    def __enter__(self):
+        self.w3.batch = self
+        return self
+
+    def __exit__(self, *exc_info):
+        self.w3.batch = None
+
+    def add(self, request):
+        self.requests.append(request)
+
+    def execute(self):
+        return [value for name, value in self.requests]
+
+class FakeWeb3:
+    def __init__(self, batching):
+        self.eth = RecordingEth(self)
+        self.batching = batching
+        self.batch = None
+        self.batches = []
+
+    def batch_requests(self):
+        if not self.batching:
+            raise NotImplementedError("batch requests are not supported")
+        self.batches.append(FakeBatch(self))
+        return self.batches[-1]
+
+def test_batching_provider_gets_one_batch():
+    queue = make_queue()
+    w3 = FakeWeb3(batching=True)
+    timings = {}
+    assert queue._fetch_tx_fields(w3, ACCOUNT, b"", timings) == (7, 100_000, 3 * 10 ** 9)
+    assert len(w3.batches) == 1
+    assert [name for name, value in w3.batches[0].requests] == ["get_transaction_count", "estimate_gas", "gas_price"]
+    assert list(timings) == ["rpc_batch"]
+
+@pytest.mark.parametrize("local_nonce", [None, 11])
+@pytest.mark.parametrize("watched_gas_price", [None, 5 * 10 ** 9])
+def test_fallback_times_every_read(local_nonce, watched_gas_price):
+    queue = make_queue()
+    if watched_gas_price is not None:
+        queue.client.chain_states[queue.chain_id] = ChainState(1, 10 ** 9, 10 ** 9, watched_gas_price, time.monotonic())
+    w3 = FakeWeb3(batching=False)
+    timings = {}
+
+    fields = queue._fetch_tx_fields(w3, ACCOUNT, b"", timings, local_nonce)
+    expected_nonce = 7 if local_nonce is None else local_nonce
+    expected_gas_price = 3 * 10 ** 9 if watched_gas_price is None else watched_gas_price
+    assert fields == (expected_nonce, 100_000, expected_gas_price)
+
+    reads = ["estimate_gas"]
+    if local_nonce is None:
+        reads.insert(0, "get_transaction_count")
+    if watched_gas_price is None:
+        reads.append("gas_price")
+    assert sorted(w3.eth.reads) == sorted(reads)
+    assert sorted(timings) == sorted(reads)
+    assert all(seconds >= 0 for seconds in timings.values())
@@ -0,0 +1,16 @@
+import subprocess
+import sys
+
+def loaded_modules(code: str) -> set:
+    """Runs code in a fresh interpreter and returns the top-level modules it loaded."""
+    output = subprocess.check_output([sys.executable, "-c", code + "\nimport sys; print(' '.join(sorted({name.split('.')[0] for name in sys.modules})))"], text=True)
+    return set(output.split())
+
+def test_encoding_does_not_load_web3_or_http_clients():
+    modules = loaded_modules("from nucleus_sdk_python.encoding import encode_with_signature; encode_with_signature('approve(address,uint256)', ['0xDB74dfDD3BB46bE8Ce6C33dC9D82777BCFc3dEd5', 1])")
+    assert not modules & {"web3", "requests", "aiohttp", "eth_abi"}
+
+def test_client_loads_web3_on_first_rpc_use():
+    modules = loaded_modules("from nucleus_sdk_python import Client; Client('key')")
+    assert "web3" not in modules
+    assert "web3" in loaded_modules("from nucleus_sdk_python import Client; Client('key').get_web3('http://127.0.0.1:9')")
@@ -0,0 +1,174 @@
+import pytest
+from types import SimpleNamespace
+from eth_utils import keccak
+from nucleus_sdk_python.exceptions import ProtocolError
+from nucleus_sdk_python.merkle import DEFAULT_LEAF_DIGEST, ManageTree, build_tree, get_proof, hash_pair, manage_leaf_digest, verify_proof, verify_proofs
+from nucleus_sdk_python.utils import encode_with_signature
+from .helpers import make_queue
+
+DECODER = "0x33a4392C4264611C81Dbfd7052FfB75D60DD4650"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+SPENDERS = ["0xDB74dfDD3BB46bE8Ce6C33dC9D82777BCFc3dEd5", "0xBA12222222228d8Ba445958a75a0704d566BF2C8"]
+
+def tree_json(root=None):
+    leafs = []
+    for idx, (target, spender) in enumerate([(WETH, SPENDERS[0]), (WETH, SPENDERS[1]), (USDC, SPENDERS[0])]):
+        leafs.append({
+            "LeafId": idx,
+            "TargetAddress": target,
+            "CanSendValue": False,
+            "FunctionSignature": "approve(address,uint256)",
+            "FunctionSelector": "0x095ea7b3",
+            "AddressArguments": [spender],
+            "DecoderAndSanitizerAddress": DECODER,
+        })
+    return {"metadata": {"ManageRoot": root}, "leafs": leafs}
+
+def verify(root, proof, leaf):
+    node = leaf
+    for sibling in proof:
+        node = hash_pair(node, sibling)
+    return node == root
+
+def test_leaf_digest_layout():
+    digest = manage_leaf_digest(DECODER, WETH, True, bytes.fromhex("095ea7b3"), bytes.fromhex(SPENDERS[0][2:]))
+    packed = bytes.fromhex(DECODER[2:]) + bytes.fromhex(WETH[2:]) + b"\x01" + bytes.fromhex("095ea7b3") + bytes.fromhex(SPENDERS[0][2:])
+    assert digest == keccak(packed)
+
+def test_build_tree_pads_and_proves():
+    leaves = [keccak(bytes([i])) for i in range(3)]
+    layers = build_tree(leaves)
+    assert layers[0][3] == DEFAULT_LEAF_DIGEST
+    assert len(layers[-1]) == 1
+    for idx, leaf in enumerate(leaves):
+        assert verify(layers[-1][0], get_proof(layers, idx), leaf)
+
+def test_tree_serves_proofs_and_decoders():
+    tree = ManageTree.from_json(tree_json())
+    leaf = {"target": WETH.lower(), "calldata": "0x" + encode_with_signature("approve(address,uint256)", [SPENDERS[1], 5]).hex(), "value": 0}
+    outputs = {DECODER.lower(): bytes.fromhex(SPENDERS[1][2:])}
+    assert tree.decoders_for(WETH, bytes.fromhex(leaf["calldata"][2:]), 0) == [DECODER]
+    proof, decoder = tree.proof_and_decoder(leaf, outputs)
+    assert decoder == DECODER
+    assert verify(bytes.fromhex(tree.root[2:]), [bytes.fromhex(node[2:]) for node in proof], tree.leaves[1].digest)
+
+    with pytest.raises(ProtocolError):
+        tree.proof_and_decoder(dict(leaf, value=1), outputs)
+    # Without the decoder's output the leaf cannot be decided locally
+    with pytest.raises(ProtocolError):
+        tree.proof_and_decoder(leaf, {})
+
+def test_find_leaf_matches_exact_packed_addresses():
+    swap = {
+        "TargetAddress": WETH,
+        "CanSendValue": False,
+        "FunctionSignature": "swap(address,address)",
+        "AddressArguments": [SPENDERS[0], SPENDERS[0]],
+        "DecoderAndSanitizerAddress": DECODER,
+    }
+    tree = ManageTree.from_json({"metadata": {}, "leafs": [swap]})
+    evil = "0x" + "ee" * 20
+    calldata = encode_with_signature("swap(address,address)", [SPENDERS[0], evil])
+
+    # The spender appears in the calldata, but the decoder packs both arguments
+    with pytest.raises(ProtocolError):
+        tree.find_leaf(WETH, calldata, 0, {DECODER.lower(): bytes.fromhex(SPENDERS[0][2:]) + bytes.fromhex(evil[2:])})
+    calldata = encode_with_signature("swap(address,address)", [SPENDERS[0], SPENDERS[0]])
+    assert tree.find_leaf(WETH, calldata, 0, {DECODER.lower(): bytes.fromhex(SPENDERS[0][2:]) * 2}) == 0
+
+def test_stale_tree_is_rejected():
+    root = ManageTree.from_json(tree_json()).root
+    assert ManageTree.from_json(tree_json(root)).root == root
+    with pytest.raises(ProtocolError, match="stale"):
+        ManageTree.from_json(tree_json("0x" + "00" * 32))
+
+def test_verify_proofs_reports_failed_leaves():
+    leaves = [keccak(bytes([i])) for i in range(4)]
+    layers = build_tree(leaves)
+    proofs = [get_proof(layers, idx) for idx in range(4)]
+    proofs[2] = proofs[1]
+    assert verify_proof(layers[-1][0], proofs[0], leaves[0])
+    assert verify_proofs(layers[-1][0], proofs, leaves) == [2]
+
+class RevertingDecoderEth:
+    """Answers decoder and sanitizer calls for SPENDERS[0] approvals and reverts for any other call."""
+
+    def call(self, tx):
+        from eth_abi import encode
+        from web3.exceptions import ContractLogicError
+        if SPENDERS[0][2:].lower() in tx["data"]:
+            return encode(["bytes"], [bytes.fromhex(SPENDERS[0][2:])])
+        raise ContractLogicError("execution reverted: spender not allowed")
+
+class FailingBatchWeb3:
+    def __init__(self):
+        self.eth = RevertingDecoderEth()
+
+    def batch_requests(self):
+        from web3.exceptions import ContractLogicError
+        raise ContractLogicError("execution reverted: spender not allowed")
+
+def test_queue_reports_reverting_decoder_per_leaf():
+    tree = ManageTree.from_json(tree_json())
+    queue = make_queue()
+    queue.root = tree.root
+    queue.w3 = FailingBatchWeb3()
+    for spender in SPENDERS:
+        queue.add_call(WETH, "approve(address,uint256)", [spender, 1], 0)
+
+    # Leaves 0 and 1 are the WETH approvals of SPENDERS[0] and SPENDERS[1]
+    proofs = [[bytes.fromhex(node[2:]) for node in tree.proof(idx)] for idx in range(2)]
+
+    failures = queue.verify_proofs(proofs, [DECODER] * 2)
+    assert [failure["index"] for failure in failures] == [1]
+    assert "spender not allowed" in failures[0]["reason"]
+    # Reverts are cached like results
+    assert len(queue.client.packed_arguments_cache) == 2
+
+def test_queue_resolves_tree_leaves_from_decoder_outputs():
+    tree = ManageTree.from_json(tree_json())
+    queue = make_queue()
+    queue.root = tree.root
+    queue.tree = tree
+    for spender in SPENDERS:
+        queue.add_call(WETH, "approve(address,uint256)", [spender, 1], 0)
+
+    # Without a Web3 instance the decoders cannot be called, so every leaf is left to the API
+    queue._get_batch_proofs_and_decoders()
+    assert len(queue.client.posts[-1]["calls"]) == 2
+
+    queue.client.proof_cache.clear()
+    queue.w3 = FailingBatchWeb3()
+    results = queue._get_batch_proofs_and_decoders()
+    # The SPENDERS[0] approval is proven by the tree, the reverting one is left to the API
+    assert results["proofs"][0] == tree.proof(0)
+    assert [call["calldata"] for call in queue.client.posts[-1]["calls"]] == [queue._leaf(1)["calldata"]]
+
+class FixedDecoderWeb3:
+    """Answers every decoder and sanitizer call with the same packed addresses."""
+
+    def __init__(self, packed):
+        from eth_abi import encode
+        self.eth = SimpleNamespace(call=lambda tx: encode(["bytes"], [packed]))
+
+    def batch_requests(self):
+        raise NotImplementedError
+
+def test_verify_proofs_uses_decoder_output_over_tree():
+    tree = ManageTree.from_json(tree_json())
+    queue = make_queue()
+    queue.root = tree.root
+    queue.tree = tree
+    queue.client.packed_arguments_cache.clear()
+    queue.add_call(WETH, "approve(address,uint256)", [SPENDERS[0], 1], 0)
+    proofs = [[bytes.fromhex(node[2:]) for node in tree.proof(0)]]
+
+    # The tree leaf packs SPENDERS[0], but the decoder packs the call as SPENDERS[1]
+    queue.w3 = FixedDecoderWeb3(bytes.fromhex(SPENDERS[1][2:]))
+    failures = queue.verify_proofs(proofs, [DECODER])
+    assert [failure["reason"] for failure in failures] == ["proof does not lead to the root"]
+
+    queue.client.packed_arguments_cache.clear()
+    queue.w3 = FixedDecoderWeb3(bytes.fromhex(SPENDERS[0][2:]))
+    assert queue.verify_proofs(proofs, [DECODER]) == []
@@ -0,0 +1,36 @@
+import pytest
+from nucleus_sdk_python.metrics import CallbackMetrics, Metrics, NULL_METRICS
+from .helpers import SPENDER, TOKEN, make_queue
+
+def test_base_metrics_are_disabled_and_free():
+    assert not NULL_METRICS.enabled
+    assert NULL_METRICS.stage("a") is NULL_METRICS.stage("b")
+
+    class Counting(Metrics):
+        pass
+    assert Counting().enabled
+
+def test_queue_emits_stages_sizes_and_counts():
+    events = []
+    queue = make_queue()
+    queue.client.metrics = CallbackMetrics(lambda kind, name, value, tags: events.append((kind, name, value)))
+
+    queue.add_calls_batch(TOKEN, "approve(address,uint256)", [[SPENDER, 1], [SPENDER, 1], [SPENDER, 2]])
+    queue.get_calldata()
+    queue.get_calldata()
+
+    names = [(kind, name) for kind, name, value in events]
+    assert ("timing", "add_calls_batch") in names
+    assert ("timing", "get_calldata") in names
+    counts = [(name, value) for kind, name, value in events if kind == "count"]
+    assert counts[:4] == [("proof_cache.hit", 0), ("proof_cache.miss", 3), ("proof_tree.hit", 0), ("multiproofs.duplicate_leaves", 1)]
+    assert counts[4:] == [("proof_cache.hit", 3), ("proof_cache.miss", 0), ("proof_tree.hit", 0), ("multiproofs.duplicate_leaves", 0)]
+    assert ("size", "multiproofs.leaves", 2) in events
+
+def test_failed_stage_reports_error():
+    errors = []
+    metrics = CallbackMetrics(lambda kind, name, value, tags: kind == "error" and errors.append((name, value)))
+    with pytest.raises(ValueError):
+        with metrics.stage("boom"):
+            raise ValueError("no")
+    assert [(name, str(exc)) for name, exc in errors] == [("boom", "no")]
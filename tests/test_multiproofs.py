@@ -0,0 +1,23 @@
+from .helpers import SPENDER, TOKEN, make_queue
+
+def test_duplicate_leaves_are_requested_once():
+    queue = make_queue()
+    queue.add_calls_batch(TOKEN, "approve(address,uint256)", [[SPENDER, 1], [SPENDER, 2], [SPENDER, 1], [SPENDER, 1]])
+    queue.add_call(TOKEN.lower(), "approve(address,uint256)", [SPENDER, 2], 0)
+
+    results = queue._get_batch_proofs_and_decoders()
+    assert [call["calldata"] for call in queue.client.posts[0]["calls"]] == [queue.calls.hex_data(0), queue.calls.hex_data(1)]
+    assert [int(proof[-1], 16) for proof in results["proofs"]] == [1, 2, 1, 1, 2]
+    assert len(results["decoderAndSanitizerAddress"]) == 5
+
+def test_cached_calls_build_no_leaves(monkeypatch):
+    queue = make_queue()
+    queue.add_calls_batch(TOKEN, "approve(address,uint256)", [[SPENDER, 1], [SPENDER, 2]])
+    queue._get_batch_proofs_and_decoders()
+    queue.add_call(TOKEN, "approve(address,uint256)", [SPENDER, 3], 0)
+
+    built = []
+    leaf = queue._leaf
+    monkeypatch.setattr(queue, "_leaf", lambda idx: built.append(idx) or leaf(idx))
+    queue._get_batch_proofs_and_decoders()
+    assert built == [2]
@@ -0,0 +1,114 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from nucleus_sdk_python.nonce_manager import NonceManager
+from .helpers import make_queue
+
+ADDRESS = "0xDB74dfDD3BB46bE8Ce6C33dC9D82777BCFc3dEd5"
+
+class FakeEth:
+    def __init__(self, pending):
+        self.pending = pending
+        self.reads = 0
+
+    def get_transaction_count(self, address, block_identifier):
+        assert block_identifier == "pending"
+        self.reads += 1
+        return self.pending
+
+def test_allocates_unique_nonces_across_threads():
+    eth = FakeEth(7)
+    manager = NonceManager(SimpleNamespace(eth=eth), ADDRESS)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        nonces = list(executor.map(lambda _: manager.next_nonce(), range(100)))
+    assert sorted(nonces) == list(range(7, 107))
+    assert manager.pending_nonce == 107
+    assert eth.reads <= 8
+
+def test_reset_and_sync_realign_with_chain():
+    eth = FakeEth(3)
+    manager = NonceManager(SimpleNamespace(eth=eth), ADDRESS)
+    assert [manager.next_nonce(), manager.next_nonce()] == [3, 4]
+
+    # The transaction using nonce 4 was dropped
+    eth.pending = 4
+    assert manager.sync() == 4
+    assert manager.next_nonce() == 4
+
+    manager.reset()
+    eth.pending = 10
+    assert manager.next_nonce() == 10
+
+
+def test_released_nonces_are_reused_while_others_are_in_flight():
+    eth = FakeEth(3)
+    manager = NonceManager(SimpleNamespace(eth=eth), ADDRESS)
+    first, second, third = manager.next_nonce(), manager.next_nonce(), manager.next_nonce()
+
+    # A failure must not realign with the chain while later nonces are still held
+    manager.release_nonce(first)
+    assert manager.pending_nonce == 3 and manager.next_nonce() == 3
+    manager.release_nonce(third)
+    assert manager.next_nonce() == 5
+    assert manager.in_flight == 3
+
+    manager.mark_broadcast(second)
+    manager.mark_broadcast(3)
+    # The last nonce in flight failed: realign with the chain
+    eth.pending = 5
+    manager.release_nonce(5)
+    assert manager.in_flight == 0 and manager.pending_nonce is None
+    assert manager.next_nonce() == 5 and eth.reads == 2
+
+class FlakyChain:
+    """Signs transactions as dicts and fails every fourth broadcast."""
+
+    def __init__(self, pending):
+        self.account = self
+        self.gas_price = 10 ** 9
+        self.first = pending
+        self.sent = []
+        self.attempts = 0
+        self.lock = threading.Lock()
+
+    def get_transaction_count(self, address, block_identifier="latest"):
+        with self.lock:
+            nonce = self.first
+            while nonce in self.sent:
+                nonce += 1
+            return nonce
+
+    def estimate_gas(self, tx):
+        return 100_000
+
+    def sign_transaction(self, tx, key):
+        return {"raw_transaction": tx}
+
+    def send_raw_transaction(self, tx):
+        time.sleep(0.002)
+        with self.lock:
+            self.attempts += 1
+            if self.attempts % 4 == 0:
+                raise ConnectionError("broadcast failed")
+            self.sent.append(tx["nonce"])
+        return tx["nonce"]
+
+def test_concurrent_submission_failures_never_duplicate_nonces():
+    eth = FlakyChain(7)
+    w3 = SimpleNamespace(eth=eth, batch_requests=lambda: (_ for _ in ()).throw(NotImplementedError()))
+    manager = NonceManager(w3, ADDRESS)
+    queue = make_queue()
+    queue.client.chain_states = {}
+
+    def submit(_):
+        try:
+            return queue._submit(w3, SimpleNamespace(address=ADDRESS, key=None), b"", {}, manager)
+        except ConnectionError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(submit, range(80)))
+    assert results.count(None) == 20
+    assert len(eth.sent) == len(set(eth.sent)) == 60
+    assert manager.in_flight == 0
@@ -0,0 +1,40 @@
+import pytest
+from eth_abi import decode
+from nucleus_sdk_python.calldata_queue import MANAGE_SIGNATURE
+from nucleus_sdk_python.exceptions import InvalidInputsError
+from nucleus_sdk_python.planner import encoded_call_size, plan_chunks, MANAGE_BASE_SIZE
+from nucleus_sdk_python.utils import compile_signature
+from .helpers import DECODER, SPENDER, TOKEN, make_queue
+
+def test_encoded_call_size_matches_abi_encoding():
+    data = compile_signature("approve(address,uint256)").encode([SPENDER, 1])
+    proof = [b"\x11" * 32] * 4
+    encoded = compile_signature(MANAGE_SIGNATURE).encode([[proof], [DECODER], [TOKEN], [data], [0]])
+    assert len(encoded) == MANAGE_BASE_SIZE + encoded_call_size(len(data), len(proof))
+
+def test_plan_chunks_keeps_groups_together():
+    groups = [[0], [1, 2], [3]]
+    chunks = plan_chunks(groups, [100] * 4, [0] * 4, max_gas=10**9, max_calldata_bytes=MANAGE_BASE_SIZE + 200)
+    assert chunks == [[0], [1, 2], [3]]
+
+    with pytest.raises(InvalidInputsError):
+        plan_chunks(groups, [100] * 4, [0] * 4, max_gas=10**9, max_calldata_bytes=MANAGE_BASE_SIZE + 150)
+
+def test_split_calldata_fetches_proofs_once():
+    queue = make_queue()
+    for amount in range(5):
+        with queue.atomic():
+            queue.add_call(TOKEN, "approve(address,uint256)", [SPENDER, amount], 0)
+            queue.add_call(TOKEN, "transfer(address,uint256)", [SPENDER, amount], 0)
+
+    calldatas = queue.get_split_calldata(max_gas=21000 + 150_000, gas_estimator=lambda call: 50_000)
+    assert len(queue.client.posts) == 1
+    assert len(calldatas) == 5
+
+    amounts = []
+    for calldata in calldatas:
+        proofs, decoders, targets, data, values = decode(["bytes32[][]", "address[]", "address[]", "bytes[]", "uint256[]"], calldata[4:])
+        assert len(data) == 2
+        assert data[0][:4] == compile_signature("approve(address,uint256)").selector
+        amounts.append(int.from_bytes(data[0][-32:], "big"))
+    assert amounts == list(range(5))
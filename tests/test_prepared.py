@@ -0,0 +1,88 @@
+import pytest
+from types import SimpleNamespace
+from eth_account import Account
+from nucleus_sdk_python.calldata_queue import CalldataQueue
+from nucleus_sdk_python.client import Client
+from nucleus_sdk_python.exceptions import ProtocolError
+from nucleus_sdk_python.nonce_manager import NonceManager
+from nucleus_sdk_python.root_cache import root_key
+from .helpers import FakeClient, SPENDER, TOKEN, ROOT
+
+ACCOUNT = Account.from_key("0x" + "01" * 32)
+
+class FakeEth:
+    def __init__(self):
+        self.account = Account
+        self.gas_price = 10 ** 9
+        self.pending = 5
+        self.sent = []
+
+    def estimate_gas(self, tx):
+        return 100_000
+
+    def get_transaction_count(self, address, block_identifier="latest"):
+        return self.pending
+
+    def send_raw_transaction(self, raw_transaction):
+        self.sent.append(raw_transaction)
+        return b"\x01" * 32
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+    def batch_requests(self):
+        raise NotImplementedError
+
+def setup():
+    w3 = FakeWeb3()
+    # A real client, so that root changes reach prepared transactions through Client._on_root_change
+    client = Client("test", address_book=SimpleNamespace(lookup=lambda chain, protocol, symbol: {"manager": SPENDER}))
+    client.post = FakeClient().post
+    manager = NonceManager(w3, ACCOUNT.address)
+    client.get_nonce_manager = lambda w3, chain_id, address: manager
+
+    queue = CalldataQueue.__new__(CalldataQueue)
+    queue._init_state(1, ACCOUNT.address, "http://localhost", "tETH", client)
+    queue.root = ROOT
+    queue.add_call(TOKEN, "approve(address,uint256)", [SPENDER, 1], 0)
+    return w3, queue, manager
+
+def test_commit_sends_the_cheapest_sufficient_variant():
+    w3, queue, manager = setup()
+    prepared = queue.prepare(w3, ACCOUNT, fee_multipliers=(1.0, 1.5, 2.0))
+    assert prepared.nonce == 5 and prepared.gas_prices == [10 ** 9, 15 * 10 ** 8, 2 * 10 ** 9]
+    # The nonce is only claimed on commit
+    assert manager.pending_nonce == 5
+
+    prepared.observe_gas_price(12 * 10 ** 8)
+    assert prepared.gas_price == 15 * 10 ** 8
+    prepared.commit()
+    assert Account.recover_transaction(w3.eth.sent[0]) == ACCOUNT.address
+    assert w3.eth.sent == [prepared.raw_transactions[1]]
+    assert manager.pending_nonce == 6
+
+    with pytest.raises(ProtocolError, match="already committed"):
+        prepared.commit()
+
+def test_invalidated_by_nonce_root_and_fees():
+    w3, queue, manager = setup()
+    prepared = queue.prepare(w3, ACCOUNT)
+    manager.next_nonce()
+    with pytest.raises(ProtocolError, match="nonce 5"):
+        prepared.commit()
+
+    prepared = queue.prepare(w3, ACCOUNT)
+    key = root_key(queue.chain_id, queue.manager_address, queue.strategist_address)
+    queue.client.root_cache.set(key, ROOT)
+    assert prepared.valid
+    queue.client.root_cache.set(key, "0x" + "bb" * 32)
+    assert prepared.invalid_reason == f"the root changed from {ROOT} to 0x{'bb' * 32}"
+
+    queue._set_root("0x" + "bb" * 32)
+    prepared = queue.prepare(w3, ACCOUNT, fee_multipliers=(1.0, 1.25))
+    prepared.observe_gas_price(2 * 10 ** 9)
+    assert not prepared.valid
+    with pytest.raises(ProtocolError, match="gas price"):
+        prepared.commit()
+    assert w3.eth.sent == []
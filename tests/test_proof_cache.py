@@ -0,0 +1,62 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from nucleus_sdk_python.proof_cache import BaseProofCache, PackedArgumentsCache, ProofCache, SQLiteProofCache, leaf_key
+
+ROOT_A = "0x" + "aa" * 32
+ROOT_B = "0x" + "bb" * 32
+
+def entry(n):
+    return (["0x" + f"{n:064x}"], "0x33A4392C4264611C81dbfd7052ffb75D60Dd4650")
+
+def test_leaf_key_is_case_insensitive():
+    leaf = {"target": "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2", "calldata": "0x095EA7B3", "value": 0}
+    lower = {"target": leaf["target"].lower(), "calldata": leaf["calldata"].lower(), "value": 0}
+    assert leaf_key(1, leaf) == leaf_key(1, lower)
+    assert leaf_key(1, leaf) != leaf_key(10, leaf)
+
+def test_in_memory_lru_eviction_and_drop_root():
+    cache = ProofCache(max_entries=2)
+    cache.set_many(ROOT_A, [("a", entry(1)), ("b", entry(2))])
+    # Touch "a" so that "b" is the least recently used entry
+    assert cache.get_many(ROOT_A, ["a"]) == [entry(1)]
+    cache.set_many(ROOT_B, [("c", entry(3))])
+    assert cache.get_many(ROOT_A, ["a", "b"]) == [entry(1), None]
+
+    cache.drop_root(ROOT_A)
+    assert cache.get_many(ROOT_A, ["a"]) == [None]
+    assert cache.get_many(ROOT_B, ["c"]) == [entry(3)]
+
+def test_packed_arguments_cache_is_bounded_under_concurrent_stores():
+    cache = PackedArgumentsCache(max_entries=50)
+    keys = [("0xdecoder", f"0x{n:08x}") for n in range(2000)]
+
+    def store(start):
+        for key in keys[start:start + 200]:
+            cache.set_many([(key, b"\x01" * 20)])
+            cache.get_many([keys[0], key])
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        list(executor.map(store, range(0, len(keys), 200)))
+    assert len(cache) == 50
+    assert sum(output is not None for output in cache.get_many(keys)) == 50
+
+def test_sqlite_cache_persists(tmp_path):
+    path = str(tmp_path / "proofs.db")
+    cache = SQLiteProofCache(path, max_entries=2)
+    cache.set_many(ROOT_A, [("a", entry(1)), ("b", entry(2))])
+    cache.close()
+
+    cache = SQLiteProofCache(path, max_entries=2)
+    assert cache.get_many(ROOT_A, ["b", "missing", "a"]) == [entry(2), None, entry(1)]
+    cache.set_many(ROOT_B, [("c", entry(3))])
+    assert len(cache) == 2
+    cache.drop_root(ROOT_B)
+    assert cache.get_many(ROOT_B, ["c"]) == [None]
+
+def test_base_cache_requires_every_method():
+    class Partial(BaseProofCache):
+        def get_many(self, root, keys):
+            return [None] * len(keys)
+
+    with pytest.raises(TypeError):
+        Partial()
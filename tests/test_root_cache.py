@@ -0,0 +1,33 @@
+from nucleus_sdk_python.root_cache import RootCache, root_key
+
+MANAGER = "0xf875dEe4e500ab850369fa9c9F6a8296B912c598"
+STRATEGIST = "0xDB74dfDD3BB46bE8Ce6C33dC9D82777BCFc3dEd5"
+ROOT_A = "0x" + "aa" * 32
+ROOT_B = "0x" + "bb" * 32
+
+def test_root_key_is_case_insensitive():
+    assert root_key(1, MANAGER, STRATEGIST) == root_key("1", MANAGER.lower(), STRATEGIST.upper().replace("0X", "0x"))
+
+def test_ttl_and_block_freshness():
+    cache = RootCache(ttl=60)
+    key = root_key(1, MANAGER, STRATEGIST)
+    assert cache.get(key) is None
+
+    cache.set(key, ROOT_A, block_number=100)
+    assert cache.get(key) == ROOT_A
+    assert cache.get(key, min_block=100) == ROOT_A
+    assert cache.get(key, min_block=101) is None
+
+    cache.ttl = -1
+    assert cache.get(key) is None
+
+def test_listeners_are_notified_of_root_changes():
+    cache = RootCache()
+    key = root_key(1, MANAGER, STRATEGIST)
+    changes = []
+    cache.subscribe(lambda key, old, new: changes.append((old, new)))
+
+    cache.set(key, ROOT_A)
+    cache.set(key, ROOT_A)
+    cache.set(key, ROOT_B)
+    assert changes == [(ROOT_A, ROOT_B)]
@@ -0,0 +1,47 @@
+import pytest
+from nucleus_sdk_python.calldata_queue import CalldataQueue
+from nucleus_sdk_python.exceptions import InvalidInputsError
+from nucleus_sdk_python.snapshot import load_snapshot
+from .helpers import FakeClient, make_queue, SPENDER, TOKEN, ROOT
+
+def filled_queue():
+    queue = make_queue()
+    queue.add_call(TOKEN, "approve(address,uint256)", [SPENDER, 1], 0)
+    with queue.atomic():
+        queue.add_calls_batch(TOKEN, "transfer(address,uint256)", [[SPENDER, amount] for amount in range(3)], values=[0, 1, 2 ** 255])
+    return queue
+
+def test_snapshot_round_trip():
+    queue = filled_queue()
+    snapshot = load_snapshot(queue.to_snapshot())
+    assert (snapshot.chain_id, snapshot.manager_address, snapshot.strategist_address, snapshot.root) == (1, SPENDER, SPENDER, ROOT)
+    assert list(snapshot.calls) == list(queue.calls)
+    assert snapshot.call_groups == [0, 1, 1, 1]
+    assert snapshot.proofs is None
+
+def test_restored_queue_executes_without_api_requests(tmp_path):
+    queue = filled_queue()
+    expected = queue.get_calldata()
+    path = tmp_path / "queue.snapshot"
+    path.write_bytes(queue.to_snapshot(include_proofs=True))
+
+    client = FakeClient()
+    restored = CalldataQueue.from_snapshot(client, str(path))
+    assert restored.root == ROOT
+    assert list(restored.calls) == list(queue.calls)
+    assert restored.get_calldata() == expected
+    assert client.posts == []
+
+    # Restored queues keep growing like any other
+    restored.add_call(TOKEN, "approve(address,uint256)", [SPENDER, 2], 0)
+    assert len(restored.calls) == 5 and restored._call_groups[-1] == 4
+
+def test_rejects_corrupt_snapshots():
+    data = bytearray(filled_queue().to_snapshot())
+    with pytest.raises(InvalidInputsError, match="magic"):
+        load_snapshot(b"XXXX" + data[4:])
+    with pytest.raises(InvalidInputsError, match="expected"):
+        load_snapshot(data[:-1])
+    data[-1] ^= 1
+    with pytest.raises(InvalidInputsError, match="checksum"):
+        load_snapshot(data)
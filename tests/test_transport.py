@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from nucleus_sdk_python.async_client import AsyncClient
+from nucleus_sdk_python.client import Client
+from nucleus_sdk_python.exceptions import APIError
+from nucleus_sdk_python.transport import TransportConfig
+
+FAST = TransportConfig(retries=2, backoff_factor=0, backoff_jitter=0)
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Serves each path's scripted (status, body, headers) responses in turn, repeating the last one."""
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self):
+        script = self.server.scripts[self.path.split("?")[0]]
+        self.server.hits[self.path] = hits = self.server.hits.get(self.path, 0) + 1
+        status, body, headers = script[min(hits, len(script)) - 1]
+        body = body.encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = respond
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.respond()
+
+@pytest.fixture
+def server():
+    server = HTTPServer(("127.0.0.1", 0), FlakyHandler)
+    server.hits = {}
+    server.scripts = {
+        "/flaky": [(502, "<html>Bad Gateway</html>", {}), (429, "", {"Retry-After": "0"}), (200, json.dumps({"ok": True}), {})],
+        "/down": [(503, json.dumps({"message": "Maintenance"}), {})],
+        "/html": [(200, "<html></html>", {})]
+    }
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_port}/"
+    yield server
+    server.shutdown()
+
+def test_retries_transient_failures(server):
+    client = Client("key", base_url=server.url, transport=FAST)
+    assert client.post("flaky", data={}) == {"ok": True}
+    assert server.hits["/flaky"] == 3
+
+    with pytest.raises(APIError, match="Maintenance") as e:
+        client.get("down")
+    assert e.value.status_code == 503
+    assert server.hits["/down"] == 3
+
+def test_wraps_invalid_bodies_and_connection_errors(server):
+    client = Client("key", base_url=server.url, transport=FAST)
+    with pytest.raises(APIError, match="Invalid JSON"):
+        client.get("html")
+
+    client = Client("key", base_url="http://127.0.0.1:9/", transport=FAST._replace(retries=0))
+    with pytest.raises(APIError) as e:
+        client.get("anything")
+    assert e.value.status_code is None
+
+def test_async_client_retries(server):
+    async def run():
+        async with AsyncClient("key", base_url=server.url, transport=FAST) as client:
+            assert await client.post("flaky", data={}) == {"ok": True}
+            with pytest.raises(APIError, match="Maintenance"):
+                await client.get("down")
+    asyncio.run(run())
+    assert server.hits["/flaky"] == 3
+    assert server.hits["/down"] == 3
@@ -0,0 +1,70 @@
+import pytest
+from eth_abi import encode
+from eth_utils import keccak
+from nucleus_sdk_python.utils import compile_signature, encode_with_signature, is_address, parse_argument_types, to_checksum_address
+
+APPROVE = "approve(address,uint256)"
+SPENDER = "0xDB74dfDD3BB46bE8Ce6C33dC9D82777BCFc3dEd5"
+
+def test_parse_argument_types_nested():
+    assert parse_argument_types("doSomething((address,uint256),uint256)") == ["(address,uint256)", "uint256"]
+
+def test_compile_signature():
+    compiled = compile_signature(APPROVE)
+    assert compiled.signature == APPROVE
+    assert compiled.selector == bytes.fromhex("095ea7b3")
+    assert compiled.arg_types == ("address", "uint256")
+    assert compile_signature(APPROVE) is compiled
+
+def test_encode_with_signature_matches_eth_abi():
+    signature = "exactInput((bytes,address,uint256,uint256,uint256))"
+    args = [[b"\x01\x02", SPENDER, 1, 2, 3]]
+    expected = keccak(text=signature)[:4] + encode(["(bytes,address,uint256,uint256,uint256)"], args)
+    assert encode_with_signature(signature, args) == expected
+    assert encode_with_signature(APPROVE, [SPENDER, 140]).hex() == "095ea7b3000000000000000000000000db74dfdd3bb46be8ce6c33dc9d82777bcfc3ded5000000000000000000000000000000000000000000000000000000000000008c"
+
+def test_encode_rows_matches_row_by_row_encoding():
+    signature = "mixed(address,bool,int24,uint8,bytes4,uint256)"
+    rows = [
+        [SPENDER, True, -5, 255, b"\x12\x34", 2**256 - 1],
+        [SPENDER.lower(), False, 8388607, 0, b"", 0]
+    ]
+    compiled = compile_signature(signature)
+    assert compiled.word_encoders is not None
+    assert compiled.encode_rows(rows) == [compiled.encode(row) for row in rows]
+
+    # Unhashable address values are encoded without the per-column memo
+    approve = compile_signature(APPROVE)
+    raw = bytearray.fromhex(SPENDER[2:])
+    assert approve.encode_rows([[raw, 1], [SPENDER, 2], [raw, 3]]) == [approve.encode(row) for row in ([SPENDER, 1], [SPENDER, 2], [SPENDER, 3])]
+
+    dynamic = compile_signature("exactInput((bytes,address,uint256,uint256,uint256))")
+    assert dynamic.word_encoders is None
+    assert dynamic.encode_rows([[[b"\x01", SPENDER, 1, 2, 3]]]) == [dynamic.encode([[b"\x01", SPENDER, 1, 2, 3]])]
+
+def test_encode_rows_rejects_invalid_values():
+    compiled = compile_signature(APPROVE)
+    for row in ([SPENDER, -1], [SPENDER, True], ["0x1234", 1], [SPENDER]):
+        with pytest.raises(ValueError, match="Row 1"):
+            compiled.encode_rows([[SPENDER, 1], row])
+
+def test_address_helpers_match_eth_utils():
+    import eth_utils
+    for address in (SPENDER, SPENDER.lower(), SPENDER.upper().replace("0X", "0x"), "0x" + "1" * 40, SPENDER[2:]):
+        assert is_address(address) == eth_utils.is_address(address)
+        assert to_checksum_address(address) == eth_utils.to_checksum_address(address)
+    for value in (SPENDER.replace("D", "d", 1), "0x1234", 42, b"\x00" * 20):
+        assert not is_address(value)
+
+def test_invalid_static_arguments_raise_eth_abi_errors():
+    from eth_abi.exceptions import EncodingError
+    with pytest.raises(EncodingError):
+        encode_with_signature(APPROVE, [SPENDER, -1])
+
+def test_word_encoders_only_cover_valid_types():
+    assert compile_signature("f(uint8,int256,uint,bytes1,bytes32)").word_encoders is not None
+    for invalid in ("uint7", "uint264", "int0", "uint08", "bytes0", "bytes33"):
+        # Invalid types are left to eth_abi, which rejects them
+        assert compile_signature(f"f({invalid})").word_encoders is None
+        with pytest.raises(Exception):
+            encode_with_signature(f"f({invalid})", [1])
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+from websockets.asyncio.server import serve
+from nucleus_sdk_python.calldata_queue import CalldataQueue
+from nucleus_sdk_python.client import Client
+from nucleus_sdk_python.nonce_manager import NonceManager
+from nucleus_sdk_python.root_cache import root_key
+from nucleus_sdk_python.watcher import ChainStateWatcher
+from .helpers import SPENDER, ROOT
+
+NEW_ROOT = "0x" + "bb" * 32
+
+class FakeNode:
+    """WebSocket JSON-RPC node answering the watcher's requests and publishing new heads on demand."""
+
+    def __init__(self):
+        self.root = ROOT
+        self.block_number = 100
+        self.pending_nonce = 7
+        self.connections = []
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        threading.Thread(target=self.loop.run_until_complete, args=(self._serve(started),), daemon=True).start()
+        started.wait()
+
+    async def _serve(self, started):
+        self.stopped = asyncio.Event()
+        async with serve(self._handle, "127.0.0.1", 0) as server:
+            self.url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+            started.set()
+            await self.stopped.wait()
+
+    def head(self):
+        return {"number": hex(self.block_number), "baseFeePerGas": hex(30 * 10 ** 9), "hash": "0x" + "00" * 32}
+
+    async def _handle(self, connection):
+        self.connections.append(connection)
+        async for message in connection:
+            request = json.loads(message)
+            method = request["method"]
+            result = {
+                "eth_chainId": "0x1",
+                "eth_subscribe": "0x1234",
+                "eth_getBlockByNumber": self.head(),
+                "eth_maxPriorityFeePerGas": hex(2 * 10 ** 9),
+                "eth_call": self.root,
+                "eth_getTransactionCount": hex(self.pending_nonce),
+            }[method]
+            await connection.send(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}))
+
+    def publish_block(self):
+        self.block_number += 1
+        notification = {"jsonrpc": "2.0", "method": "eth_subscription", "params": {"subscription": "0x1234", "result": self.head()}}
+        for connection in self.connections:
+            asyncio.run_coroutine_threadsafe(connection.send(json.dumps(notification)), self.loop).result()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.stopped.set)
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def test_watcher_tracks_root_fees_and_nonce():
+    node = FakeNode()
+    client = Client("test", address_book=SimpleNamespace(lookup=lambda chain, protocol, symbol: {"manager": SPENDER}))
+    queue = CalldataQueue.__new__(CalldataQueue)
+    queue._init_state(1, SPENDER, "http://localhost", "tETH", client)
+    queue.root = ROOT
+    nonce_manager = NonceManager(None, SPENDER)
+
+    try:
+        with ChainStateWatcher(client, node.url, 1) as watcher:
+            watcher.watch_queue(queue)
+            watcher.watch_account(nonce_manager)
+            key = root_key(1, SPENDER, SPENDER)
+            assert watcher.state.block_number == 100
+            assert queue._watched_gas_price() == 32 * 10 ** 9
+
+            node.pending_nonce = 9
+            node.root = NEW_ROOT
+            node.publish_block()
+            wait_for(lambda: queue._pending_root == NEW_ROOT)
+            assert client.root_cache.get(key) == NEW_ROOT
+            # The queue is only switched on its own thread
+            assert queue.root == ROOT
+            queue.to_snapshot()
+            assert queue.root == NEW_ROOT
+            assert watcher.state.block_number == 101
+            assert nonce_manager.pending_nonce == 9
+        assert queue._watched_gas_price() is None
+    finally:
+        node.stop()